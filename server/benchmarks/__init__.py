@@ -0,0 +1,25 @@
+"""
+Reproducible load benchmarks for CampusFix.
+
+Seeds a synthetic campus (users, issues, comments, upvotes, notifications)
+at a chosen scale, drives scripted scenarios through the real URL stack and
+writes a JSON report of throughput and latency percentiles per operation,
+so runs can be compared across commits:
+
+    # in-process, against a throwaway test database
+    python -m benchmarks run --scale small --output before.json
+    ... change something ...
+    python -m benchmarks run --scale small --output after.json
+    python -m benchmarks compare before.json after.json
+
+    # against a running server (seed its database first)
+    python -m benchmarks seed --scale campus
+    python -m benchmarks run --base-url http://localhost:8000 --concurrency 8
+
+Scenarios: issue_list_browse, issue_create_storm, upvote_storm,
+dashboard_analytics, sla_sweep, announcement_broadcast (see
+benchmarks.scenarios). In-process runs use the Gemini and SMTP stand-ins
+(issues.ai_fakes, utils.email_backends), with latency and failures set by
+--fake-gemini / --email-sink; start a server under test with
+CAMPUSFIX_FAKE_GEMINI / CAMPUSFIX_EMAIL_SINK for the same effect.
+"""
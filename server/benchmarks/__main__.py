@@ -0,0 +1,172 @@
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "campusfix.settings")
+    import django
+
+    django.setup()
+
+
+def seed(args):
+    from . import data
+
+    try:
+        data.generate(args.scale, seed=args.seed)
+    except data.AlreadySeeded as exc:
+        sys.exit(f"{exc} Seed a fresh database instead.")
+    print(f"Seeded {args.scale} campus: {data.SCALES[args.scale]}")
+
+
+def _create_throwaway_database(workdir):
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    if connection.vendor == "sqlite":
+        # On disk rather than shared in-memory, so worker threads can write concurrently
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(workdir, "benchmark.sqlite3")
+    return connection.creation.create_test_db(verbosity=0, serialize=False)
+
+
+def _use_stand_ins(args):
+    from django.conf import settings
+
+    from issues.ai_services import ai_service
+    from utils.fault_injection import parse_options, reset_injector
+
+    settings.EMAIL_BACKEND = "utils.email_backends.SinkEmailBackend"
+    settings.EMAIL_SINK = parse_options(args.email_sink)
+    settings.GEMINI_FAKE = parse_options(args.fake_gemini)
+    ai_service.model_class = "issues.ai_fakes.FakeGenerativeModel"
+    reset_injector("EMAIL_SINK")
+    reset_injector("GEMINI_FAKE")
+
+
+def run(args):
+    from django.core.cache import cache
+    from django.db import connection
+
+    from . import data, report
+    from .clients import HttpClient, LocalClient
+    from .scenarios import SCENARIOS, BenchContext, run_scenario
+
+    names = args.scenario or list(SCENARIOS)
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.base_url:
+            users = data.load_users()
+            ctx = BenchContext(users, HttpClient, base_url=args.base_url)
+        else:
+            old_name = connection.settings_dict["NAME"]
+            _create_throwaway_database(workdir)
+            _use_stand_ins(args)
+            cache.clear()
+            users = data.generate(args.scale, seed=args.seed)
+            ctx = BenchContext(users, LocalClient)
+
+        try:
+            results = {}
+            for name in names:
+                print(f"running {name} ...", file=sys.stderr)
+                results[name] = run_scenario(
+                    SCENARIOS[name](), ctx, args.iterations, concurrency=args.concurrency, warmup=args.warmup,
+                )
+            meta = report.build_meta(
+                scale=None if args.base_url else args.scale,
+                seed=args.seed,
+                target=args.base_url or "in-process",
+                iterations=args.iterations,
+                concurrency=args.concurrency,
+                warmup=args.warmup,
+                stand_ins=None if args.base_url else {
+                    "gemini": args.fake_gemini, "email": args.email_sink,
+                },
+            )
+        finally:
+            if not args.base_url:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{meta['commit'] or 'nocommit'}.json"
+    report.write({"meta": meta, "scenarios": results}, output)
+
+    print(f"{'scenario':<24} {'operation':<52} {'count':>6} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        for label, operation in result["operations"].items():
+            latency = operation["latency_ms"]
+            print(f"{name:<24} {label:<52} {operation['count']:>6} {operation['errors']:>4} "
+                  f"{operation['throughput_rps']:>8.1f} {latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}")
+    print(f"report written to {output}")
+
+
+def compare(args):
+    from . import report
+
+    before, after = report.load(args.before), report.load(args.after)
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')} ({args.metric})")
+    regressions = 0
+    for scenario, label, old, new, change in report.compare(before, after, metric=args.metric):
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{scenario:<24} {label:<52} {old:>9.2f} {new:>9.2f} {change:>+8.1%}{flag}")
+    if regressions:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="CampusFix load benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    from .data import SCALES
+    from .scenarios import SCENARIOS
+
+    seed_parser = commands.add_parser("seed", help="seed the configured database with a synthetic campus")
+    seed_parser.add_argument("--scale", choices=SCALES, default="small")
+    seed_parser.add_argument("--seed", type=int, default=1234)
+    seed_parser.set_defaults(func=seed)
+
+    run_parser = commands.add_parser("run", help="run scenarios and write a JSON report")
+    run_parser.add_argument("--scale", choices=SCALES, default="small",
+                            help="data set for in-process runs (ignored with --base-url)")
+    run_parser.add_argument("--seed", type=int, default=1234)
+    run_parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                            help="scenario to run (repeatable; default: all)")
+    run_parser.add_argument("--iterations", type=int, default=200, help="steps per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=1, help="worker threads")
+    run_parser.add_argument("--warmup", type=int, default=10, help="unrecorded steps per scenario")
+    run_parser.add_argument("--fake-gemini", default="",
+                            help='in-process Gemini stand-in faults, e.g. "latency=0.8,rate_limit_rate=0.1"')
+    run_parser.add_argument("--email-sink", default="",
+                            help='in-process SMTP sink faults, e.g. "latency=0.2,error_rate=0.01"')
+    run_parser.add_argument("--base-url", help="benchmark a running server instead of an in-process test database")
+    run_parser.add_argument("--output", help="report path (default: benchmarks/results/<time>-<commit>.json)")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two reports")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--metric", default="p95",
+                                choices=["min", "mean", "p50", "p90", "p95", "p99", "max"])
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative slowdown reported as a regression (exit status 1)")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    _setup_django()
+    main()
@@ -0,0 +1,82 @@
+"""
+Authenticated clients the scenarios drive, one per user and worker thread.
+
+`LocalClient` goes through Django's test client (in-process, full
+middleware stack); `HttpClient` talks to a running server with `requests`.
+Both authenticate the way the real frontends do: a JWT bearer token for
+/api/ and a dashboard session cookie for /dashboard/, minted directly for
+the seeded users so no password hashing or login throttling is measured.
+"""
+
+from django.conf import settings
+
+
+def _access_token(user):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    return str(RefreshToken.for_user(user).access_token)
+
+
+def _session_key(user):
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+    return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+
+class LocalClient:
+    def __init__(self, user):
+        from django.test import Client
+
+        self.client = Client()
+        self.token = _access_token(user)
+        if user.is_staff:
+            self.client.force_login(user)
+            self.client.cookies[settings.DASHBOARD_SESSION_COOKIE_NAME] = (
+                self.client.cookies[settings.SESSION_COOKIE_NAME].value
+            )
+
+    def request(self, method, path, data=None, json=None):
+        """Return the response status code."""
+        kwargs = {}
+        if path.startswith("/api/"):
+            kwargs["HTTP_AUTHORIZATION"] = f"Bearer {self.token}"
+        if json is not None:
+            kwargs.update(data=json, content_type="application/json")
+        elif data is not None:
+            kwargs["data"] = data
+        return getattr(self.client, method.lower())(path, **kwargs).status_code
+
+
+class HttpClient:
+    timeout = 60
+
+    def __init__(self, user, base_url):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.token = _access_token(user)
+        if user.is_staff:
+            self.session.cookies.set(settings.DASHBOARD_SESSION_COOKIE_NAME, _session_key(user))
+
+    def _csrf_token(self):
+        name = settings.DASHBOARD_CSRF_COOKIE_NAME
+        if name not in self.session.cookies:
+            self.session.get(f"{self.base_url}/dashboard/", timeout=self.timeout)
+        return self.session.cookies.get(name, "")
+
+    def request(self, method, path, data=None, json=None):
+        """Return the response status code."""
+        headers = {}
+        if path.startswith("/api/"):
+            headers["Authorization"] = f"Bearer {self.token}"
+        elif method.upper() not in ("GET", "HEAD"):
+            headers["X-CSRFToken"] = self._csrf_token()
+            headers["Referer"] = f"{self.base_url}{path}"
+        response = self.session.request(
+            method, f"{self.base_url}{path}", data=data, json=json, headers=headers,
+            timeout=self.timeout, allow_redirects=False,
+        )
+        return response.status_code
@@ -0,0 +1,83 @@
+"""
+Synthetic campus data at a configurable scale.
+
+Builds on `campusfix.testing.seed_volume` (users, issues, comments, upvotes,
+progress logs, feedback) and adds notifications. Everything is generated
+from a fixed seed with bulk inserts, so two runs at the same scale see the
+same data set.
+"""
+
+import random
+from collections import namedtuple
+
+from campusfix.testing import seed_volume
+
+CampusScale = namedtuple("CampusScale", "students staff issues comments notifications")
+
+SCALES = {
+    "tiny": CampusScale(students=20, staff=4, issues=200, comments=1000, notifications=500),
+    "small": CampusScale(students=200, staff=20, issues=1000, comments=10000, notifications=5000),
+    "campus": CampusScale(students=2000, staff=100, issues=10000, comments=100000, notifications=50000),
+    "large": CampusScale(students=10000, staff=300, issues=50000, comments=500000, notifications=250000),
+}
+
+SEED_ADMIN_EMAIL = "budget-admin@campusfix.test"
+
+
+class AlreadySeeded(Exception):
+    pass
+
+
+def generate(scale="small", seed=1234):
+    """Seed the default database; returns {"admin", "staff", "students"} users."""
+    from accounts.models import User
+    from issues.models import Issue
+    from notifications.models import Notification
+
+    if isinstance(scale, str):
+        scale = SCALES[scale]
+    if User.objects.filter(email=SEED_ADMIN_EMAIL).exists():
+        raise AlreadySeeded("Benchmark data is already present in this database.")
+
+    users = seed_volume(
+        issues=scale.issues,
+        comments=scale.comments,
+        students=scale.students,
+        staff=scale.staff,
+        seed=seed,
+    )
+
+    rng = random.Random(seed)
+    recipients = users["students"] + users["staff"]
+    issue_ids = list(Issue.objects.values_list("pk", flat=True))
+    types = [value for value, _ in Notification.TYPE_CHOICES]
+    Notification.objects.bulk_create(
+        (
+            Notification(
+                user=rng.choice(recipients),
+                title="Issue update",
+                message="There is a new update on an issue you follow.",
+                notification_type=rng.choice(types),
+                is_read=rng.random() < 0.6,
+                related_issue_id=rng.choice(issue_ids),
+            )
+            for _ in range(scale.notifications)
+        ),
+        batch_size=5000,
+    )
+    return users
+
+
+def load_users():
+    """Return the users of an already seeded database, as `generate()` does."""
+    from accounts.models import User
+
+    seeded = User.objects.filter(email__endswith="@campusfix.test")
+    admin = seeded.filter(email=SEED_ADMIN_EMAIL).first()
+    if admin is None:
+        raise LookupError("No benchmark data found; run `python -m benchmarks seed` first.")
+    return {
+        "admin": admin,
+        "staff": list(seeded.filter(role="staff").order_by("pk")),
+        "students": list(seeded.filter(role="student").order_by("pk")),
+    }
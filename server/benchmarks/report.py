@@ -0,0 +1,152 @@
+"""
+Latency recording and the JSON report format.
+
+A report looks like:
+
+    {
+      "meta": {"commit": "32ad887", "scale": "small", "concurrency": 4, ...},
+      "scenarios": {
+        "upvote_storm": {
+          "duration_s": 3.2,
+          "throughput_rps": 312.5,
+          "operations": {
+            "POST /api/issues/<id>/upvote/": {
+              "count": 1000, "errors": 0, "throttled": 0, "throughput_rps": 312.5,
+              "latency_ms": {"min": .., "mean": .., "p50": .., "p90": .., "p95": .., "p99": .., "max": ..}
+            }
+          }
+        }
+      }
+    }
+
+`compare()` lines two reports up operation by operation.
+"""
+
+import json
+import platform
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+class Recorder:
+    """Collects (latency, status) samples per operation label; thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(list)
+        self._errors = defaultdict(int)
+        self._throttled = defaultdict(int)
+        self.started = self.finished = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def record(self, label, seconds, status):
+        with self._lock:
+            self._samples[label].append(seconds)
+            if status == 429:
+                self._throttled[label] += 1
+            elif status is None or status >= 400:
+                self._errors[label] += 1
+
+    def timed(self, label, func, *args, **kwargs):
+        """Call `func`, record its latency under `label`; it returns a status code."""
+        start = time.perf_counter()
+        status = None
+        try:
+            status = func(*args, **kwargs)
+            return status
+        finally:
+            self.record(label, time.perf_counter() - start, status)
+
+    def summary(self):
+        duration = (self.finished or time.perf_counter()) - self.started
+        operations = {}
+        total = 0
+        for label, samples in sorted(self._samples.items()):
+            ordered = sorted(samples)
+            total += len(ordered)
+            latency = {
+                "min": ordered[0] * 1000,
+                "mean": sum(ordered) / len(ordered) * 1000,
+                **{f"p{p}": percentile(ordered, p) * 1000 for p in PERCENTILES},
+                "max": ordered[-1] * 1000,
+            }
+            operations[label] = {
+                "count": len(ordered),
+                "errors": self._errors[label],
+                "throttled": self._throttled[label],
+                "throughput_rps": round(len(ordered) / duration, 2) if duration else 0.0,
+                "latency_ms": {key: round(value, 3) for key, value in latency.items()},
+            }
+        return {
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(total / duration, 2) if duration else 0.0,
+            "operations": operations,
+        }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_meta(**options):
+    import django
+    from django.db import connection
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        **options,
+    }
+
+
+def write(report, path):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def load(path):
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def compare(before, after, metric="p95"):
+    """Yield (scenario, operation, before, after, change) for operations in both reports."""
+    for scenario, result in after["scenarios"].items():
+        previous = before["scenarios"].get(scenario)
+        if previous is None:
+            continue
+        for label, operation in result["operations"].items():
+            old = previous["operations"].get(label)
+            if old is None:
+                continue
+            old_value = old["latency_ms"][metric]
+            new_value = operation["latency_ms"][metric]
+            change = (new_value - old_value) / old_value if old_value else 0.0
+            yield scenario, label, old_value, new_value, change
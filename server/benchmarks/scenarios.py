@@ -0,0 +1,211 @@
+"""
+Scripted load scenarios.
+
+Each scenario runs `iterations` steps spread over the worker threads; a
+step performs one user action (one or a few requests) and every request is
+timed under a label with ids replaced by `<id>`, so reports from different
+data sets line up. Steps pick their users and issues deterministically from
+the step index, so the same run against the same seed issues the same
+requests.
+"""
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .report import Recorder
+
+
+class BenchContext:
+    """Seeded users and issue ids plus a per-thread client cache."""
+
+    def __init__(self, users, client_class, **client_kwargs):
+        from issues.models import Issue
+
+        self.admin = users["admin"]
+        self.staff = users["staff"]
+        self.students = users["students"]
+        self.client_class = client_class
+        self.client_kwargs = client_kwargs
+        self.recorder = Recorder()
+        self._local = threading.local()
+
+        open_public = (
+            Issue.objects.filter(visibility="public")
+            .exclude(status__in=["resolved", "closed"])
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        self.issue_ids = list(open_public[:500])
+
+    def client(self, user):
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if user.pk not in clients:
+            clients[user.pk] = self.client_class(user, **self.client_kwargs)
+        return clients[user.pk]
+
+    def request(self, label, user, method, path, **kwargs):
+        client = self.client(user)
+        return self.recorder.timed(label, client.request, method, path, **kwargs)
+
+    def student(self, index):
+        return self.students[index % len(self.students)]
+
+
+class Scenario:
+    name = ""
+    # Steps that share mutable state run on a single worker
+    serial = False
+
+    def setup(self, ctx):
+        pass
+
+    def step(self, ctx, index):
+        raise NotImplementedError
+
+
+class IssueListBrowse(Scenario):
+    """Students filtering the issue list, opening an issue and reading its comments."""
+
+    name = "issue_list_browse"
+    queries = ("?filter=my-issues", "?status=open", "?category=electrical&search=fixture", "?priority=high&ordering=-upvote_count")
+
+    def step(self, ctx, index):
+        student = ctx.student(index)
+        query = self.queries[index % len(self.queries)]
+        ctx.request(f"GET /api/issues/{query}", student, "GET", f"/api/issues/{query}")
+        issue_id = ctx.issue_ids[index % len(ctx.issue_ids)]
+        ctx.request("GET /api/issues/<id>/", student, "GET", f"/api/issues/{issue_id}/")
+        ctx.request("GET /api/issues/<id>/comments/", student, "GET", f"/api/issues/{issue_id}/comments/")
+
+
+class IssueCreateStorm(Scenario):
+    """Many students reporting issues at once (reporters rotate, staying under per-user limits)."""
+
+    name = "issue_create_storm"
+
+    def step(self, ctx, index):
+        ctx.request("POST /api/issues/", ctx.student(index), "POST", "/api/issues/", json={
+            "title": f"Water leak near lab {index}",
+            "description": "Water is pooling under the sink and spreading into the corridor.",
+            "category": "plumbing",
+            "location": f"Block C Room {100 + index % 50}",
+        })
+
+
+class UpvoteStorm(Scenario):
+    """Students piling upvotes onto a handful of trending issues."""
+
+    name = "upvote_storm"
+    hot_issues = 10
+
+    def step(self, ctx, index):
+        issue_id = ctx.issue_ids[index % self.hot_issues]
+        ctx.request("POST /api/issues/<id>/upvote/", ctx.student(index), "POST", f"/api/issues/{issue_id}/upvote/")
+
+
+class DashboardAnalytics(Scenario):
+    """Admins loading the analytics page and the reporting APIs behind it."""
+
+    name = "dashboard_analytics"
+    pages = (
+        "/dashboard/analytics/",
+        "/api/dashboard/admin_stats/",
+        "/api/admin/analytics/resolution/",
+        "/api/admin/analytics/hotspots/",
+    )
+
+    def step(self, ctx, index):
+        path = self.pages[index % len(self.pages)]
+        ctx.request(f"GET {path}", ctx.admin, "GET", path)
+
+
+class SlaSweep(Scenario):
+    """
+    Issues crossing their SLA deadlines in batches, then the periodic job
+    that flags them (check_maintenance_windows: overdue flags for SLA due
+    times, sla_deadline breaches and reminders) and an admin loading the
+    dashboard home page.
+    """
+
+    name = "sla_sweep"
+    serial = True
+    batch = 200
+
+    def step(self, ctx, index):
+        from issues.models import Issue
+
+        # Untimed: push the next batch of open issues just past their deadlines
+        past = timezone.now() - timedelta(minutes=1)
+        batch = ctx.issue_ids[(index * self.batch) % len(ctx.issue_ids):][: self.batch]
+        Issue.objects.filter(pk__in=batch).update(
+            sla_due_at=past, is_overdue=False, sla_deadline=past, sla_breached=False,
+        )
+
+        ctx.recorder.timed(
+            "command check_maintenance_windows", self.run_command, "check_maintenance_windows"
+        )
+        ctx.request("GET /dashboard/", ctx.admin, "GET", "/dashboard/")
+
+    @staticmethod
+    def run_command(name):
+        from django.core.management import call_command
+
+        call_command(name, stdout=io.StringIO())
+        return 0
+
+
+class AnnouncementBroadcast(Scenario):
+    """An admin broadcasting announcements to every active user."""
+
+    name = "announcement_broadcast"
+    audiences = ("all", "students", "staff")
+
+    def step(self, ctx, index):
+        ctx.request("POST /dashboard/announcements/", ctx.admin, "POST", "/dashboard/announcements/", data={
+            "title": f"Water outage notice {index}",
+            "body": "Water will be shut off in Block C between 9am and 11am for repairs.",
+            "audience": self.audiences[index % len(self.audiences)],
+        })
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        IssueListBrowse,
+        IssueCreateStorm,
+        UpvoteStorm,
+        DashboardAnalytics,
+        SlaSweep,
+        AnnouncementBroadcast,
+    )
+}
+
+
+def run_scenario(scenario, ctx, iterations, concurrency=1, warmup=0):
+    """Run one scenario; returns its report section."""
+    workers = 1 if scenario.serial else max(1, concurrency)
+    scenario.setup(ctx)
+
+    def step(index):
+        scenario.step(ctx, index)
+
+    with ThreadPoolExecutor(workers) as pool:
+        # A single worker runs on the calling thread (and its DB connection)
+        execute = pool.map if workers > 1 else map
+
+        # Warm-up steps use the same clients but are not recorded
+        ctx.recorder = Recorder()
+        list(execute(step, range(warmup)))
+
+        ctx.recorder = recorder = Recorder()
+        recorder.start()
+        list(execute(step, range(warmup, warmup + iterations)))
+        recorder.stop()
+
+    return recorder.summary()
@@ -0,0 +1,50 @@
+from django.test import TestCase
+
+from . import data, report
+from .clients import LocalClient
+from .scenarios import SCENARIOS, BenchContext, run_scenario
+
+
+class ScenarioSmokeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = data.generate("tiny")
+
+    def test_every_scenario_runs_without_errors(self):
+        ctx = BenchContext(self.users, LocalClient)
+        for name, scenario in SCENARIOS.items():
+            with self.subTest(scenario=name):
+                result = run_scenario(scenario(), ctx, iterations=4, warmup=1)
+                self.assertTrue(result["operations"])
+                for label, operation in result["operations"].items():
+                    self.assertEqual(operation["errors"], 0, label)
+
+    def test_generate_refuses_to_seed_twice(self):
+        with self.assertRaises(data.AlreadySeeded):
+            data.generate("tiny")
+
+
+class ReportTests(TestCase):
+    def test_percentiles_and_compare(self):
+        recorder = report.Recorder()
+        recorder.start()
+        for ms in range(1, 101):
+            recorder.record("GET /api/issues/", ms / 1000, 200)
+        recorder.record("GET /api/issues/", 0.5, 500)
+        recorder.record("GET /api/issues/", 0.001, 429)
+        recorder.stop()
+        summary = recorder.summary()
+
+        operation = summary["operations"]["GET /api/issues/"]
+        self.assertEqual(operation["count"], 102)
+        self.assertEqual(operation["errors"], 1)
+        self.assertEqual(operation["throttled"], 1)
+        self.assertEqual(operation["latency_ms"]["p50"], 50.0)
+
+        before = {"scenarios": {"browse": summary}}
+        after = {"scenarios": {"browse": {"operations": {
+            "GET /api/issues/": {**operation, "latency_ms": {**operation["latency_ms"], "p95": 190.0}},
+        }}}}
+        [(scenario, label, old, new, change)] = report.compare(before, after)
+        self.assertEqual((scenario, old, new), ("browse", 96.0, 190.0))
+        self.assertAlmostEqual(change, 190.0 / 96.0 - 1)
@@ -0,0 +1,388 @@
+"""
+Channel layer for multi-process deployments on one host, without Redis.
+
+Every worker process that hosts consumers (a "node") listens on its own
+Unix domain socket in a shared directory. Channel names carry the node id,
+so a direct send reaches exactly one node. Group membership stays local to
+the node that owns the channel: `group_send` hands one envelope to every
+live node, which then delivers it to its own members.
+
+Sends issued in the same event-loop tick are coalesced into a single
+length-prefixed msgpack frame per node, so a burst of `group_send` calls
+(e.g. an outbox flush) costs one socket write per worker.
+
+Enable with `CAMPUSFIX_CHANNEL_LAYER=unix`. The socket directory (by
+default `campusfix-channels-<uid>` under the temp dir) must be a real
+directory owned by the current user with mode 0700; the layer refuses to
+bind or connect anywhere else.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import random
+import stat
+import string
+import struct
+import tempfile
+import time
+from copy import deepcopy
+
+import msgpack
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct("!I")
+
+# Envelope kinds: (kind, target, message)
+GROUP = 0
+CHANNEL = 1
+
+
+def _random_suffix(length=12):
+    return "".join(random.choices(string.ascii_letters + string.digits, k=length))
+
+
+def _default_socket_dir():
+    return os.path.join(tempfile.gettempdir(), f"campusfix-channels-{os.getuid()}")
+
+
+def _ensure_private_dir(path):
+    """
+    Create `path` if needed and check that only we can use it.
+
+    A directory under a shared temp dir may have been created (or replaced
+    by a symlink) by another local user; makedirs() applies its mode only to
+    directories it creates, so the result is verified explicitly.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"Channel socket dir {path} is not a directory")
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"Channel socket dir {path} is not owned by the current user")
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        raise PermissionError(
+            f"Channel socket dir {path} has mode {stat.S_IMODE(info.st_mode):o}, expected 700"
+        )
+
+
+class UnixSocketChannelLayer(BaseChannelLayer):
+    """Cross-process channel layer over Unix domain sockets."""
+
+    extensions = ["groups", "flush"]
+
+    def __init__(
+        self,
+        socket_dir=None,
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        peer_refresh=1.0,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity)
+        self.channel_capacity = self.compile_capacities(channel_capacity or {})
+        self.socket_dir = socket_dir or _default_socket_dir()
+        self.group_expiry = group_expiry
+        self.peer_refresh = peer_refresh
+        self.node_id = f"{os.getpid()}-{_random_suffix(6)}"
+
+        self.channels = {}
+        self.groups = {}
+        self._last_cleanup = 0
+
+        self._server = None
+        self._socket_dir_checked = False
+        self._server_loop = None
+        self._server_lock = None
+        self._writers = {}
+
+        self._peers = []
+        self._peers_checked = 0
+
+        # event loop -> (envelopes per node, future resolved once written)
+        self._pending = {}
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        """Send a message to a (general or process-specific) channel."""
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        assert "__asgi_channel__" not in message
+
+        node = self._node_of(channel)
+        if node is None or (node == self.node_id and self._on_server_loop()):
+            self._put(channel, deepcopy(message))
+        else:
+            await self._enqueue([node], (CHANNEL, channel, message))
+
+    async def receive(self, channel):
+        """Receive the first unexpired message on a channel owned by this node."""
+        self.require_valid_channel_name(channel)
+        queue = self._queue(channel)
+        try:
+            while True:
+                expires, message = await queue.get()
+                if expires >= time.time():
+                    return message
+                self._remove_from_groups(channel)
+        finally:
+            if queue.empty():
+                self.channels.pop(channel, None)
+
+    async def new_channel(self, prefix="specific"):
+        """Return a process-specific channel name routed to this node."""
+        await self._ensure_server()
+        return f"{prefix}.{self.node_id}!{_random_suffix()}"
+
+    # Groups extension
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        self.groups.setdefault(group, {})[channel] = time.time()
+
+    async def group_discard(self, group, channel):
+        self.require_valid_channel_name(channel)
+        self.require_valid_group_name(group)
+        group_channels = self.groups.get(group)
+        if group_channels:
+            group_channels.pop(channel, None)
+            if not group_channels:
+                self.groups.pop(group, None)
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+
+        local = self._on_server_loop()
+        if local:
+            self._deliver(GROUP, group, message)
+
+        nodes = [node for node in self._live_nodes() if not (local and node == self.node_id)]
+        if nodes:
+            await self._enqueue(nodes, (GROUP, group, message))
+
+    # Flush extension
+
+    async def flush(self):
+        self.channels = {}
+        self.groups = {}
+
+    async def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            self._unlink_socket()
+
+    # Local delivery
+
+    def _queue(self, channel):
+        queue = self.channels.get(channel)
+        if queue is None:
+            queue = self.channels[channel] = asyncio.Queue(maxsize=self.get_capacity(channel))
+        return queue
+
+    def _put(self, channel, message):
+        try:
+            self._queue(channel).put_nowait((time.time() + self.expiry, message))
+        except asyncio.QueueFull:
+            raise ChannelFull(channel)
+
+    def _deliver(self, kind, target, message):
+        """Deliver an envelope to channels owned by this node."""
+        if kind == CHANNEL:
+            try:
+                self._put(target, message)
+            except ChannelFull:
+                logger.debug("Dropped message for full channel %s", target)
+            return
+
+        self._clean_expired()
+        for channel in list(self.groups.get(target, ())):
+            try:
+                self._put(channel, deepcopy(message))
+            except ChannelFull:
+                pass
+
+    def _clean_expired(self):
+        """Drop dead channels and stale group memberships (at most once a second)."""
+        now = time.time()
+        if now - self._last_cleanup < 1:
+            return
+        self._last_cleanup = now
+
+        for channel, queue in list(self.channels.items()):
+            while not queue.empty() and queue._queue[0][0] < now:
+                queue.get_nowait()
+                self._remove_from_groups(channel)
+                if queue.empty():
+                    self.channels.pop(channel, None)
+
+        cutoff = now - self.group_expiry
+        for channels in self.groups.values():
+            for name, joined in list(channels.items()):
+                if joined < cutoff:
+                    channels.pop(name, None)
+
+    def _remove_from_groups(self, channel):
+        for channels in self.groups.values():
+            channels.pop(channel, None)
+
+    # Server side
+
+    def _socket_path(self, node):
+        return os.path.join(self.socket_dir, f"{node}.sock")
+
+    def _on_server_loop(self):
+        if self._server is None:
+            return False
+        try:
+            return asyncio.get_running_loop() is self._server_loop
+        except RuntimeError:
+            return False
+
+    async def _ensure_server(self):
+        if self._server is not None and not self._server_loop.is_closed():
+            return
+
+        loop = asyncio.get_running_loop()
+        if self._server_lock is None or self._server_loop is not loop:
+            self._server_lock = asyncio.Lock()
+
+        async with self._server_lock:
+            if self._server is not None and self._server_loop is loop:
+                return
+            self._check_socket_dir()
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=self._socket_path(self.node_id)
+            )
+            self._server_loop = loop
+            self._writers = {}
+            self._peers_checked = 0
+            atexit.register(self._unlink_socket)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                (size,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+                envelopes = msgpack.unpackb(await reader.readexactly(size), raw=False)
+                for kind, target, message in envelopes:
+                    self._deliver(kind, target, message)
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception:
+            logger.exception("Channel layer connection failed")
+        finally:
+            writer.close()
+
+    def _check_socket_dir(self):
+        # The sticky temp dir stops others from swapping it out once checked
+        if not self._socket_dir_checked:
+            _ensure_private_dir(self.socket_dir)
+            self._socket_dir_checked = True
+
+    def _unlink_socket(self):
+        try:
+            os.unlink(self._socket_path(self.node_id))
+        except FileNotFoundError:
+            pass
+
+    # Client side
+
+    @staticmethod
+    def _node_of(channel):
+        if "!" not in channel:
+            return None
+        return channel[: channel.index("!")].rsplit(".", 1)[-1]
+
+    def _live_nodes(self):
+        """Node ids with a socket in the shared directory (cached briefly)."""
+        now = time.monotonic()
+        if now - self._peers_checked > self.peer_refresh:
+            self._check_socket_dir()
+            try:
+                names = os.listdir(self.socket_dir)
+            except FileNotFoundError:
+                names = []
+            self._peers = [name[:-5] for name in names if name.endswith(".sock")]
+            self._peers_checked = now
+        return self._peers
+
+    def _drop_node(self, node):
+        """Forget an unreachable node, removing its socket if the process is gone."""
+        self._writers.pop(node, None)
+        if node in self._peers:
+            self._peers.remove(node)
+        try:
+            os.kill(int(node.split("-", 1)[0]), 0)
+        except (ValueError, PermissionError):
+            return
+        except ProcessLookupError:
+            try:
+                os.unlink(self._socket_path(node))
+            except FileNotFoundError:
+                pass
+
+    async def _enqueue(self, nodes, envelope):
+        """Queue an envelope for each node; written with everything else sent this tick."""
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is None:
+            batch = self._pending[loop] = ({}, loop.create_future())
+            loop.call_soon(self._flush_pending, loop)
+
+        frames, written = batch
+        for node in nodes:
+            frames.setdefault(node, []).append(envelope)
+        await asyncio.shield(written)
+
+    def _flush_pending(self, loop):
+        frames, written = self._pending.pop(loop)
+        loop.create_task(self._write_frames(frames, written))
+
+    async def _write_frames(self, frames, written):
+        results = await asyncio.gather(
+            *(self._write(node, envelopes) for node, envelopes in frames.items()),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Failed to send channel layer frame: %s", result)
+        written.set_result(None)
+
+    async def _write(self, node, envelopes):
+        payload = msgpack.packb(envelopes, use_bin_type=True)
+        frame = HEADER.pack(len(payload)) + payload
+
+        # Keep connections open on the serving loop; other loops (sync code
+        # going through async_to_sync) are short-lived, so connect per write.
+        persistent = self._on_server_loop()
+        for attempt in range(2):
+            writer = self._writers.get(node) if persistent else None
+            try:
+                if writer is None or writer.is_closing():
+                    _reader, writer = await asyncio.open_unix_connection(self._socket_path(node))
+                    if persistent:
+                        self._writers[node] = writer
+                writer.write(frame)
+                await writer.drain()
+                if not persistent:
+                    writer.close()
+                return
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._drop_node(node)
+                return
+            except OSError as e:
+                # Stale persistent connection (peer restarted): reconnect once
+                self._writers.pop(node, None)
+                if attempt:
+                    logger.warning("Failed to send channel layer frame to %s: %s", node, e)
@@ -0,0 +1,270 @@
+"""
+Opt-in per-layer profiling of the MIDDLEWARE stack.
+
+Enabled with CAMPUSFIX_PROFILE_MIDDLEWARE=1, which makes settings wrap every
+entry of MIDDLEWARE via `profile_middleware()`. Each wrapped layer records
+its own wall time and DB query count, i.e. excluding the layers and view
+below it, plus the time spent in its process_view/process_exception hooks.
+The results are:
+
+- returned to the client as a `Server-Timing` header (visible in the browser
+  devtools network panel);
+- accumulated in an in-memory latency histogram per layer, which is
+  periodically published to the cache so `manage.py middleware_profile`
+  can report p50/p95/p99 across worker processes (needs a shared cache,
+  e.g. Redis, to see other processes).
+
+Wrapped layers are synchronous only; under ASGI Django adapts them, which
+adds some overhead while profiling is enabled.
+"""
+
+import bisect
+import os
+import socket
+import threading
+import time
+from contextlib import ExitStack
+
+from django.utils.module_loading import import_string
+
+PUBLISH_INTERVAL = 10
+SNAPSHOT_TTL = 3600
+INDEX_KEY = 'middleware_profile:index'
+
+# Histogram bucket upper bounds in seconds: 10us .. ~30s, ~10% apart
+BUCKET_BOUNDS = tuple(0.00001 * 1.1 ** i for i in range(158))
+
+# Layer index -> dotted path of the middleware it wraps
+_layers = {}
+
+
+def profile_middleware(middleware):
+    """Return a MIDDLEWARE list where every entry is wrapped by a profiled layer."""
+    wrapped = []
+    for index, path in enumerate(middleware):
+        _layers[index] = path
+        wrapped.append(f'campusfix.profiling.Layer{index}')
+    return wrapped
+
+
+def __getattr__(name):
+    # Resolves the 'campusfix.profiling.LayerN' entries built above
+    if name.startswith('Layer') and name[5:].isdigit() and int(name[5:]) in _layers:
+        index = int(name[5:])
+        path = _layers[index]
+        return type(name, (ProfiledLayer,), {'index': index, 'path': path})
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LatencyHistogram:
+    """Fixed log-scale buckets; percentiles are bucket upper bounds."""
+
+    def __init__(self, index=0, buckets=None, count=0, total=0.0, queries=0):
+        self.index = index
+        self.buckets = buckets or [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = count
+        self.total = total
+        self.queries = queries
+
+    def add(self, seconds, queries):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.queries += queries
+
+    def merge(self, other):
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.total += other.total
+        self.queries += other.queries
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        target = self.count * p / 100
+        seen = 0
+        for bucket, hits in enumerate(self.buckets):
+            seen += hits
+            if seen >= target:
+                return BUCKET_BOUNDS[min(bucket, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+    def to_dict(self):
+        return {
+            'index': self.index, 'buckets': self.buckets, 'count': self.count,
+            'total': self.total, 'queries': self.queries,
+        }
+
+
+class ProfileRegistry:
+    """Per-process histograms, one per middleware layer."""
+
+    _histograms = {}
+    _lock = threading.Lock()
+    _published_at = time.monotonic()
+    _key = f'middleware_profile:{socket.gethostname()}:{os.getpid()}'
+
+    @staticmethod
+    def record(layers):
+        """Add one request's [(index, name, seconds, queries), ...] to the histograms."""
+        with ProfileRegistry._lock:
+            for index, name, seconds, queries in layers:
+                histogram = ProfileRegistry._histograms.get(name)
+                if histogram is None:
+                    histogram = ProfileRegistry._histograms[name] = LatencyHistogram(index)
+                histogram.add(seconds, queries)
+            publish = time.monotonic() - ProfileRegistry._published_at >= PUBLISH_INTERVAL
+            if publish:
+                ProfileRegistry._published_at = time.monotonic()
+        if publish:
+            ProfileRegistry.publish()
+
+    @staticmethod
+    def snapshot():
+        with ProfileRegistry._lock:
+            return {name: h.to_dict() for name, h in ProfileRegistry._histograms.items()}
+
+    @staticmethod
+    def publish():
+        from django.core.cache import cache
+
+        cache.set(ProfileRegistry._key, ProfileRegistry.snapshot(), SNAPSHOT_TTL)
+        index = cache.get(INDEX_KEY) or []
+        if ProfileRegistry._key not in index:
+            cache.set(INDEX_KEY, index + [ProfileRegistry._key], SNAPSHOT_TTL)
+
+    @staticmethod
+    def collect():
+        """Merge this process's histograms with those published by other processes."""
+        from django.core.cache import cache
+
+        snapshots = [ProfileRegistry.snapshot()]
+        keys = [key for key in cache.get(INDEX_KEY) or [] if key != ProfileRegistry._key]
+        snapshots.extend(cache.get_many(keys).values())
+
+        merged = {}
+        for snapshot in snapshots:
+            for name, data in snapshot.items():
+                histogram = LatencyHistogram(**data)
+                if name in merged:
+                    merged[name].merge(histogram)
+                else:
+                    merged[name] = histogram
+        return merged
+
+    @staticmethod
+    def reset():
+        from django.core.cache import cache
+
+        with ProfileRegistry._lock:
+            ProfileRegistry._histograms.clear()
+        cache.delete_many((cache.get(INDEX_KEY) or []) + [INDEX_KEY])
+
+
+class RequestProfile:
+    def __init__(self):
+        self.queries = 0
+        self.inner = {}
+        self.hooks = {}
+        self.layers = []
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def server_timing(self):
+        total = sum(seconds for _, _, seconds, _ in self.layers)
+        metrics = [
+            f'{name};dur={seconds * 1000:.3f};desc="{queries} queries"'
+            for _, name, seconds, queries in sorted(self.layers)
+        ]
+        metrics.append(f'middleware;dur={total * 1000:.3f}')
+        return ', '.join(metrics)
+
+
+def _add(totals, index, seconds, queries):
+    spent, count = totals.get(index, (0.0, 0))
+    totals[index] = (spent + seconds, count + queries)
+
+
+class _Downstream:
+    """Times everything below one layer (the rest of the chain and the view)."""
+
+    def __init__(self, get_response, index):
+        self.get_response = get_response
+        self.index = index
+
+    def __call__(self, request):
+        profile = request._middleware_profile
+        start, queries = time.perf_counter(), profile.queries
+        try:
+            return self.get_response(request)
+        finally:
+            _add(profile.inner, self.index, time.perf_counter() - start, profile.queries - queries)
+
+
+class ProfiledLayer:
+    """Wraps one middleware and records its self time and queries."""
+
+    sync_capable = True
+    async_capable = False
+    index = 0
+    path = ''
+
+    def __init__(self, get_response):
+        self.name = self.path.rsplit('.', 1)[-1]
+        self.middleware = import_string(self.path)(_Downstream(get_response, self.index))
+        # Django registers these hooks by hasattr() on the instance it is given
+        for hook in ('process_view', 'process_template_response', 'process_exception'):
+            if hasattr(self.middleware, hook):
+                setattr(self, hook, self._timed_hook(getattr(self.middleware, hook)))
+
+    def _timed_hook(self, hook):
+        def timed(request, *args):
+            profile = request._middleware_profile
+            start, queries = time.perf_counter(), profile.queries
+            try:
+                return hook(request, *args)
+            finally:
+                _add(profile.hooks, self.index, time.perf_counter() - start, profile.queries - queries)
+        return timed
+
+    def __call__(self, request):
+        if self.index == 0:
+            return self._profile_request(request)
+
+        profile = request._middleware_profile
+        start, queries = time.perf_counter(), profile.queries
+        try:
+            return self.middleware(request)
+        finally:
+            self._record(profile, time.perf_counter() - start, profile.queries - queries)
+
+    def _record(self, profile, seconds, queries):
+        inner_seconds, inner_queries = profile.inner.pop(self.index, (0.0, 0))
+        hook_seconds, hook_queries = profile.hooks.pop(self.index, (0.0, 0))
+        profile.layers.append((
+            self.index,
+            self.name,
+            max(0.0, seconds - inner_seconds + hook_seconds),
+            queries - inner_queries + hook_queries,
+        ))
+
+    def _profile_request(self, request):
+        from django.db import connections
+
+        profile = request._middleware_profile = RequestProfile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile.count_query))
+            start = time.perf_counter()
+            try:
+                response = self.middleware(request)
+            finally:
+                self._record(profile, time.perf_counter() - start, profile.queries)
+
+        ProfileRegistry.record(profile.layers)
+        existing = response.headers.get('Server-Timing')
+        timing = profile.server_timing()
+        response.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+        return response
@@ -68,10 +68,17 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'notifications.outbox.RealtimeOutboxMiddleware',
     'security.middleware.AuditLoggingMiddleware',
 ]
 
+# Opt-in per-layer middleware profiling: Server-Timing headers plus latency
+# histograms (see campusfix.profiling and `manage.py middleware_profile`).
+MIDDLEWARE_PROFILING = os.environ.get("CAMPUSFIX_PROFILE_MIDDLEWARE", "").lower() in ("1", "true", "yes")
+if MIDDLEWARE_PROFILING:
+    from campusfix.profiling import profile_middleware
+    MIDDLEWARE = profile_middleware(MIDDLEWARE)
+
 ROOT_URLCONF = 'campusfix.urls'
 
 TEMPLATES = [
@@ -187,11 +194,21 @@ LOGGING = {
         },
     },
     'handlers': {
+        # Non-blocking: a background thread writes JSON lines with
+        # size/time rotation and batched fsync (see security.audit_log).
+        # Each file needs a single writer: set CAMPUSFIX_AUDIT_LOG_PER_PROCESS=1
+        # when running several worker processes (logs/security.<pid>.log).
+        # The console echo runs on the same background thread.
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
+            'class': 'security.audit_log.AuditQueueHandler',
             'filename': BASE_DIR / 'logs' / 'security.log',
-            'formatter': 'verbose',
+            'max_bytes': 10 * 1024 * 1024,
+            'backup_count': 10,
+            'rotate_interval': 86400,
+            'fsync_interval': 1.0,
+            'per_process': os.environ.get('CAMPUSFIX_AUDIT_LOG_PER_PROCESS') == '1',
+            'console': True,
         },
         'console': {
             'level': 'INFO',
@@ -201,7 +218,7 @@ LOGGING = {
     },
     'loggers': {
         'security': {
-            'handlers': ['file', 'console'],
+            'handlers': ['file'],
             'level': 'INFO',
             'propagate': True,
         },
@@ -233,6 +250,20 @@ GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
 GEMINI_MODEL_ISSUES = os.environ.get("GEMINI_MODEL_ISSUES", "models/gemini-1.5-flash")
 GEMINI_FREE_MODEL = os.environ.get("GEMINI_FREE_MODEL", "models/gemini-1.5-flash")
 
+# Offline stand-ins for the Gemini API and SMTP (performance/regression testing).
+# Enabled by CAMPUSFIX_FAKE_GEMINI / CAMPUSFIX_EMAIL_SINK, set to "1" or to
+# fault options, e.g. "latency=0.8,jitter=0.4,error_rate=0.02,rate_limit_rate=0.1"
+# (see utils/fault_injection.py).
+from utils.fault_injection import parse_options
+
+if os.environ.get("CAMPUSFIX_FAKE_GEMINI"):
+    GEMINI_MODEL_CLASS = "issues.ai_fakes.FakeGenerativeModel"
+    GEMINI_FAKE = parse_options(os.environ["CAMPUSFIX_FAKE_GEMINI"])
+
+if os.environ.get("CAMPUSFIX_EMAIL_SINK"):
+    EMAIL_BACKEND = "utils.email_backends.SinkEmailBackend"
+    EMAIL_SINK = parse_options(os.environ["CAMPUSFIX_EMAIL_SINK"])
+
 USE_REDIS = os.environ.get("CAMPUSFIX_USE_REDIS", "0") == "1"
 
 # Cache configuration (rate limiting uses the default cache)
@@ -241,16 +272,37 @@ if USE_REDIS:
         'default': {
             'BACKEND': 'django.core.cache.backends.redis.RedisCache',
             'LOCATION': os.environ.get("CAMPUSFIX_REDIS_CACHE_URL", "redis://127.0.0.1:6379/1"),
-        }
+        },
+        # WebSocket presence counters (see notifications.presence)
+        'presence': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get("CAMPUSFIX_REDIS_CACHE_URL", "redis://127.0.0.1:6379/1"),
+            'KEY_PREFIX': 'presence',
+        },
     }
 else:
     CACHES = {
         "default": {
             "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
             "LOCATION": "campusfix-local-cache",
-        }
+        },
+        # Kept apart from the default cache so culling never drops presence counters
+        "presence": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "campusfix-presence",
+            "OPTIONS": {"MAX_ENTRIES": 100000},
+        },
     }
 
+# Security response headers, built once at startup by
+# security.middleware.SecurityHeadersMiddleware (per-path variants for API,
+# media and HTML pages; see security.headers). X-Frame-Options is set there
+# too, so Django's XFrameOptionsMiddleware is not installed.
+X_FRAME_OPTIONS = 'DENY'
+# Opt-in: adds 'nonce-...' to script-src on pages rendering {{ request.csp_nonce }}.
+# Browsers then ignore 'unsafe-inline', so every inline <script> must carry the nonce.
+SECURITY_CSP_NONCE = False
+
 # File Upload Security
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
@@ -275,7 +327,11 @@ DASHBOARD_CSRF_COOKIE_NAME = "dashboard_csrftoken"
 # Channels Configuration
 ASGI_APPLICATION = 'campusfix.asgi.application'
 
-# Channel Layer Configuration (Redis when enabled; in-memory by default)
+# Channel Layer Configuration (Redis when enabled; in-memory by default).
+# CAMPUSFIX_CHANNEL_LAYER=unix shares events between ASGI workers on one host
+# over Unix sockets, without Redis.
+CHANNEL_LAYER = os.environ.get("CAMPUSFIX_CHANNEL_LAYER", "memory")
+
 if USE_REDIS:
     CHANNEL_LAYERS = {
         'default': {
@@ -288,9 +344,22 @@ if USE_REDIS:
             },
         },
     }
+elif CHANNEL_LAYER == "unix":
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "campusfix.channel_layers.UnixSocketChannelLayer",
+            "CONFIG": {
+                "socket_dir": os.environ.get("CAMPUSFIX_CHANNEL_SOCKET_DIR") or None,
+            },
+        }
+    }
 else:
     CHANNEL_LAYERS = {
         "default": {
             "BACKEND": "channels.layers.InMemoryChannelLayer",
         }
     }
+
+# Presence counters live in a per-process cache unless Redis is used, so they
+# can only be trusted to skip sends when every socket is in one process.
+WEBSOCKET_PRESENCE_ENABLED = USE_REDIS or CHANNEL_LAYER != "unix"
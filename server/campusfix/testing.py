@@ -0,0 +1,237 @@
+"""
+Test helpers for query-count and latency budgets.
+
+Wrap the code under test in a budget and the test fails with the captured
+SQL when it issues more queries than allowed. Repeated statements are
+grouped (literals stripped) so an N+1 shows up as a single line with a
+count:
+
+    with QueryBudget(8, label="GET /api/issues/"):
+        self.client.get("/api/issues/")
+
+    @query_budget(5)
+    def test_dashboard_home(self):
+        ...
+
+`seed_volume()` bulk-loads a realistic data set (defaults: 10k issues,
+100k comments) so budgets are checked at production-like volume, where an
+N+1 cannot hide. Volumes can be lowered for quick local runs with the
+QUERY_BUDGET_ISSUES / QUERY_BUDGET_COMMENTS environment variables.
+"""
+
+import os
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ContextDecorator
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+SEED_ISSUES = int(os.environ.get("QUERY_BUDGET_ISSUES", "10000"))
+SEED_COMMENTS = int(os.environ.get("QUERY_BUDGET_COMMENTS", "100000"))
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"IN \((?:%s|\?)(?:, ?(?:%s|\?))*\)")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def normalize_sql(sql):
+    """Strip literals and collapse IN lists so repeated statements group together."""
+    return _IN_LISTS.sub("IN (...)", _LITERALS.sub("?", sql))
+
+
+def format_queries(queries, limit=20):
+    """Group captured queries by statement shape, most repeated first."""
+    counts = Counter(normalize_sql(query["sql"]) for query in queries)
+    lines = [f"  {count:>5} x {sql}" for sql, count in counts.most_common(limit)]
+    if len(counts) > limit:
+        lines.append(f"  ... and {len(counts) - limit} more distinct statements")
+    return "\n".join(lines)
+
+
+class QueryBudget(ContextDecorator):
+    """Fail when the wrapped block issues more than `max_queries` queries or takes longer than `max_ms`."""
+
+    def __init__(self, max_queries, max_ms=None, label=None, using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.max_ms = max_ms
+        self.label = label
+        self.capture = CaptureQueriesContext(connections[using])
+
+    def __enter__(self):
+        self.capture.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.elapsed_ms = (time.perf_counter() - self.started) * 1000
+        self.capture.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+
+        label = f"{self.label}: " if self.label else ""
+        queries = self.capture.captured_queries
+        if len(queries) > self.max_queries:
+            raise QueryBudgetExceeded(
+                f"{label}{len(queries)} queries, budget is {self.max_queries}:\n{format_queries(queries)}"
+            )
+        if self.max_ms is not None and self.elapsed_ms > self.max_ms:
+            raise QueryBudgetExceeded(
+                f"{label}took {self.elapsed_ms:.0f}ms, budget is {self.max_ms}ms "
+                f"({len(queries)} queries):\n{format_queries(queries)}"
+            )
+        return False
+
+    @property
+    def query_count(self):
+        return len(self.capture.captured_queries)
+
+
+def query_budget(max_queries, max_ms=None, label=None):
+    """Decorator form of QueryBudget."""
+    return QueryBudget(max_queries, max_ms=max_ms, label=label)
+
+
+class QueryBudgetMixin:
+    """TestCase mixin adding assertQueryBudget()."""
+
+    def assertQueryBudget(self, max_queries, func, *args, max_ms=None, label=None, **kwargs):
+        with QueryBudget(max_queries, max_ms=max_ms, label=label or getattr(func, "__name__", None)):
+            return func(*args, **kwargs)
+
+
+def seed_volume(issues=SEED_ISSUES, comments=SEED_COMMENTS, students=200, staff=20, seed=1234):
+    """
+    Bulk-create a realistic data set and return the users it created.
+
+    Issues spread over the last year across every category/status, about a
+    third assigned to staff; comments, upvotes, progress logs and feedback
+    are attached in proportion. Uses bulk_create, so model signals do not
+    fire; the search index is rebuilt at the end.
+    """
+    from accounts.models import User
+    from issues.models import Comment, Issue, IssueFeedback, IssueProgressLog, SLARule, Upvote
+    from issues.search import get_search_backend
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = User().password  # unusable; logins use force_login
+
+    admin = User.objects.create(
+        email="budget-admin@campusfix.test", first_name="Budget", last_name="Admin",
+        role="admin", is_staff=True, is_superuser=True, password=password,
+    )
+    staff_users = User.objects.bulk_create([
+        User(email=f"staff{i}@campusfix.test", first_name="Staff", last_name=str(i),
+             role="staff", is_staff=True, password=password)
+        for i in range(staff)
+    ])
+    student_users = User.objects.bulk_create([
+        User(email=f"student{i}@campusfix.test", first_name="Student", last_name=str(i),
+             role="student", password=password)
+        for i in range(students)
+    ])
+
+    SLARule.objects.bulk_create([
+        SLARule(category=category, response_time_hours=rng.choice([24, 48, 120]))
+        for category, _ in Issue.CATEGORY_CHOICES
+    ])
+
+    categories = [value for value, _ in Issue.CATEGORY_CHOICES]
+    statuses = [value for value, _ in Issue.STATUS_CHOICES]
+    priorities = [value for value, _ in Issue.PRIORITY_CHOICES]
+    locations = [f"Block {block} Room {room}" for block in "ABCDEFGH" for room in range(100, 120)]
+
+    issue_objects = []
+    created = []
+    for i in range(issues):
+        created_at = now - timedelta(minutes=rng.randint(0, 365 * 24 * 60))
+        created.append(created_at)
+        status = rng.choice(statuses)
+        assignee = rng.choice(staff_users) if staff_users and rng.random() < 0.35 else None
+        resolved_at = None
+        if status in ("resolved", "closed"):
+            resolved_at = min(now, created_at + timedelta(hours=rng.randint(1, 240)))
+        sla_due_at = created_at + timedelta(hours=rng.choice([24, 48, 120]))
+        issue_objects.append(Issue(
+            title=f"Issue {i}: broken fixture",
+            description="Reported during seeding; the fixture stopped working this morning.",
+            category=rng.choice(categories),
+            status=status,
+            priority=rng.choice(priorities),
+            location=rng.choice(locations),
+            visibility="public" if rng.random() < 0.8 else "private",
+            reporter=rng.choice(student_users),
+            assigned_to=assignee,
+            assigned_at=created_at + timedelta(hours=1) if assignee else None,
+            resolved_at=resolved_at,
+            sla_due_at=sla_due_at,
+            # Steady state: the overdue sweep has already flagged past-due issues
+            is_overdue=resolved_at is None and sla_due_at < now,
+            upvote_count=0,
+        ))
+    issue_objects = Issue.objects.bulk_create(issue_objects, batch_size=2000)
+
+    # auto_now_add overrides created_at on insert, so backdate it afterwards
+    # (plain executemany: bulk_update's CASE expressions are far slower here)
+    connection = connections[DEFAULT_DB_ALIAS]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {Issue._meta.db_table} SET created_at = %s WHERE id = %s",
+            [
+                (connection.ops.adapt_datetimefield_value(created_at), issue.pk)
+                for issue, created_at in zip(issue_objects, created)
+            ],
+        )
+    for issue, created_at in zip(issue_objects, created):
+        issue.created_at = created_at
+
+    commenters = student_users + staff_users
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                issue=rng.choice(issue_objects),
+                user=rng.choice(commenters),
+                content="Any update on this? It is still happening.",
+            )
+            for _ in range(comments)
+        ),
+        batch_size=5000,
+    )
+
+    upvotes = set()
+    for _ in range(issues):
+        upvotes.add((rng.choice(issue_objects).pk, rng.choice(student_users).pk))
+    Upvote.objects.bulk_create(
+        [Upvote(issue_id=issue_id, user_id=user_id) for issue_id, user_id in upvotes],
+        batch_size=5000,
+    )
+
+    assigned = [issue for issue in issue_objects if issue.assigned_to_id]
+    IssueProgressLog.objects.bulk_create(
+        [
+            IssueProgressLog(issue=issue, staff_id=issue.assigned_to_id,
+                             log_type="acknowledged", description="Acknowledged.")
+            for issue in assigned
+        ],
+        batch_size=5000,
+    )
+    IssueFeedback.objects.bulk_create(
+        [
+            IssueFeedback(issue=issue, user_id=issue.reporter_id, rating=rng.randint(1, 5))
+            for issue in issue_objects if issue.status in ("resolved", "closed")
+        ],
+        batch_size=5000,
+    )
+
+    # bulk_create skipped the signals that maintain the search index
+    get_search_backend().rebuild()
+
+    return {"admin": admin, "staff": staff_users, "students": student_users}
@@ -0,0 +1,148 @@
+"""
+Streaming CSV / XLSX exports for the admin dashboard.
+
+Rows are read with `.values_list(...).iterator(chunk_size=...)` and written
+to a StreamingHttpResponse as they arrive, so an export holds one chunk of
+rows in memory however large the table is.
+"""
+
+import csv
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, EmailField, F, Value, When
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from utils.xlsx import XLSX_CONTENT_TYPE, stream_xlsx
+
+CHUNK_SIZE = getattr(settings, "DASHBOARD_EXPORT_CHUNK_SIZE", 2000)
+FORMATS = ("csv", "xlsx")
+
+# Leading characters that make spreadsheet apps evaluate a cell as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+ISSUE_COLUMNS = [
+    ("ID", "id"),
+    ("Title", "title"),
+    ("Status", "status"),
+    ("Priority", "priority"),
+    ("Category", "category"),
+    ("Location", "location"),
+    # Annotated by visible_reporter()
+    ("Reporter", "reporter_email"),
+    ("Anonymous", "is_anonymous"),
+    ("Assigned To", "assigned_to__email"),
+    ("Upvotes", "upvote_count"),
+    ("Recurring", "is_recurring"),
+    ("Overdue", "is_overdue"),
+    ("SLA Due", "sla_due_at"),
+    ("Created", "created_at"),
+    ("Resolved", "resolved_at"),
+]
+WORK_LOG_COLUMNS = [
+    ("ID", "id"),
+    ("Issue", "issue_id"),
+    ("Issue Title", "issue__title"),
+    ("Logged By", "admin__email"),
+    ("Work Type", "work_type"),
+    ("Hours", "hours_spent"),
+    ("Description", "description"),
+    ("Materials", "materials_used"),
+    ("Outcome", "outcome"),
+    ("Next Steps", "next_steps"),
+    ("Created", "created_at"),
+]
+FEEDBACK_COLUMNS = [
+    ("ID", "id"),
+    ("Issue", "issue_id"),
+    ("Issue Title", "issue__title"),
+    ("Category", "issue__category"),
+    ("Assigned To", "issue__assigned_to__email"),
+    ("Rating", "rating"),
+    ("Comment", "comment"),
+    ("Created", "created_at"),
+]
+ANALYTICS_COLUMNS = [
+    ("ID", "id"),
+    ("Created", "created_at"),
+    ("Category", "category"),
+    ("Location", "location"),
+    ("Priority", "priority"),
+    ("Status", "status"),
+    ("Assigned To", "assigned_to__email"),
+    ("Resolved", "resolved_at"),
+    ("SLA Breached", "sla_breached"),
+    ("Upvotes", "upvote_count"),
+]
+
+
+def visible_reporter(issues_qs, user):
+    """
+    Annotate `reporter_email`, blank on anonymous issues unless `user` is a
+    superuser, as in the issue serializers.
+    """
+    if user.is_superuser:
+        return issues_qs.annotate(reporter_email=F("reporter__email"))
+    return issues_qs.annotate(reporter_email=Case(
+        When(is_anonymous=True, then=Value("")),
+        default=F("reporter__email"),
+        output_field=EmailField(),
+    ))
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def stream_rows(queryset, columns):
+    """Yield the header, then one tuple per row of `queryset` for `columns`."""
+    yield [header for header, _field in columns]
+    fields = [field for _header, field in columns]
+    yield from queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    # BOM so spreadsheet apps read the file as UTF-8
+    yield "\ufeff"
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def export_response(name, rows, fmt):
+    """A streaming download of `rows` as `fmt` (csv or xlsx)."""
+    filename = f"campusfix-{name}-{timezone.localdate():%Y%m%d}.{fmt}"
+    if fmt == "xlsx":
+        response = StreamingHttpResponse(
+            stream_xlsx(rows, sheet_name=name.replace("-", " ").title()),
+            content_type=XLSX_CONTENT_TYPE,
+        )
+    else:
+        response = StreamingHttpResponse(stream_csv(rows), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def created_between(queryset, date_from, date_to, field="created_at"):
+    """Filter `queryset` to rows created on the days date_from..date_to (either may be None)."""
+    if date_from:
+        queryset = queryset.filter(**{f"{field}__gte": _midnight(date_from)})
+    if date_to:
+        queryset = queryset.filter(**{f"{field}__lt": _midnight(date_to) + timedelta(days=1)})
+    return queryset
+
+
+def _midnight(day):
+    return timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time()))
@@ -0,0 +1,86 @@
+"""
+Version keys for cached dashboard template fragments.
+
+Heavy template blocks are wrapped in Django's `{% cache %}` tag and vary on
+one or more version tokens kept in the cache:
+
+    issues               any issue write (status breakdown, top lists, KPIs)
+    announcements        any announcement write
+    notifications:<id>   a write to one user's notifications
+
+Bumping a version replaces its token, so every fragment keyed on it misses
+on the next render and the stale copies simply expire. The bump waits for
+the writing transaction to commit, so no render can cache pre-commit data
+under the new token. Versions are bumped by the model signals in
+dashboard.signals; code that writes with QuerySet.update() or bulk_create()
+must call FragmentVersions.bump() itself.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.middleware.csrf import get_token
+
+VERSION_PREFIX = "dashboard_fragment_version"
+FRAGMENT_CACHE_SECONDS = getattr(settings, "DASHBOARD_FRAGMENT_CACHE_SECONDS", 300)
+
+
+def _version_key(name):
+    return f"{VERSION_PREFIX}:{name}"
+
+
+def _new_token():
+    # Never reuses an earlier token, even after the version key was evicted
+    return str(time.time_ns())
+
+
+def notifications_version(user_id):
+    return f"notifications:{user_id}"
+
+
+class FragmentVersions:
+    """Current version tokens of the fragment namespaces."""
+
+    @staticmethod
+    def get(*names):
+        """Map each of `names` to its version token, creating missing ones."""
+        keys = {_version_key(name): name for name in names}
+        found = cache.get_many(keys)
+        missing = {key: _new_token() for key in keys if key not in found}
+        if missing:
+            cache.set_many(missing, None)
+            found.update(missing)
+        return {keys[key]: token for key, token in found.items()}
+
+    @staticmethod
+    def bump(*names):
+        """Give `names` new tokens once the current transaction commits."""
+        transaction.on_commit(
+            lambda: cache.set_many({_version_key(name): _new_token() for name in names}, None)
+        )
+
+
+def fragment_context(request):
+    """
+    Template context for the cached dashboard fragments.
+
+    `fragment_scope` keys per-user fragments; it includes the CSRF secret
+    because those fragments render `{% csrf_token %}`, and a token cached
+    under an older secret would be rejected.
+    """
+    versions = FragmentVersions.get(
+        "issues", "announcements", notifications_version(request.user.pk)
+    )
+    get_token(request)
+    secret = request.META.get("CSRF_COOKIE", "")
+    scope = hashlib.sha256(f"{request.user.pk}:{secret}".encode()).hexdigest()
+    return {
+        "fragment_timeout": FRAGMENT_CACHE_SECONDS,
+        "fragment_scope": scope,
+        "issues_version": versions["issues"],
+        "announcements_version": versions["announcements"],
+        "notifications_version": versions[notifications_version(request.user.pk)],
+    }
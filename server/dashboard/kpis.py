@@ -0,0 +1,123 @@
+"""
+KPI blocks for the dashboard home page.
+
+Each block is computed with one conditional-aggregation query (plus, for
+admins, one grouped query for the month's top locations and categories)
+and cached per role, per user and per minute, so repeated loads of the home
+page do not recount the issues table. The key also carries the "issues"
+fragment version (dashboard.fragments), so any issue write starts a fresh
+entry instead of leaving the old counts in place for the rest of the minute.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q
+
+from issues.models import Issue
+
+from .fragments import FragmentVersions
+
+CACHE_PREFIX = "dashboard_home_kpis"
+# Length of a cache bucket; KPIs are at most this many seconds old
+KPI_CACHE_SECONDS = getattr(settings, "DASHBOARD_KPI_CACHE_SECONDS", 60)
+TOP_N = 3
+
+
+def _month_start(now):
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _top(counts, key):
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0] or ""))
+    return [{key: name, "count": count} for name, count in ranked[:TOP_N]]
+
+
+class HomeKPIs:
+    """Cached KPI blocks for the admin and staff dashboard home."""
+
+    @staticmethod
+    def cache_key(role, user_id, now):
+        bucket = int(now.timestamp() // KPI_CACHE_SECONDS)
+        version = FragmentVersions.get("issues")["issues"]
+        return f"{CACHE_PREFIX}:{role}:{user_id}:{bucket}:{version}"
+
+    @staticmethod
+    def for_admin(user, now):
+        key = HomeKPIs.cache_key("admin", user.pk, now)
+        kpis = cache.get(key)
+        if kpis is None:
+            kpis = HomeKPIs.compute_admin(now)
+            cache.set(key, kpis, KPI_CACHE_SECONDS)
+        return kpis
+
+    @staticmethod
+    def for_staff(user, now):
+        key = HomeKPIs.cache_key("staff", user.pk, now)
+        kpis = cache.get(key)
+        if kpis is None:
+            kpis = HomeKPIs.compute_staff(user, now)
+            cache.set(key, kpis, KPI_CACHE_SECONDS)
+        return kpis
+
+    @staticmethod
+    def compute_admin(now):
+        start_of_month = _month_start(now)
+        resolved_this_month = Q(
+            status__in=["resolved", "closed"],
+            resolved_at__gte=start_of_month,
+            resolved_at__lte=now,
+        )
+        resolution_time = ExpressionWrapper(
+            F("resolved_at") - F("created_at"), output_field=DurationField()
+        )
+        aggregates = {
+            "total_issues": Count("id"),
+            "open_issues": Count("id", filter=Q(status__in=["open", "in-progress"])),
+            "resolved_this_month": Count("id", filter=resolved_this_month),
+            "avg_resolution": Avg(resolution_time, filter=resolved_this_month),
+        }
+        for status, _label in Issue.STATUS_CHOICES:
+            aggregates[f"status:{status}"] = Count("id", filter=Q(status=status))
+        stats = Issue.objects.aggregate(**aggregates)
+
+        avg_resolution = stats.pop("avg_resolution") or timedelta(0)
+        issues_by_status = []
+        for status, _label in sorted(Issue.STATUS_CHOICES):
+            count = stats.pop(f"status:{status}")
+            if count:
+                issues_by_status.append({"status": status, "count": count})
+
+        # One grouped read serves both "top" lists
+        locations, categories = {}, {}
+        month_rows = (
+            Issue.objects.filter(created_at__gte=start_of_month, created_at__lte=now)
+            .values_list("location", "category")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        for location, category, count in month_rows:
+            locations[location] = locations.get(location, 0) + count
+            categories[category] = categories.get(category, 0) + count
+
+        return {
+            **stats,
+            "avg_resolution_days": round(avg_resolution.total_seconds() / 86400, 1),
+            "issues_by_status": issues_by_status,
+            "top_locations": _top(locations, "location"),
+            "top_categories": _top(categories, "category"),
+        }
+
+    @staticmethod
+    def compute_staff(user, now):
+        return Issue.objects.filter(assigned_to=user).aggregate(
+            my_open_issues=Count("id", filter=Q(status__in=["open", "in-progress"])),
+            resolved_this_month=Count("id", filter=Q(
+                status="resolved",
+                resolved_at__gte=_month_start(now),
+                resolved_at__lte=now,
+            )),
+            awaiting_verification=Count("id", filter=Q(status="awaiting_verification")),
+            blocked_issues=Count("id", filter=Q(is_blocked=True)),
+        )
@@ -0,0 +1,31 @@
+"""
+Paginator whose total comes from the cache.
+
+Counting every issue on each page of an unfiltered list is a full scan;
+the total shown there only needs to be roughly right, so it is cached for
+a short while and shared by every page and every reader of the same list.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+COUNT_CACHE_SECONDS = getattr(settings, "DASHBOARD_LIST_COUNT_CACHE_SECONDS", 60)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator reading `count` from the cache under `cache_key`."""
+
+    def __init__(self, object_list, per_page, cache_key, timeout=COUNT_CACHE_SECONDS, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = super().count
+            cache.set(self.cache_key, count, self.timeout)
+        return count
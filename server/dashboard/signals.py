@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from issues.models import Issue
+from notifications.models import Announcement, Notification
+
+from .fragments import FragmentVersions, notifications_version
+
+
+@receiver(post_save, sender=Issue)
+@receiver(post_delete, sender=Issue)
+def issue_changed(sender, instance, **kwargs):
+    FragmentVersions.bump("issues")
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def announcement_changed(sender, instance, **kwargs):
+    FragmentVersions.bump("announcements")
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    FragmentVersions.bump(notifications_version(instance.user_id))
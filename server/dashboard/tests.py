@@ -0,0 +1,469 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+import csv
+import io
+import json
+import zipfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from campusfix.testing import QueryBudget, seed_volume
+from issues.models import (
+    AdminWorkLog, Issue, IssueFeedback, IssueProgressLog, MaintenanceTask, MaintenanceWindow,
+)
+from notifications.models import Announcement, Notification
+
+from .fragments import FragmentVersions
+from .kpis import HomeKPIs
+
+
+class DashboardQueryBudgetTests(TestCase):
+    """
+    Query budgets for the dashboard pages at seeded volume
+    (10k issues / 100k comments by default, see campusfix.testing).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        users = seed_volume()
+        cls.admin = users["admin"]
+        cls.staff = users["staff"][0]
+        # the most-discussed issue, so per-comment queries would show up
+        cls.issue = Issue.objects.annotate(n=Count("comments")).order_by("-n").first()
+        cls.assigned_issue = Issue.objects.filter(assigned_to=cls.staff).first()
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, user):
+        self.client.force_login(user)
+        # the dashboard uses its own session cookie (PathBasedSessionMiddleware)
+        session_key = self.client.cookies["sessionid"].value
+        self.client.cookies["dashboard_sessionid"] = session_key
+        self.client.cookies["admin_sessionid"] = session_key
+
+    def get(self, budget, url, max_ms=None):
+        with QueryBudget(budget, max_ms=max_ms, label=f"GET {url}"):
+            response = self.client.get(url)
+            if response.streaming:
+                # Streamed bodies run their queries as they are read
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_admin_pages(self):
+        self.login(self.admin)
+        pages = [
+            (9, reverse("dashboard:home")),
+            # KPI block served from the cache
+            (7, reverse("dashboard:home")),
+            (8, reverse("dashboard:issues_list")),
+            (8, reverse("dashboard:issues_list") + "?status=open&category=electrical&search=fixture"),
+            (10, reverse("dashboard:issue_detail", args=[self.issue.pk])),
+            (7, reverse("dashboard:users")),
+            (7, reverse("dashboard:staff")),
+            (20, reverse("dashboard:analytics")),
+            (7, reverse("dashboard:calendar")),
+            (6, reverse("dashboard:calendar_events_api")),
+            (6, reverse("dashboard:calendar_events_api") + "?start=2025-01-01T00:00:00Z&end=2025-02-01T00:00:00Z"),
+            (7, reverse("dashboard:announcements")),
+            (7, reverse("dashboard:settings")),
+        ]
+        for budget, url in pages:
+            with self.subTest(url=url):
+                self.get(budget, url)
+
+    def test_staff_pages(self):
+        self.login(self.staff)
+        pages = [
+            (8, reverse("dashboard:home")),
+            (8, reverse("dashboard:issues_list")),
+            (10, reverse("dashboard:issue_detail", args=[self.assigned_issue.pk])),
+            (6, reverse("dashboard:calendar")),
+            (6, reverse("dashboard:calendar_events_api")),
+        ]
+        for budget, url in pages:
+            with self.subTest(url=url):
+                self.get(budget, url)
+
+    def test_quick_update(self):
+        self.login(self.admin)
+        Issue.objects.filter(pk=self.issue.pk).update(status="open")
+        url = reverse("dashboard:issue_quick_update", args=[self.issue.pk])
+        # save() signals: recurrence check, reporter notification (and its preferences row)
+        with QueryBudget(11, label=f"POST {url}"):
+            response = self.client.post(url, {"status": "in-progress"})
+        self.assertEqual(response.status_code, 302)
+        self.issue.refresh_from_db()
+        self.assertEqual(self.issue.status, "in-progress")
+
+    def test_generate_ai_report(self):
+        self.login(self.admin)
+        with mock.patch("issues.ai_services.ai_service") as ai_service:
+            ai_service.is_available.return_value = True
+            ai_service.generate_monthly_report.return_value = "Report"
+            with QueryBudget(13, label="POST generate-ai-report"):
+                response = self.client.post(reverse("dashboard:generate_ai_report"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_admin_issue_change_page(self):
+        # comments_chat_display renders every comment with its author
+        self.login(self.admin)
+        self.get(10, reverse("admin:issues_issue_change", args=[self.issue.pk]))
+
+
+class HomeKPIsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", password="pass12345", role="admin")
+        cls.staff = User.objects.create_user(email="staff@example.com", password="pass12345", role="staff")
+        reporter = User.objects.create_user(email="reporter@example.com", password="pass12345")
+        rows = [
+            ("open", "Block A", "plumbing", None),
+            ("open", "Block A", "electrical", cls.staff),
+            ("in-progress", "Block B", "plumbing", cls.staff),
+            ("resolved", "Block A", "plumbing", cls.staff),
+            ("awaiting_verification", "Block C", "safety", cls.staff),
+        ]
+        for status, location, category, assignee in rows:
+            Issue.objects.create(
+                title=f"{category} in {location}", description="Needs attention", status=status,
+                location=location, category=category, reporter=reporter, assigned_to=assignee,
+            )
+        now = timezone.now()
+        Issue.objects.filter(status="resolved").update(resolved_at=now, created_at=now - timedelta(days=2))
+        Issue.objects.filter(status="in-progress").update(is_blocked=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_admin_kpis_in_two_queries(self):
+        now = timezone.now()
+        with self.assertNumQueries(2):
+            kpis = HomeKPIs.for_admin(self.admin, now)
+        self.assertEqual(kpis["total_issues"], 5)
+        self.assertEqual(kpis["open_issues"], 3)
+        self.assertEqual(kpis["resolved_this_month"], 1)
+        self.assertEqual(kpis["avg_resolution_days"], 2.0)
+        self.assertIn({"status": "open", "count": 2}, kpis["issues_by_status"])
+        self.assertEqual(kpis["top_locations"][0], {"location": "Block A", "count": 3})
+        self.assertEqual(kpis["top_categories"][0], {"category": "plumbing", "count": 3})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(HomeKPIs.for_admin(self.admin, now), kpis)
+
+    def test_staff_kpis_in_one_query_per_user(self):
+        now = timezone.now()
+        with self.assertNumQueries(1):
+            kpis = HomeKPIs.for_staff(self.staff, now)
+        self.assertEqual(kpis, {
+            "my_open_issues": 2, "resolved_this_month": 1,
+            "awaiting_verification": 1, "blocked_issues": 1,
+        })
+        # Cached per user and per minute
+        with self.assertNumQueries(1):
+            HomeKPIs.for_staff(self.admin, now)
+        with self.assertNumQueries(1):
+            HomeKPIs.for_staff(self.staff, now + timedelta(minutes=1))
+
+
+class CalendarEventsWindowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", password="pass12345", role="admin")
+        cls.staff = User.objects.create_user(email="staff@example.com", password="pass12345", role="staff")
+        reporter = User.objects.create_user(email="reporter@example.com", password="pass12345")
+
+        def day(n, hour=9):
+            return datetime(2025, 3, n, hour, tzinfo=dt_timezone.utc)
+
+        def issue(title, created, deadline, **fields):
+            created_issue = Issue.objects.create(
+                title=title, description="Needs attention", location="Block A", category="plumbing",
+                reporter=reporter, assigned_to=cls.staff, **fields,
+            )
+            Issue.objects.filter(pk=created_issue.pk).update(created_at=created, sla_deadline=deadline)
+            return created_issue
+
+        cls.inside = issue("Inside", day(10), day(12))
+        cls.before = issue("Before", day(1), day(2))
+        cls.after = issue("After", day(25), day(27))
+        # Reported before the window, still open inside it
+        cls.spanning = issue("Spanning", day(1), day(20))
+        IssueProgressLog.objects.create(
+            issue=cls.inside, staff=cls.staff, log_type="acknowledged", description="On it",
+        )
+        IssueProgressLog.objects.create(
+            issue=cls.inside, staff=cls.staff, log_type="acknowledged", description="Again",
+        )
+        IssueProgressLog.objects.filter(issue=cls.inside, description="On it").update(created_at=day(11))
+        IssueProgressLog.objects.filter(issue=cls.inside, description="Again").update(created_at=day(11, 15))
+
+        MaintenanceWindow.objects.create(
+            title="Water off", description="Pipes", scheduled_start=day(14), scheduled_end=day(14, 12),
+        )
+        MaintenanceWindow.objects.create(
+            title="Power off", description="Wiring", scheduled_start=day(28), scheduled_end=day(28, 12),
+        )
+        MaintenanceTask.objects.create(title="Inspect boiler", location="Block B", scheduled_for=day(15))
+        MaintenanceTask.objects.create(title="Inspect lifts", location="Block C", scheduled_for=day(2))
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.client.cookies["dashboard_sessionid"] = self.client.cookies["sessionid"].value
+
+    def events(self, query=""):
+        response = self.client.get(reverse("dashboard:calendar_events_api") + query)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_only_events_overlapping_the_range(self):
+        events = self.events("?start=2025-03-08T00:00:00Z&end=2025-03-22T00:00:00Z")
+        self.assertEqual(
+            sorted(event["title"] for event in events),
+            ["Issue #%d: Inside" % self.inside.pk, "Issue #%d: Spanning" % self.spanning.pk,
+             "Maintenance: Water off", "🛠️ Inspect boiler"],
+        )
+        inside = next(event for event in events if event["id"] == f"is_{self.inside.pk}")
+        # Starts at the first acknowledgement
+        self.assertEqual(datetime.fromisoformat(inside["start"]), datetime(2025, 3, 11, 9, tzinfo=dt_timezone.utc))
+
+    def test_date_only_bounds_and_no_bounds(self):
+        self.assertEqual(len(self.events("?start=2025-03-24&end=2025-03-31")), 2)
+        self.assertEqual(len(self.events()), 8)
+
+    def test_query_count_does_not_grow_with_events(self):
+        # active-maintenance banner, session, user, then windows, tasks and issues
+        with self.assertNumQueries(6):
+            self.events("?start=2025-03-01&end=2025-04-01")
+
+    def test_malformed_bounds(self):
+        response = self.client.get(reverse("dashboard:calendar_events_api") + "?start=soon")
+        self.assertEqual(response.status_code, 400)
+
+
+class IssueListFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", password="pass12345", role="admin")
+        reporter = User.objects.create_user(
+            email="jane@example.com", password="pass12345", first_name="Jane", last_name="Mwangi",
+        )
+        other = User.objects.create_user(email="sam@example.com", password="pass12345", first_name="Sam")
+        for title, author, created in [
+            ("Broken tap", reporter, datetime(2025, 3, 10, 0, 0, tzinfo=dt_timezone.utc)),
+            ("Dim lights", other, datetime(2025, 3, 11, 23, 59, tzinfo=dt_timezone.utc)),
+            ("Loose tiles", other, datetime(2025, 3, 12, 0, 0, tzinfo=dt_timezone.utc)),
+        ]:
+            issue = Issue.objects.create(
+                title=title, description="Needs attention", location="Block A", category="plumbing",
+                reporter=author,
+            )
+            Issue.objects.filter(pk=issue.pk).update(created_at=created)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.client.cookies["dashboard_sessionid"] = self.client.cookies["sessionid"].value
+
+    def titles(self, query):
+        response = self.client.get(reverse("dashboard:issues_list") + query)
+        self.assertEqual(response.status_code, 200)
+        return sorted(issue.title for issue in response.context["page_obj"])
+
+    def test_date_range_includes_whole_days(self):
+        self.assertEqual(self.titles("?date_from=2025-03-10&date_to=2025-03-11"), ["Broken tap", "Dim lights"])
+        self.assertEqual(self.titles("?date_from=2025-03-12"), ["Loose tiles"])
+        # Malformed dates are ignored rather than failing the page
+        self.assertEqual(len(self.titles("?date_from=2025-13-40")), 3)
+
+    def test_search_matches_reporter_without_join(self):
+        self.assertEqual(self.titles("?q=mwangi"), ["Broken tap"])
+        self.assertEqual(self.titles("?q=tiles"), ["Loose tiles"])
+
+    def test_search_without_words_only_matches_reporters(self):
+        self.assertEqual(self.titles("?q=%23"), [])
+        self.assertEqual(self.titles("?q=-"), [])
+        self.assertEqual(self.titles("?q=@example"), ["Broken tap", "Dim lights", "Loose tiles"])
+        response = self.client.get(reverse("dashboard:export_issues", args=["csv"]) + "?q=%23")
+        self.assertEqual(response.status_code, 200)
+
+    def test_unfiltered_total_is_cached(self):
+        url = reverse("dashboard:issues_list")
+        self.assertEqual(self.client.get(url).context["page_obj"].paginator.count, 3)
+        Issue.objects.filter(title="Loose tiles").delete()
+        self.assertEqual(self.client.get(url).context["page_obj"].paginator.count, 3)
+        # Filtered views count exactly
+        self.assertEqual(self.client.get(url + "?category=plumbing").context["page_obj"].paginator.count, 2)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", password="pass12345", role="admin")
+        cls.staff = User.objects.create_user(
+            email="staff@example.com", password="pass12345", role="staff", is_staff=True,
+        )
+        reporter = User.objects.create_user(email="reporter@example.com", password="pass12345")
+        cls.issues = []
+        for title, category, assignee in [
+            ("=HYPERLINK(\"http://evil\")", "plumbing", cls.staff),
+            ("Dim lights", "electrical", None),
+            ("Leaking pipe", "plumbing", None),
+        ]:
+            cls.issues.append(Issue.objects.create(
+                title=title, description="Needs attention", location="Block A", category=category,
+                reporter=reporter, assigned_to=assignee,
+            ))
+        AdminWorkLog.objects.create(
+            issue=cls.issues[0], admin=cls.admin, work_type="repair", hours_spent="1.50",
+            description="Replaced washer", outcome="Fixed",
+        )
+        old_log = AdminWorkLog.objects.create(
+            issue=cls.issues[1], admin=cls.admin, work_type="inspection", hours_spent="0.50",
+            description="Checked wiring", outcome="Ordered parts",
+        )
+        AdminWorkLog.objects.filter(pk=old_log.pk).update(created_at=timezone.now() - timedelta(days=60))
+        IssueFeedback.objects.create(issue=cls.issues[0], user=reporter, rating=4, comment="Quick fix")
+
+    def login(self, user):
+        self.client.force_login(user)
+        self.client.cookies["dashboard_sessionid"] = self.client.cookies["sessionid"].value
+
+    def csv_rows(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_issue_export_applies_list_filters(self):
+        self.login(self.admin)
+        rows = self.csv_rows(reverse("dashboard:export_issues", args=["csv"]) + "?category=plumbing")
+        self.assertEqual(rows[0][:3], ["ID", "Title", "Status"])
+        self.assertEqual(sorted(row[0] for row in rows[1:]), sorted(str(i.pk) for i in (self.issues[0], self.issues[2])))
+        # Formula-like cells are neutralised
+        self.assertIn("'=HYPERLINK(\"http://evil\")", [row[1] for row in rows])
+
+    def test_issue_export_hides_anonymous_reporters(self):
+        Issue.objects.filter(pk=self.issues[1].pk).update(is_anonymous=True)
+        url = reverse("dashboard:export_issues", args=["csv"])
+        self.login(self.admin)
+        reporters = {row[0]: row[6] for row in self.csv_rows(url)[1:]}
+        self.assertEqual(reporters[str(self.issues[1].pk)], "")
+        self.assertEqual(reporters[str(self.issues[2].pk)], "reporter@example.com")
+
+        superuser = User.objects.create_superuser(email="root@example.com", password="pass12345", role="admin")
+        self.login(superuser)
+        reporters = {row[0]: row[6] for row in self.csv_rows(url)[1:]}
+        self.assertEqual(reporters[str(self.issues[1].pk)], "reporter@example.com")
+
+    def test_staff_export_only_assigned(self):
+        self.login(self.staff)
+        rows = self.csv_rows(reverse("dashboard:export_issues", args=["csv"]))
+        self.assertEqual([row[0] for row in rows[1:]], [str(self.issues[0].pk)])
+
+    def test_xlsx_export(self):
+        self.login(self.admin)
+        response = self.client.get(reverse("dashboard:export_issues", args=["xlsx"]))
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row "), 4)
+        self.assertIn("Leaking pipe", sheet)
+
+    def test_work_log_and_feedback_date_range(self):
+        self.login(self.admin)
+        since = (timezone.localdate() - timedelta(days=7)).isoformat()
+        rows = self.csv_rows(reverse("dashboard:export_work_logs", args=["csv"]) + f"?date_from={since}")
+        self.assertEqual([row[6] for row in rows[1:]], ["Replaced washer"])
+        self.assertEqual(len(self.csv_rows(reverse("dashboard:export_work_logs", args=["csv"]))), 3)
+        rows = self.csv_rows(reverse("dashboard:export_feedback", args=["csv"]))
+        self.assertEqual(rows[1][5:7], ["4", "Quick fix"])
+
+    def test_analytics_export_and_query_count(self):
+        self.login(self.admin)
+        url = reverse("dashboard:export_analytics", args=["csv"]) + "?range=7"
+        # active-maintenance banner, session, user, then the rows
+        with self.assertNumQueries(4):
+            rows = self.csv_rows(url)
+        self.assertEqual(len(rows), 4)
+
+    def test_unknown_format(self):
+        self.login(self.admin)
+        response = self.client.get(reverse("dashboard:export_issues", args=["pdf"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", password="pass12345", role="admin")
+        reporter = User.objects.create_user(email="reporter@example.com", password="pass12345")
+        cls.issue = Issue.objects.create(
+            title="Broken tap", description="Kitchen tap", location="Block A", category="plumbing",
+            reporter=reporter,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.client.cookies["dashboard_sessionid"] = self.client.cookies["sessionid"].value
+
+    def home(self):
+        response = self.client.get(reverse("dashboard:home"))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_repeat_view_skips_fragment_queries(self):
+        self.home()
+        with CaptureQueriesContext(connection) as warm:
+            self.home()
+        self.assertFalse(any("notifications_notification" in q["sql"] for q in warm.captured_queries))
+
+    def test_notification_write_refreshes_dropdown(self):
+        self.assertIn("No assignment notifications yet.", self.home())
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(
+                user=self.admin, title="Assigned: Broken tap", message="Please look",
+                notification_type="assignment", related_issue=self.issue,
+            )
+        page = self.home()
+        self.assertIn("Assigned: Broken tap", page)
+        self.assertNotIn("No assignment notifications yet.", page)
+
+        # QuerySet.update() bypasses signals; the view bumps the version itself
+        before = FragmentVersions.get("notifications:%d" % self.admin.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("dashboard:assignment_notifications_mark_all_read"))
+        self.assertNotEqual(FragmentVersions.get("notifications:%d" % self.admin.pk), before)
+
+    def test_issue_and_announcement_writes_refresh_home(self):
+        self.assertIn("<strong>Open</strong>", self.home())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.issue.status = "in-progress"
+            self.issue.save()
+        page = self.home()
+        self.assertIn("<strong>In-progress</strong>", page)
+        self.assertNotIn("<strong>Open</strong>", page)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            announcement = Announcement.objects.create(title="Water off", body="Friday 9-11")
+        self.assertIn("Water off", self.home())
+        with self.captureOnCommitCallbacks(execute=True):
+            announcement.title = "Water back on"
+            announcement.save()
+        self.assertIn("Water back on", self.home())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("dashboard:dismiss_announcement", args=[announcement.pk]))
+        self.assertNotIn("Water back on", self.home())
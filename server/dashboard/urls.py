@@ -19,6 +19,10 @@ urlpatterns = [
     path("users/", views.user_management, name="users"),
     path("staff/", views.staff_overview, name="staff"),
     path("analytics/", views.analytics, name="analytics"),
+    path("export/issues.<str:fmt>", views.export_issues, name="export_issues"),
+    path("export/work-logs.<str:fmt>", views.export_work_logs, name="export_work_logs"),
+    path("export/feedback.<str:fmt>", views.export_feedback, name="export_feedback"),
+    path("export/analytics.<str:fmt>", views.export_analytics, name="export_analytics"),
     path("generate-ai-report/", views.generate_ai_report, name="generate_ai_report"),
     path("calendar/", views.calendar, name="calendar"),
     path("api/calendar-events/", views.calendar_events_api, name="calendar_events_api"),
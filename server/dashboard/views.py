@@ -1,5 +1,6 @@
 from datetime import timedelta, datetime
 import json
+from urllib.parse import urlencode
 
 from django.contrib import messages
 from django.contrib.auth import login as auth_login, logout as auth_logout
@@ -10,22 +11,48 @@ from django.db.models import (
     Avg,
     Case,
     Count,
-    DurationField,
+    DateTimeField,
     ExpressionWrapper,
     F,
     IntegerField,
+    Min,
+    OuterRef,
+    Prefetch,
     Q,
+    Subquery,
     Value,
     When,
 )
+from django.db.models.functions import Coalesce
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.functional import SimpleLazyObject
 from django.views.decorators.http import require_http_methods
 
 from accounts.decorators import admin_required, superuser_required
 from accounts.models import User
-from issues.models import Issue, IssueProgressLog, SLARule, MaintenanceTask, IssueFeedback, MaintenanceWindow
+from issues.models import (
+    AdminWorkLog,
+    Attachment,
+    Comment,
+    Issue,
+    IssueFeedback,
+    IssueProgressLog,
+    MaintenanceTask,
+    MaintenanceWindow,
+    SLARule,
+)
 from issues.analytics import AnalyticsService
+from issues.search import get_search_backend
+from issues.services import bulk_transition_status
+from issues.workload import WorkloadService
+from . import exports
+from .fragments import FragmentVersions, fragment_context, notifications_version
+from .kpis import HomeKPIs
+from .pagination import CachedCountPaginator
+from notifications.announcements import ActiveAnnouncements
 from notifications.models import Notification, Announcement, AnnouncementDismissal
 from notifications.services import NotificationService
 from utils.email_service import send_account_deactivation_email
@@ -85,52 +112,47 @@ def dashboard_logout(request):
 def _get_active_context(request, active_page):
     """
     Base context for all dashboard pages, including notification badge counts.
+
+    The notification values are lazy: the dropdown is a cached fragment
+    (see dashboard.fragments), so they are only queried when it is rendered.
     """
-    assignment_unread = 0
-    assignment_notifications = []
+    context = {
+        "active_page": active_page,
+        "assignment_unread_count": 0,
+        "assignment_notifications": [],
+    }
     if request.user.is_authenticated:
-        assignment_unread = Notification.objects.filter(
+        assignments = Notification.objects.filter(
             user=request.user,
             notification_type="assignment",
-            is_read=False,
-        ).count()
-        assignment_notifications = list(
-            Notification.objects.filter(
-                user=request.user,
-                notification_type="assignment",
-            )
-            .select_related("related_issue")
-            .order_by("-created_at")[:10]
         )
-
-    return {
-        "active_page": active_page,
-        "assignment_unread_count": assignment_unread,
-        "assignment_notifications": assignment_notifications,
-    }
+        context.update(
+            fragment_context(request),
+            assignment_unread_count=SimpleLazyObject(assignments.filter(is_read=False).count),
+            assignment_notifications=(
+                assignments.select_related("related_issue").order_by("-created_at")[:10]
+            ),
+        )
+    return context
 
 
 @admin_required
 def dashboard_home(request):
     """Admin dashboard overview at /dashboard/."""
     now = timezone.now()
-    start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
     is_staff_view = request.user.role == "staff" and not request.user.is_superuser
+    announcements = ActiveAnnouncements.undismissed(request.user, ActiveAnnouncements.active(now))
+    announcement_context = {
+        "announcements": announcements,
+        # Part of the cached fragment's key: dismissals and expiry change it
+        "announcement_ids": ",".join(str(a.pk) for a in announcements),
+    }
 
     # Staff dashboard home is scoped to assigned issues only
     if is_staff_view:
         base_qs = Issue.objects.filter(assigned_to=request.user)
 
-        my_open_issues = base_qs.filter(status__in=["open", "in-progress"]).count()
-        resolved_this_month = base_qs.filter(
-            status="resolved",
-            resolved_at__gte=start_of_month,
-            resolved_at__lte=now,
-        ).count()
-        awaiting_verification = base_qs.filter(status="awaiting_verification").count()
-        blocked_issues = base_qs.filter(is_blocked=True).count()
-
         status_filter = request.GET.get("status") or ""
         sort = request.GET.get("sort") or "priority"
 
@@ -162,110 +184,24 @@ def dashboard_home(request):
         context = {
             **_get_active_context(request, "home"),
             "is_staff_home": True,
-            "my_open_issues": my_open_issues,
-            "resolved_this_month": resolved_this_month,
-            "awaiting_verification": awaiting_verification,
-            "blocked_issues": blocked_issues,
+            **HomeKPIs.for_staff(request.user, now),
             "issues": issues_qs,
             "status_filter": status_filter,
             "sort": sort,
             "status_choices": Issue.STATUS_CHOICES,
-            "announcements": Announcement.objects.filter(
-                is_active=True
-            ).exclude(dismissals__user=request.user).filter(
-                Q(expires_at__isnull=True) | Q(expires_at__gt=now)
-            ),
+            **announcement_context,
         }
         return render(request, "dashboard/home.html", context)
 
-    # Admin/superuser overview stays campus-wide
-    base_qs = Issue.objects.all()
-
-    # Update SLA overdue flags for any issues that have crossed their SLA deadline
-    overdue_candidates = base_qs.filter(
-        sla_due_at__isnull=False,
-        is_overdue=False,
-        status__in=["open", "in-progress", "awaiting_verification", "reopened"],
-    )
-    newly_overdue_ids = []
-    for issue in overdue_candidates:
-        if issue.sla_due_at and now > issue.sla_due_at:
-            issue.is_overdue = True
-            issue.save(update_fields=["is_overdue", "updated_at"])
-            newly_overdue_ids.append(issue.id)
-
-    if newly_overdue_ids:
-        admins = User.objects.filter(Q(is_superuser=True) | Q(role="admin")).distinct()
-        for admin_user in admins:
-            for issue in Issue.objects.filter(id__in=newly_overdue_ids):
-                NotificationService.create_notification(
-                    user=admin_user,
-                    title=f"Issue #{issue.id} is overdue",
-                    message=f"Issue '{issue.title}' has exceeded its SLA deadline.",
-                    notification_type="status_change",
-                    related_issue=issue,
-                )
-
-    total_issues = base_qs.count()
-    open_issues = base_qs.filter(status__in=["open", "in-progress"]).count()
-
-    resolved_this_month_qs = base_qs.filter(
-        status__in=["resolved", "closed"],
-        resolved_at__gte=start_of_month,
-        resolved_at__lte=now,
-    )
-    resolved_this_month = resolved_this_month_qs.count()
-
-    resolution_time = ExpressionWrapper(
-        F("resolved_at") - F("created_at"), output_field=DurationField()
-    )
-    avg_resolution = (
-        resolved_this_month_qs.annotate(resolution_time=resolution_time).aggregate(
-            avg=Avg("resolution_time")
-        )["avg"]
-        or timedelta(0)
-    )
-    avg_resolution_days = (
-        round(avg_resolution.total_seconds() / 86400, 1) if avg_resolution else 0
-    )
-
-    recent_issues = base_qs.select_related("reporter").order_by("-created_at")[:10]
-
-    issues_by_status = (
-        base_qs.values("status").annotate(count=Count("id")).order_by("status")
-    )
-
-    month_issues = base_qs.filter(
-        created_at__gte=start_of_month,
-        created_at__lte=now,
-    )
-
-    top_locations = (
-        month_issues.values("location")
-        .annotate(count=Count("id"))
-        .order_by("-count")[:3]
-    )
-    top_categories = (
-        month_issues.values("category")
-        .annotate(count=Count("id"))
-        .order_by("-count")[:3]
-    )
+    # Admin/superuser overview stays campus-wide (overdue flags are set by
+    # the mark_overdue_issues job, not on page load)
+    recent_issues = Issue.objects.select_related("reporter").order_by("-created_at")[:10]
 
     context = {
         **_get_active_context(request, "home"),
-        "total_issues": total_issues,
-        "open_issues": open_issues,
-        "announcements": Announcement.objects.filter(
-            is_active=True
-        ).exclude(dismissals__user=request.user).filter(
-            Q(expires_at__isnull=True) | Q(expires_at__gt=now)
-        ),
-        "resolved_this_month": resolved_this_month,
-        "avg_resolution_days": avg_resolution_days,
+        **HomeKPIs.for_admin(request.user, now),
+        **announcement_context,
         "recent_issues": recent_issues,
-        "issues_by_status": issues_by_status,
-        "top_locations": top_locations,
-        "top_categories": top_categories,
     }
     return render(request, "dashboard/home.html", context)
 
@@ -274,13 +210,15 @@ def dashboard_home(request):
 def issue_list(request):
     """Paginated issue management list with filters and search."""
     # Staff users should only see issues assigned to them
-    if request.user.role == "staff" and not request.user.is_superuser:
+    is_staff_view = request.user.role == "staff" and not request.user.is_superuser
+    if is_staff_view:
         issues_qs = Issue.objects.select_related("reporter").filter(
             assigned_to=request.user
         )
     else:
         issues_qs = Issue.objects.select_related("reporter").all()
 
+    issues_qs = _filter_issues(issues_qs, request.GET)
     status = request.GET.get("status")
     category = request.GET.get("category")
     priority = request.GET.get("priority")
@@ -290,33 +228,6 @@ def issue_list(request):
     recurring_only = request.GET.get("recurring") == "1"
     sort = request.GET.get("sort") or ""
 
-    if status:
-        issues_qs = issues_qs.filter(status=status)
-    if category:
-        issues_qs = issues_qs.filter(category=category)
-    if priority:
-        issues_qs = issues_qs.filter(priority=priority)
-    if date_from:
-        issues_qs = issues_qs.filter(created_at__date__gte=date_from)
-    if date_to:
-        issues_qs = issues_qs.filter(created_at__date__lte=date_to)
-    if search:
-        issues_qs = issues_qs.filter(
-            Q(title__icontains=search)
-            | Q(location__icontains=search)
-            | Q(reporter__first_name__icontains=search)
-            | Q(reporter__last_name__icontains=search)
-            | Q(reporter__email__icontains=search)
-        )
-    if recurring_only:
-        issues_qs = issues_qs.filter(is_recurring=True)
-
-    # Sorting: default by newest, optional sort by most upvotes
-    if sort == "most_upvotes":
-        issues_qs = issues_qs.order_by("-upvote_count", "-created_at")
-    else:
-        issues_qs = issues_qs.order_by("-created_at")
-
     if request.method == "POST":
         action = request.POST.get("action")
         selected_ids = request.POST.getlist("selected")
@@ -326,11 +237,11 @@ def issue_list(request):
             selected_issues = selected_issues.filter(assigned_to=request.user)
 
         if action == "mark_in_progress":
-            updated = selected_issues.update(status="in-progress")
-            messages.success(request, f"Marked {updated} issues as In Progress.")
+            updated = bulk_transition_status(selected_issues, "in-progress", request.user)
+            messages.success(request, f"Marked {len(updated)} issues as In Progress.")
         elif action == "mark_resolved":
-            updated = selected_issues.update(status="resolved")
-            messages.success(request, f"Marked {updated} issues as Resolved.")
+            updated = bulk_transition_status(selected_issues, "resolved", request.user)
+            messages.success(request, f"Marked {len(updated)} issues as Resolved.")
         elif action == "delete":
             count = selected_issues.count()
             selected_issues.delete()
@@ -340,13 +251,22 @@ def issue_list(request):
 
         return redirect("dashboard:issues_list")
 
-    paginator = Paginator(issues_qs, 20)
+    filter_params = request.GET.copy()
+    filter_params.pop("page", None)
+    is_filtered = any(value for key, value in filter_params.items() if key != "sort")
+    if is_filtered:
+        paginator = Paginator(issues_qs, 20)
+    else:
+        # Unfiltered list: the total only needs to be roughly right
+        scope = f"staff:{request.user.pk}" if is_staff_view else "all"
+        paginator = CachedCountPaginator(issues_qs, 20, cache_key=f"dashboard_issue_count:{scope}")
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
     context = {
         **_get_active_context(request, "issues"),
         "page_obj": page_obj,
+        "filter_query": filter_params.urlencode(),
         "status_filter": status or "",
         "category_filter": category or "",
         "priority_filter": priority or "",
@@ -358,16 +278,150 @@ def issue_list(request):
         "status_choices": Issue.STATUS_CHOICES,
         "category_choices": Issue.CATEGORY_CHOICES,
         "priority_choices": Issue.PRIORITY_CHOICES,
-        "is_staff_view": request.user.role == "staff" and not request.user.is_superuser,
+        "is_staff_view": is_staff_view,
     }
     return render(request, "dashboard/issues_list.html", context)
 
 
+def _filter_issues(issues_qs, params):
+    """Apply the issue list's filters, search and sort (from `params`) to `issues_qs`."""
+    status = params.get("status")
+    category = params.get("category")
+    priority = params.get("priority")
+    date_from = params.get("date_from")
+    date_to = params.get("date_to")
+    search = params.get("q")
+    recurring_only = params.get("recurring") == "1"
+    sort = params.get("sort") or ""
+
+    if status:
+        issues_qs = issues_qs.filter(status=status)
+    if category:
+        issues_qs = issues_qs.filter(category=category)
+    if priority:
+        issues_qs = issues_qs.filter(priority=priority)
+    # Half-open [from 00:00, day after to 00:00) ranges so created_at's index is used
+    range_from = _start_of_day(date_from)
+    range_to = _start_of_day(date_to)
+    if range_from:
+        issues_qs = issues_qs.filter(created_at__gte=range_from)
+    if range_to:
+        issues_qs = issues_qs.filter(created_at__lt=range_to + timedelta(days=1))
+    search_backend = get_search_backend()
+    if search:
+        # Match reporters in the (much smaller) users table first, so the
+        # issue query and its COUNT(*) need no join
+        matching_reporters = User.objects.filter(
+            Q(first_name__icontains=search)
+            | Q(last_name__icontains=search)
+            | Q(email__icontains=search)
+        ).values("id")
+        issues_qs = issues_qs.filter(
+            search_backend.matches(search) | Q(reporter_id__in=matching_reporters)
+        )
+    if recurring_only:
+        issues_qs = issues_qs.filter(is_recurring=True)
+
+    # Sorting: default by newest, optional sort by most upvotes
+    search_rank = search_backend.rank(search) if search and not sort else None
+    if sort == "most_upvotes":
+        issues_qs = issues_qs.order_by("-upvote_count", "-created_at")
+    elif search_rank is not None:
+        # Best text matches first; reporter-only matches have no rank
+        issues_qs = issues_qs.annotate(search_rank=search_rank).order_by(
+            F("search_rank").asc(nulls_last=True), "-created_at"
+        )
+    else:
+        issues_qs = issues_qs.order_by("-created_at")
+    return issues_qs
+
+
+def _start_of_day(value):
+    """Aware midnight for a YYYY-MM-DD filter value; None if absent or malformed."""
+    try:
+        day = parse_date(value or "")
+    except ValueError:
+        return None
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+def _export_format(fmt):
+    if fmt not in exports.FORMATS:
+        raise Http404("Unknown export format")
+    return fmt
+
+
+def _is_staff_view(user):
+    return user.role == "staff" and not user.is_superuser
+
+
+@admin_required
+def export_issues(request, fmt):
+    """Stream the issue list, with the same filters, search and sort, as CSV/XLSX."""
+    fmt = _export_format(fmt)
+    issues_qs = Issue.objects.all()
+    # Staff export only the issues assigned to them, as in issue_list
+    if _is_staff_view(request.user):
+        issues_qs = issues_qs.filter(assigned_to=request.user)
+    issues_qs = exports.visible_reporter(_filter_issues(issues_qs, request.GET), request.user)
+    return exports.export_response("issues", exports.stream_rows(issues_qs, exports.ISSUE_COLUMNS), fmt)
+
+
+@admin_required
+def export_work_logs(request, fmt):
+    """Stream work logs, optionally limited to `date_from`..`date_to`, as CSV/XLSX."""
+    fmt = _export_format(fmt)
+    logs = AdminWorkLog.objects.order_by("-created_at")
+    if _is_staff_view(request.user):
+        logs = logs.filter(issue__assigned_to=request.user)
+    logs = exports.created_between(
+        logs, _parse_day(request.GET.get("date_from")), _parse_day(request.GET.get("date_to"))
+    )
+    return exports.export_response("work-logs", exports.stream_rows(logs, exports.WORK_LOG_COLUMNS), fmt)
+
+
+@admin_required
+def export_feedback(request, fmt):
+    """Stream issue feedback, optionally limited to `date_from`..`date_to`, as CSV/XLSX."""
+    fmt = _export_format(fmt)
+    feedback = IssueFeedback.objects.order_by("-created_at")
+    if _is_staff_view(request.user):
+        feedback = feedback.filter(issue__assigned_to=request.user)
+    feedback = exports.created_between(
+        feedback, _parse_day(request.GET.get("date_from")), _parse_day(request.GET.get("date_to"))
+    )
+    return exports.export_response("feedback", exports.stream_rows(feedback, exports.FEEDBACK_COLUMNS), fmt)
+
+
+@admin_required
+def export_analytics(request, fmt):
+    """Stream the issues behind the analytics page for its selected date range."""
+    fmt = _export_format(fmt)
+    _range_param, date_from, date_to, _valid = _analytics_range(request.GET)
+    issues_qs = exports.created_between(Issue.objects.order_by("created_at"), date_from, date_to)
+    return exports.export_response(
+        "analytics", exports.stream_rows(issues_qs, exports.ANALYTICS_COLUMNS), fmt
+    )
+
+
+def _parse_day(value):
+    try:
+        return parse_date(value or "")
+    except ValueError:
+        return None
+
+
 @admin_required
 def issue_detail(request, pk):
     """Detailed view for managing a single issue."""
     issue = get_object_or_404(
-        Issue.objects.select_related("reporter", "assigned_to"), pk=pk
+        Issue.objects.select_related("reporter", "assigned_to").prefetch_related(
+            # Rendered by the detail template along with their authors
+            Prefetch("comments", queryset=Comment.objects.select_related("user")),
+            Prefetch("attachments", queryset=Attachment.objects.select_related("uploaded_by")),
+        ),
+        pk=pk,
     )
     is_staff_view = request.user.role == "staff" and not request.user.is_superuser
     if is_staff_view and issue.assigned_to_id != request.user.id:
@@ -558,7 +612,7 @@ def issue_detail(request, pk):
     # Staff users available for assignment (superuser/admin only)
     staff_users = []
     if request.user.is_superuser or getattr(request.user, "role", "") == "admin":
-        staff_users = (
+        staff_users = WorkloadService.annotate(
             User.objects.filter(role__in=["staff", "admin"])
             .order_by("first_name", "last_name", "email")
             .distinct()
@@ -688,22 +742,17 @@ def user_management(request):
 @superuser_required
 def staff_overview(request):
     """Read-only overview of staff and their open issue workload."""
-    staff_users = User.objects.filter(
-        Q(role__in=["staff", "admin"]) | Q(is_staff=True)
-    ).distinct()
-
-    staff_data = []
-    for user in staff_users:
-        open_assigned = Issue.objects.filter(
-            assigned_to=user,
-            status__in=["open", "in-progress"],
-        ).count()
-        staff_data.append(
-            {
-                "user": user,
-                "open_assigned_count": open_assigned,
-            }
-        )
+    staff_users = WorkloadService.annotate(
+        User.objects.filter(Q(role__in=["staff", "admin"]) | Q(is_staff=True)).distinct()
+    )
+
+    staff_data = [
+        {
+            "user": user,
+            "open_assigned_count": user.open_assigned_count,
+        }
+        for user in staff_users
+    ]
 
     context = {
         **_get_active_context(request, "staff"),
@@ -712,40 +761,45 @@ def staff_overview(request):
     return render(request, "dashboard/staff.html", context)
 
 
-@admin_required
-def analytics(request):
+def _analytics_range(params):
     """
-    Admin analytics dashboard with charts and summary stats.
+    The analytics date range from `range` (7/30/90/custom) and, for custom,
+    `date_from`/`date_to`. Returns (range_param, date_from, date_to, valid);
+    invalid custom ranges fall back to the last 30 days.
     """
-    range_param = (request.GET.get("range") or "30").lower()
+    range_param = (params.get("range") or "30").lower()
     today = timezone.localdate()
 
     if range_param in {"7", "30", "90"}:
         days = int(range_param)
-        date_to = today
-        date_from = today - timedelta(days=days - 1)
-    elif range_param == "custom":
+        return range_param, today - timedelta(days=days - 1), today, True
+    if range_param == "custom":
         try:
-            date_from_str = (request.GET.get("date_from") or "").strip()
-            date_to_str = (request.GET.get("date_to") or "").strip()
+            date_from_str = (params.get("date_from") or "").strip()
+            date_to_str = (params.get("date_to") or "").strip()
             if not date_from_str or not date_to_str:
                 raise ValueError
             date_from = timezone.datetime.fromisoformat(date_from_str).date()
             date_to = timezone.datetime.fromisoformat(date_to_str).date()
             if date_from > date_to:
                 raise ValueError
+            return range_param, date_from, date_to, True
         except Exception:
-            messages.error(
-                request,
-                "Invalid custom date range. Falling back to last 30 days.",
-            )
-            range_param = "30"
-            date_to = today
-            date_from = today - timedelta(days=29)
-    else:
-        range_param = "30"
-        date_to = today
-        date_from = today - timedelta(days=29)
+            return "30", today - timedelta(days=29), today, False
+    return "30", today - timedelta(days=29), today, True
+
+
+@admin_required
+def analytics(request):
+    """
+    Admin analytics dashboard with charts and summary stats.
+    """
+    range_param, date_from, date_to, valid = _analytics_range(request.GET)
+    if not valid:
+        messages.error(
+            request,
+            "Invalid custom date range. Falling back to last 30 days.",
+        )
 
     # Base issue queryset for the selected range
     issues_qs = Issue.objects.filter(
@@ -864,6 +918,10 @@ def analytics(request):
         "range": range_param,
         "date_from": date_from,
         "date_to": date_to,
+        # The resolved range, so exports cover exactly what is shown
+        "export_query": urlencode({
+            "range": "custom", "date_from": date_from.isoformat(), "date_to": date_to.isoformat(),
+        }),
         "status_chart_data": json.dumps(status_chart),
         "daily_chart_data": json.dumps(daily_chart),
         "resolution_chart_data": json.dumps(resolution_chart),
@@ -955,125 +1013,210 @@ def calendar_events_api(request):
     Returns JSON data for FullCalendar.
     Staff users only see their own assigned issues and maintenance windows.
     Admins see everything based on the `view_mode` query param.
+
+    Only events overlapping FullCalendar's visible `start`/`end` range are
+    returned (all events when the params are absent); the array is streamed
+    as it is read.
     """
-    from django.http import JsonResponse
-    
+    from django.http import JsonResponse, StreamingHttpResponse
+
     now = timezone.now()
     is_admin = request.user.is_superuser or request.user.role == "admin"
     view_mode = request.GET.get('view_mode', 'combined') # 'maintenance', 'sla', 'combined'
-    
-    events = []
-    
-    # 1. Maintenance Windows
-    if view_mode in ['combined', 'maintenance'] or not is_admin:
-        windows = MaintenanceWindow.objects.all()
-        for w in windows:
-            color = "#ef4444" # RED
-            if w.is_cancelled:
-                color = "#9ca3af" # GREY
-            elif w.actual_end:
-                color = "#10b981" # GREEN
-                
-            events.append({
-                "id": f"mw_{w.id}",
-                "title": f"Maintenance: {w.title}",
-                "start": w.scheduled_start.isoformat(),
-                "end": (w.actual_end if w.actual_end else w.scheduled_end).isoformat(),
-                "color": color,
-                "extendedProps": {
-                    "type": "maintenance",
-                    "description": w.description,
-                    "is_cancelled": w.is_cancelled,
-                    "is_active": w.is_active,
-                    "actual_end": w.actual_end.isoformat() if w.actual_end else None,
-                    "scheduled_start": w.scheduled_start.isoformat(),
-                    "scheduled_end": w.scheduled_end.isoformat(),
-                }
-            })
 
-    # 2. Maintenance Tasks (Preventive)
-    if view_mode in ['combined', 'maintenance'] or not is_admin:
+    try:
+        range_start = _parse_calendar_bound(request.GET.get("start"))
+        range_end = _parse_calendar_bound(request.GET.get("end"))
+    except ValueError:
+        return JsonResponse({"error": "start and end must be ISO 8601 dates"}, status=400)
+
+    show_maintenance = view_mode in ['combined', 'maintenance'] or not is_admin
+    show_issues = view_mode in ['combined', 'sla'] or not is_admin
+
+    # 1. Maintenance Windows
+    windows = MaintenanceWindow.objects.none()
+    if show_maintenance:
+        windows = MaintenanceWindow.objects.annotate(
+            shown_end=Coalesce("actual_end", "scheduled_end")
+        )
+        if range_end:
+            windows = windows.filter(scheduled_start__lt=range_end)
+        if range_start:
+            windows = windows.filter(shown_end__gt=range_start)
+
+    # 2. Maintenance Tasks (Preventive), shown with a 1h duration
+    tasks = MaintenanceTask.objects.none()
+    if show_maintenance:
         tasks = MaintenanceTask.objects.all()
         if not is_admin:
             tasks = tasks.filter(assigned_to=request.user)
-            
-        for t in tasks:
-            # Maintenance tasks are single points in time usually, but we give them 1h duration for visibility
-            start_dt = t.scheduled_for
-            end_dt = start_dt + timedelta(hours=1)
-            
-            events.append({
-                "id": f"mt_{t.id}",
-                "title": f"🛠️ {t.title}",
-                "start": start_dt.isoformat(),
-                "end": end_dt.isoformat(),
-                "color": "#10b981", # GREEN
-                "extendedProps": {
-                    "type": "maintenance",
-                    "description": t.notes,
-                    "location": t.location,
-                }
-            })
+        if range_end:
+            tasks = tasks.filter(scheduled_for__lt=range_end)
+        if range_start:
+            tasks = tasks.filter(scheduled_for__gt=range_start - timedelta(hours=1))
 
     # 3. SLA & Assigned Issues
-    if view_mode in ['combined', 'sla'] or not is_admin:
+    issues_qs = Issue.objects.none()
+    if show_issues:
         # Get all issues for admins, or assigned issues for staff
         if is_admin:
             issues_qs = Issue.objects.all()
         else:
             issues_qs = Issue.objects.filter(assigned_to=request.user)
-            
-        for issue in issues_qs:
-            is_closed = issue.status in ["resolved", "closed"]
-            
-            # 1. Determine End Date (The "Deadline" or "Resolution" marker)
-            # Use resolved_at if closed. Else use sla_deadline or sla_due_at.
-            # If both missing, fallback to 3 days after creation.
-            end_time = None
-            if is_closed:
-                end_time = issue.resolved_at
-            
-            if not end_time:
-                end_time = issue.sla_deadline or issue.sla_due_at
-                
-            if not end_time:
-                # Absolute fallback for issues with no SLA data at all
-                end_time = issue.created_at + timedelta(days=3)
-
-            # 2. Determine Start Date (When it appeared on the radar)
-            ack_log = issue.progress_logs.filter(log_type="acknowledged").order_by("created_at").first()
-            start_time = ack_log.created_at if ack_log else (issue.assigned_at if issue.assigned_at else issue.created_at)
-
-            # 3. Date Safety: Ensure start <= end for FullCalendar stability
-            if start_time >= end_time:
-                # If resolution happened before assignment/log (e.g. manual import),
-                # just show it as a point in time at the end date.
-                start_time = end_time - timedelta(minutes=15)
-
-            # 4. Color Logic
-            color = "#3b82f6" # BLUE (Active/Pending)
-            if is_closed:
-                color = "#9ca3af" # GREY (Resolved/Cancelled)
-            elif issue.sla_breached or (issue.sla_deadline and now > issue.sla_deadline) or (issue.sla_due_at and now > issue.sla_due_at) or (now > end_time):
-                color = "#f97316" # ORANGE (Overdue)
-                
-            events.append({
-                "id": f"is_{issue.id}",
-                "title": f"Issue #{issue.id}: {issue.title}",
-                "start": start_time.isoformat(),
-                "end": end_time.isoformat(),
-                "color": color,
-                "extendedProps": {
-                    "type": "issue",
-                    "issue_id": issue.id,
-                    "location": issue.location,
-                    "category": issue.get_category_display(),
-                    "status": issue.get_status_display(),
-                    "assigned_to": (issue.assigned_to.get_full_name() or issue.assigned_to.email) if issue.assigned_to else "Unassigned",
-                }
-            })
 
-    return JsonResponse(events, safe=False)
+        # First acknowledgement per issue, fetched with the issues
+        first_ack = (
+            IssueProgressLog.objects.filter(issue=OuterRef("pk"), log_type="acknowledged")
+            .values("issue")
+            .annotate(first=Min("created_at"))
+            .values("first")
+        )
+        issues_qs = issues_qs.select_related("assigned_to").annotate(
+            acknowledged_at=Subquery(first_ack)
+        )
+        if range_end:
+            # An issue cannot show up before it was reported
+            issues_qs = issues_qs.filter(created_at__lt=range_end)
+        if range_start:
+            # Same end date as _issue_event() below
+            issues_qs = issues_qs.annotate(
+                shown_end=Case(
+                    When(status__in=["resolved", "closed"], resolved_at__isnull=False, then=F("resolved_at")),
+                    default=Coalesce(
+                        "sla_deadline", "sla_due_at",
+                        ExpressionWrapper(F("created_at") + timedelta(days=3), output_field=DateTimeField()),
+                    ),
+                )
+            ).filter(shown_end__gt=range_start)
+
+    def stream():
+        yield "["
+        separator = ""
+        for w in windows.iterator():
+            yield separator + json.dumps(_maintenance_window_event(w))
+            separator = ","
+        for t in tasks.iterator():
+            yield separator + json.dumps(_maintenance_task_event(t))
+            separator = ","
+        for issue in issues_qs.iterator(chunk_size=2000):
+            event = _issue_event(issue, now)
+            # Started after the window even though it was reported inside it
+            if range_end and datetime.fromisoformat(event["start"]) >= range_end:
+                continue
+            yield separator + json.dumps(event)
+            separator = ","
+        yield "]"
+
+    return StreamingHttpResponse(stream(), content_type="application/json")
+
+
+def _parse_calendar_bound(value):
+    """Parse a FullCalendar range bound (date or datetime, ISO 8601); None if absent."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _maintenance_window_event(w):
+    color = "#ef4444" # RED
+    if w.is_cancelled:
+        color = "#9ca3af" # GREY
+    elif w.actual_end:
+        color = "#10b981" # GREEN
+
+    return {
+        "id": f"mw_{w.id}",
+        "title": f"Maintenance: {w.title}",
+        "start": w.scheduled_start.isoformat(),
+        "end": (w.actual_end if w.actual_end else w.scheduled_end).isoformat(),
+        "color": color,
+        "extendedProps": {
+            "type": "maintenance",
+            "description": w.description,
+            "is_cancelled": w.is_cancelled,
+            "is_active": w.is_active,
+            "actual_end": w.actual_end.isoformat() if w.actual_end else None,
+            "scheduled_start": w.scheduled_start.isoformat(),
+            "scheduled_end": w.scheduled_end.isoformat(),
+        }
+    }
+
+
+def _maintenance_task_event(t):
+    # Maintenance tasks are single points in time usually, but we give them 1h duration for visibility
+    start_dt = t.scheduled_for
+    end_dt = start_dt + timedelta(hours=1)
+
+    return {
+        "id": f"mt_{t.id}",
+        "title": f"🛠️ {t.title}",
+        "start": start_dt.isoformat(),
+        "end": end_dt.isoformat(),
+        "color": "#10b981", # GREEN
+        "extendedProps": {
+            "type": "maintenance",
+            "description": t.notes,
+            "location": t.location,
+        }
+    }
+
+
+def _issue_event(issue, now):
+    is_closed = issue.status in ["resolved", "closed"]
+
+    # 1. Determine End Date (The "Deadline" or "Resolution" marker)
+    # Use resolved_at if closed. Else use sla_deadline or sla_due_at.
+    # If both missing, fallback to 3 days after creation.
+    end_time = None
+    if is_closed:
+        end_time = issue.resolved_at
+
+    if not end_time:
+        end_time = issue.sla_deadline or issue.sla_due_at
+
+    if not end_time:
+        # Absolute fallback for issues with no SLA data at all
+        end_time = issue.created_at + timedelta(days=3)
+
+    # 2. Determine Start Date (When it appeared on the radar)
+    start_time = issue.acknowledged_at or issue.assigned_at or issue.created_at
+
+    # 3. Date Safety: Ensure start <= end for FullCalendar stability
+    if start_time >= end_time:
+        # If resolution happened before assignment/log (e.g. manual import),
+        # just show it as a point in time at the end date.
+        start_time = end_time - timedelta(minutes=15)
+
+    # 4. Color Logic
+    color = "#3b82f6" # BLUE (Active/Pending)
+    if is_closed:
+        color = "#9ca3af" # GREY (Resolved/Cancelled)
+    elif issue.sla_breached or (issue.sla_deadline and now > issue.sla_deadline) or (issue.sla_due_at and now > issue.sla_due_at) or (now > end_time):
+        color = "#f97316" # ORANGE (Overdue)
+
+    return {
+        "id": f"is_{issue.id}",
+        "title": f"Issue #{issue.id}: {issue.title}",
+        "start": start_time.isoformat(),
+        "end": end_time.isoformat(),
+        "color": color,
+        "extendedProps": {
+            "type": "issue",
+            "issue_id": issue.id,
+            "location": issue.location,
+            "category": issue.get_category_display(),
+            "status": issue.get_status_display(),
+            "assigned_to": (issue.assigned_to.get_full_name() or issue.assigned_to.email) if issue.assigned_to else "Unassigned",
+        }
+    }
 
 
 @admin_required
@@ -1164,21 +1307,14 @@ def calendar(request):
     # Get staff workload indicator
     staff_workload = []
     if is_admin:
-        staff_users = User.objects.filter(role__in=["staff", "admin"]).distinct()
+        staff_users = WorkloadService.annotate(
+            User.objects.filter(role__in=["staff", "admin"]).distinct()
+        )
         for su in staff_users:
-            active_count = Issue.objects.filter(
-                assigned_to=su, status__in=["open", "in-progress"]
-            ).count()
-            status = "Available"
-            if active_count >= 3:
-                status = "Overloaded"
-            elif active_count > 0:
-                status = "Busy"
-                
             staff_workload.append({
                 "name": su.get_full_name() or su.email,
-                "count": active_count,
-                "status": status
+                "count": su.open_assigned_count,
+                "status": su.workload_status,
             })
 
     context = {
@@ -1338,6 +1474,7 @@ def assignment_notifications_mark_all_read(request):
             is_read=False,
         ).update(is_read=True)
         if count:
+            FragmentVersions.bump(notifications_version(request.user.pk))
             messages.success(
                 request, f"Marked {count} assignment notification(s) as read."
             )
@@ -283,15 +283,15 @@ class IssueAdmin(admin.ModelAdmin):
 
     def comments_chat_display(self, obj):
         """Display chat/comments interface for admins"""
-        comments = obj.comments.all().order_by("created_at")
+        comments = list(obj.comments.select_related("user").order_by("created_at"))
 
         if not comments:
             return "No comments yet. Users can comment through the frontend interface."
 
-        html = """
+        html = f"""
         <div style='max-height: 400px; overflow-y: auto; border: 1px solid #ddd; border-radius: 4px; padding: 10px; background: #f9f9f9;'>
             <h4 style='margin-top: 0; color: #333; border-bottom: 2px solid #007cba; padding-bottom: 5px;'>
-                💬 Chat History ({comments.count()} messages)
+                💬 Chat History ({len(comments)} messages)
             </h4>
         """
 
@@ -0,0 +1,75 @@
+"""
+Deterministic stand-in for `google.generativeai.GenerativeModel`.
+
+Selected with GEMINI_MODEL_CLASS = "issues.ai_fakes.FakeGenerativeModel"
+(or CAMPUSFIX_FAKE_GEMINI=... in the environment, see settings). Answers
+are derived from the prompt alone, so the same input always gives the same
+output, and latency, server errors and 429 quota errors are injected from
+settings.GEMINI_FAKE (see utils.fault_injection); e.g. setting
+`rate_limited` to the primary model exercises the fallback chain in
+GeminiAIService.
+"""
+
+import hashlib
+import json
+import re
+
+from google.api_core import exceptions as google_exceptions
+
+from utils.fault_injection import ERROR, RATE_LIMITED, get_injector
+
+ANGRY_WORDS = ("angry", "unacceptable", "ridiculous", "furious", "again", "still", "worst", "useless")
+
+_SENTIMENT_TEXT = re.compile(r"Return JSON only:\s*(.*?)\s*Return format:", re.DOTALL)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    def __init__(self, model_name, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, **kwargs):
+        outcome = get_injector("GEMINI_FAKE").inject(self.model_name)
+        if outcome == RATE_LIMITED:
+            raise google_exceptions.ResourceExhausted(
+                f"429 Quota exceeded for model {self.model_name} (fake)"
+            )
+        if outcome == ERROR:
+            raise google_exceptions.ServiceUnavailable("503 The model is overloaded (fake)")
+        return FakeResponse(self._answer(str(prompt)))
+
+    def _answer(self, prompt):
+        match = _SENTIMENT_TEXT.search(prompt)
+        if match:
+            return self._sentiment(match.group(1))
+        if '"complete": true' in prompt:
+            return "Thanks! Where exactly on campus is the problem, and how urgent is it?"
+        digest = hashlib.sha1(prompt.encode()).hexdigest()[:8]
+        return (
+            "## Summary\n"
+            f"- Generated offline by {self.model_name} (fake, prompt {digest}).\n"
+            "- Issue volumes and resolution times are within the usual range.\n"
+            "## Recommendations\n"
+            "- Keep prioritising overdue and high-priority issues."
+        )
+
+    @staticmethod
+    def _sentiment(text):
+        lowered = text.lower()
+        score = min(10, text.count("!") * 2 + sum(3 for word in ANGRY_WORDS if word in lowered))
+        if score >= 7:
+            sentiment = "angry"
+        elif score >= 4:
+            sentiment = "frustrated"
+        else:
+            sentiment = "neutral"
+        return json.dumps({
+            "sentiment": sentiment,
+            "frustrationScore": score,
+            "needsEscalation": score >= 7,
+            "reason": "Keyword estimate from the offline stand-in.",
+        })
@@ -3,6 +3,7 @@ import logging
 from typing import Dict, Any, Optional
 from django.conf import settings
 from django.utils import timezone
+from django.utils.module_loading import import_string
 import google.generativeai as genai
 
 logger = logging.getLogger(__name__)
@@ -21,14 +22,24 @@ class GeminiAIService:
             'models/gemini-pro',
         ]
 
-        if self.api_key:
+        # Optional stand-in for genai.GenerativeModel (e.g. issues.ai_fakes.FakeGenerativeModel)
+        self.model_class = getattr(settings, 'GEMINI_MODEL_CLASS', '')
+
+        if self.model_class:
+            logger.info("Using %s in place of the Gemini API.", self.model_class)
+        elif self.api_key:
             genai.configure(api_key=self.api_key)
         else:
             logger.warning("GEMINI_API_KEY not configured. AI features will be disabled.")
 
     def is_available(self) -> bool:
         """Check if the AI service is available."""
-        return bool(self.api_key)
+        return bool(self.api_key or self.model_class)
+
+    def _model(self, name: str):
+        if self.model_class:
+            return import_string(self.model_class)(name)
+        return genai.GenerativeModel(name)
 
     def _generate_with_fallback(self, prompt: str) -> str:
         """Attempt to generate content using the configured model.
@@ -37,7 +48,7 @@ class GeminiAIService:
         fallback_models list in order. Returns with a note when fallback is used.
         """
         try:
-            model = genai.GenerativeModel(self.model)
+            model = self._model(self.model)
             response = model.generate_content(prompt)
             return response.text.strip()
         except Exception as e:
@@ -56,7 +67,7 @@ class GeminiAIService:
                         continue  # skip if it's the same as primary
                     try:
                         logger.info("Attempting fallback model: %s", fallback_model)
-                        alt_model = genai.GenerativeModel(fallback_model)
+                        alt_model = self._model(fallback_model)
                         response = alt_model.generate_content(prompt)
                         text = response.text.strip()
                         # annotate so callers know we switched models
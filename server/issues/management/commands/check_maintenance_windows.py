@@ -4,6 +4,8 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db.models import Q
 from issues.models import MaintenanceWindow, Issue
+from issues.services import mark_overdue_issues
+from notifications.outbox import realtime_batch
 from notifications.services import NotificationService
 from accounts.models import User
 from utils.email_service import (
@@ -16,9 +18,16 @@ from utils.email_service import (
 logger = logging.getLogger(__name__)
 
 class Command(BaseCommand):
-    help = "Manage maintenance windows and issue SLA deadlines/reminders"
+    help = "Manage maintenance windows, issue SLA deadlines/reminders and overdue flags (run every few minutes)"
 
     def handle(self, *args, **options):
+        # Batch all WebSocket events produced by this run into one flush
+        with realtime_batch():
+            self.run_checks()
+
+        self.stdout.write(self.style.SUCCESS('Successfully checked maintenance windows and SLAs'))
+
+    def run_checks(self):
         now = timezone.now()
 
         # 1. Handle Maintenance Windows Activation/Deactivation
@@ -99,7 +108,13 @@ class Command(BaseCommand):
                                 related_issue=issue
                             )
 
-        # 2. SLA Reminders
+        # 2. Overdue flags and the admin overdue digest (also available on
+        # its own as `manage.py mark_overdue_issues`)
+        flagged = mark_overdue_issues(now=now)
+        if flagged:
+            logger.info("Flagged %d issue(s) overdue", len(flagged))
+
+        # 3. SLA Reminders
         active_issues = Issue.objects.filter(
             ~Q(status__in=["resolved", "closed"]),
             sla_deadline__isnull=False
@@ -206,8 +221,6 @@ class Command(BaseCommand):
                         related_issue=issue
                     )
 
-        self.stdout.write(self.style.SUCCESS('Successfully checked maintenance windows and SLAs'))
-
     def notify_all(self, message):
         users = User.objects.all()
         for user in users:
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from issues.services import mark_overdue_issues
+from notifications.outbox import realtime_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Flag issues past their SLA due time and send admins one overdue digest "
+        "(also run by check_maintenance_windows)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Issues flagged per UPDATE")
+
+    def handle(self, *args, **options):
+        # Batch all WebSocket events produced by this run into one flush
+        with realtime_batch():
+            flagged = mark_overdue_issues(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Marked {len(flagged)} issue(s) overdue"))
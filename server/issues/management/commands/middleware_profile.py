@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from campusfix.profiling import ProfileRegistry, profile_middleware
+
+
+class Command(BaseCommand):
+    help = (
+        "Show p50/p95/p99 self time and average DB queries per MIDDLEWARE layer, "
+        "as recorded with CAMPUSFIX_PROFILE_MIDDLEWARE=1. Needs a shared (Redis) "
+        "cache to see other processes; --path replays GET requests in this process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", action="append", default=[],
+                            help="replay GET requests to this path through a profiled stack (repeatable)")
+        parser.add_argument("--requests", type=int, default=200, help="requests per --path")
+        parser.add_argument("--reset", action="store_true", help="clear recorded histograms and exit")
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            ProfileRegistry.reset()
+            self.stdout.write("Middleware profile cleared.")
+            return
+
+        if options["path"]:
+            middleware = settings.MIDDLEWARE
+            if not settings.MIDDLEWARE_PROFILING:
+                middleware = profile_middleware(middleware)
+            with override_settings(MIDDLEWARE=middleware):
+                client = Client(HTTP_HOST="localhost")
+                for path in options["path"]:
+                    for _ in range(options["requests"]):
+                        client.get(path)
+
+        histograms = ProfileRegistry.collect()
+        if not histograms:
+            self.stdout.write(self.style.WARNING(
+                "No samples recorded. Enable CAMPUSFIX_PROFILE_MIDDLEWARE=1 or pass --path."
+            ))
+            return
+
+        self.stdout.write(f"{'layer':<36} {'requests':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+        for name, histogram in sorted(histograms.items(), key=lambda item: item[1].index):
+            self.stdout.write(
+                f"{name:<36} {histogram.count:>9} "
+                f"{histogram.percentile(50) * 1000:>9.3f} {histogram.percentile(95) * 1000:>9.3f} "
+                f"{histogram.percentile(99) * 1000:>9.3f} {histogram.queries / histogram.count:>8.2f}"
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from issues.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the issue full-text search index (run after bulk imports)"
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        indexed = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} issue(s) with {type(backend).__name__}"
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 23:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0022_remove_issue_is_trashed_remove_issue_trashed_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['is_overdue', 'sla_due_at'], name='issues_issu_is_over_38aa75_idx'),
+        ),
+    ]
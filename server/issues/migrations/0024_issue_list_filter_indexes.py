@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-19 00:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0023_issue_overdue_sweep_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='issue',
+            name='issues_issu_status_003ba6_idx',
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['status', '-created_at'], name='issues_issu_status_6ee1cb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['category', '-created_at'], name='issues_issu_categor_2467a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['priority', '-created_at'], name='issues_issu_priorit_04bb52_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['assigned_to', 'status', '-created_at'], name='issues_issu_assigne_e949e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['-upvote_count', '-created_at'], name='issues_issu_upvote__3f5419_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-19 00:40
+
+from django.db import migrations
+
+TABLE = "issues_issue_search"
+
+
+def create_search_index(apps, schema_editor):
+    # Only SQLite gets an FTS5 table; other databases use issues.search.DatabaseSearchBackend
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+        "title, description, location, comments, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {TABLE} (rowid, title, description, location, comments) "
+        "SELECT i.id, i.title, i.description, i.location, "
+        "(SELECT group_concat(c.content, char(10)) FROM issues_comment c WHERE c.issue_id = i.id) "
+        "FROM issues_issue i"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0024_issue_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -193,8 +193,15 @@ class Issue(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['-created_at']),
-            models.Index(fields=['status']),
+            # Dashboard issue list: each filter, newest first
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['category', '-created_at']),
+            models.Index(fields=['priority', '-created_at']),
+            models.Index(fields=['assigned_to', 'status', '-created_at']),
+            models.Index(fields=['-upvote_count', '-created_at']),
             models.Index(fields=['reporter']),
+            # Overdue sweep: not-yet-flagged issues by SLA due time
+            models.Index(fields=['is_overdue', 'sla_due_at']),
         ]
     
     def __str__(self):
@@ -0,0 +1,208 @@
+"""
+Full-text search over issues and their comments.
+
+Each issue is one document with title, description, location and comments
+(all comment text of the issue) columns. Searches are AND-ed prefix
+queries, so "broken tap" finds "Broken taps in the hostel kitchen".
+
+Backends:
+
+    SQLiteFTS5Backend      an FTS5 table (issues_issue_search, created by
+                           migration 0025) ranked with bm25; the default on
+                           SQLite
+    DatabaseSearchBackend  icontains over the same fields; no index, no
+                           ranking; the default on other databases
+
+ISSUE_SEARCH_BACKEND selects a backend by dotted path; other databases can
+plug in their own SearchBackend subclass. The index is kept in sync by the
+issue and comment signals (issues.signals); rows written with bulk_create
+or QuerySet.update() bypass them, so run `manage.py rebuild_search_index`
+after bulk loads.
+"""
+
+import re
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.expressions import RawSQL
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from .models import Comment, Issue
+
+FIELDS = ("title", "description", "location", "comments")
+# Matches in the title count most, then location, then the description
+FIELD_WEIGHTS = {"title": 10.0, "description": 1.0, "location": 5.0, "comments": 0.5}
+MAX_TERMS = 8
+# Always false; what matches() returns for a query without words
+NO_MATCH = Q(pk__in=[])
+
+_TERMS = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query):
+    """Words of a user query, lower-cased, at most MAX_TERMS of them."""
+    return [term.lower() for term in _TERMS.findall(query or "")][:MAX_TERMS]
+
+
+class SearchBackend:
+    """Interface of an issue search backend."""
+
+    def index(self, issue_ids):
+        """(Re)index the given issues."""
+
+    def remove(self, issue_ids):
+        """Drop the given issues from the index."""
+
+    def rebuild(self):
+        """Reindex every issue; returns the number of issues indexed."""
+        return 0
+
+    def matches(self, query, fields=FIELDS):
+        """
+        Q object selecting issues that match `query` in `fields`; matches
+        nothing when the query has no words.
+        """
+        raise NotImplementedError
+
+    def rank(self, query, fields=FIELDS):
+        """Expression ranking matches, lower is better; None if unsupported or no words."""
+        return None
+
+    def search(self, queryset, query, fields=FIELDS, ranked=True):
+        """Filter `queryset` to matches, best first when `ranked` and supported."""
+        if not search_terms(query):
+            return queryset
+        queryset = queryset.filter(self.matches(query, fields))
+        rank = self.rank(query, fields) if ranked else None
+        if rank is not None:
+            queryset = queryset.annotate(search_rank=rank).order_by("search_rank", "-created_at")
+        return queryset
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """Unindexed icontains search; works on any database."""
+
+    def matches(self, query, fields=FIELDS):
+        terms = search_terms(query)
+        if not terms:
+            return NO_MATCH
+        condition = Q()
+        for term in terms:
+            term_condition = Q()
+            for field in fields:
+                if field == "comments":
+                    term_condition |= Q(Exists(
+                        Comment.objects.filter(issue=OuterRef("pk"), content__icontains=term)
+                    ))
+                else:
+                    term_condition |= Q(**{f"{field}__icontains": term})
+            condition &= term_condition
+        return condition
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """SQLite FTS5 index, one row per issue with rowid = issue id."""
+
+    table = "issues_issue_search"
+
+    def _document_sql(self, where=""):
+        issue_table = Issue._meta.db_table
+        comment_table = Comment._meta.db_table
+        return (
+            f"INSERT INTO {self.table} (rowid, title, description, location, comments) "
+            f"SELECT i.id, i.title, i.description, i.location, "
+            f"(SELECT group_concat(c.content, char(10)) FROM {comment_table} c WHERE c.issue_id = i.id) "
+            f"FROM {issue_table} i {where}"
+        )
+
+    def index(self, issue_ids):
+        issue_ids = list(issue_ids)
+        if not issue_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(issue_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", issue_ids)
+            cursor.execute(self._document_sql(f"WHERE i.id IN ({placeholders})"), issue_ids)
+
+    def remove(self, issue_ids):
+        issue_ids = list(issue_ids)
+        if not issue_ids:
+            return
+        placeholders = ", ".join(["%s"] * len(issue_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", issue_ids)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(self._document_sql())
+            indexed = cursor.rowcount
+            # Merge the index b-trees written by the bulk insert
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+        return indexed
+
+    @staticmethod
+    def match_expression(query, fields=FIELDS):
+        """FTS5 MATCH string: every term as a quoted prefix, restricted to `fields`."""
+        terms = " AND ".join(f'"{term}"*' for term in search_terms(query))
+        return f"{{{' '.join(fields)}}} : ({terms})"
+
+    def matches(self, query, fields=FIELDS):
+        # FTS5 rejects an empty MATCH expression
+        if not search_terms(query):
+            return NO_MATCH
+        return Q(pk__in=RawSQL(
+            f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s",
+            [self.match_expression(query, fields)],
+        ))
+
+    def rank(self, query, fields=FIELDS):
+        if not search_terms(query):
+            return None
+        weights = ", ".join(str(FIELD_WEIGHTS[field] if field in fields else 0.0) for field in FIELDS)
+        return RawSQL(
+            f"SELECT bm25({self.table}, {weights}) FROM {self.table} "
+            f"WHERE {self.table} MATCH %s AND rowid = {Issue._meta.db_table}.id",
+            [self.match_expression(query, fields)],
+        )
+
+
+class IssueSearchFilter(SearchFilter):
+    """
+    DRF search over the view's `search_fields` (a subset of FIELDS) through
+    the search backend. Results are ranked unless `ordering` is given.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "")
+        ranked = not request.query_params.get(OrderingFilter.ordering_param)
+        fields = tuple(getattr(view, "search_fields", None) or FIELDS)
+        return get_search_backend().search(queryset, query, fields=fields, ranked=ranked)
+
+
+_backend = None
+
+
+def get_search_backend():
+    """The configured backend (ISSUE_SEARCH_BACKEND), by default chosen by database vendor."""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, "ISSUE_SEARCH_BACKEND", "")
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == "sqlite":
+            _backend = SQLiteFTS5Backend()
+        else:
+            _backend = DatabaseSearchBackend()
+    return _backend
+
+
+@receiver(setting_changed)
+def _settings_changed(setting, **kwargs):
+    global _backend
+    if setting == "ISSUE_SEARCH_BACKEND":
+        _backend = None
@@ -119,6 +119,9 @@ class IssueListSerializer(serializers.ModelSerializer):
     def get_upvoted_by_user(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            # Annotated by IssueViewSet.get_queryset
+            if hasattr(obj, 'user_has_upvoted'):
+                return obj.user_has_upvoted
             return obj.upvotes.filter(user=request.user).exists()
         return False
 
@@ -183,6 +186,9 @@ class IssueDetailSerializer(serializers.ModelSerializer):
     def get_upvoted_by_user(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            # Annotated by IssueViewSet.get_queryset
+            if hasattr(obj, 'user_has_upvoted'):
+                return obj.user_has_upvoted
             return obj.upvotes.filter(user=request.user).exists()
         return False
     
@@ -1,7 +1,20 @@
+import logging
 from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from .models import Issue, SLARule, MaintenanceWindow
 
+logger = logging.getLogger(__name__)
+
+# Statuses whose SLA clock is still running
+OVERDUE_STATUSES = ["open", "in-progress", "awaiting_verification", "reopened"]
+OVERDUE_BATCH_SIZE = 500
+DIGEST_MAX_ITEMS = 10
+# Statuses that stamp resolved_at (see issues.signals.issue_pre_save)
+RESOLVED_STATUSES = ["resolved", "closed"]
+
 def calculate_sla_deadline(issue, start_time=None):
     if start_time is None:
         start_time = timezone.now()
@@ -38,3 +51,114 @@ def calculate_sla_deadline(issue, start_time=None):
         start_time = active_maintenance.scheduled_end
         
     return start_time + timedelta(hours=duration_hours)
+
+
+def mark_overdue_issues(now=None, batch_size=OVERDUE_BATCH_SIZE):
+    """
+    Flag issues that have crossed their SLA due time and send one digest
+    notification per admin. Returns the ids flagged by this run.
+
+    Only issues not yet flagged are considered (index on is_overdue,
+    sla_due_at), so each run touches just what crossed its deadline since
+    the last one; flags are set with one UPDATE per batch, so the cached
+    dashboard fragments are invalidated here rather than by the signals.
+    """
+    from accounts.models import User
+    from dashboard.fragments import FragmentVersions
+    from notifications.services import NotificationService
+
+    if now is None:
+        now = timezone.now()
+
+    candidates = Issue.objects.filter(
+        is_overdue=False,
+        sla_due_at__isnull=False,
+        sla_due_at__lt=now,
+        status__in=OVERDUE_STATUSES,
+    ).order_by("sla_due_at")
+
+    flagged = []
+    while True:
+        with transaction.atomic():
+            batch_qs = candidates
+            if connection.features.has_select_for_update_skip_locked:
+                # Concurrent runs split the work instead of double-notifying
+                batch_qs = batch_qs.select_for_update(skip_locked=True)
+            batch = list(batch_qs.values_list("pk", flat=True)[:batch_size])
+            if not batch:
+                break
+            Issue.objects.filter(pk__in=batch).update(is_overdue=True, updated_at=now)
+        flagged.extend(batch)
+
+    if not flagged:
+        return flagged
+
+    logger.info("Marked %d issues overdue", len(flagged))
+    FragmentVersions.bump("issues")
+    listed = list(
+        Issue.objects.filter(pk__in=flagged[:DIGEST_MAX_ITEMS]).order_by("sla_due_at").values_list("pk", "title")
+    )
+    lines = [f"- #{pk} {title}" for pk, title in listed]
+    if len(flagged) > len(listed):
+        lines.append(f"...and {len(flagged) - len(listed)} more.")
+    count = len(flagged)
+    title = f"Issue #{flagged[0]} is overdue" if count == 1 else f"{count} issues are overdue"
+    message = "These issues have exceeded their SLA deadline:\n" + "\n".join(lines)
+    related_issue = Issue.objects.filter(pk=flagged[0]).first() if count == 1 else None
+
+    admins = User.objects.filter(Q(is_superuser=True) | Q(role="admin")).distinct()
+    for admin_user in admins:
+        NotificationService.create_notification(
+            user=admin_user,
+            title=title,
+            message=message,
+            notification_type="status_change",
+            related_issue=related_issue,
+        )
+    return flagged
+
+
+def bulk_transition_status(issues, new_status, changed_by, now=None):
+    """
+    Move every issue in `issues` to `new_status` with one UPDATE and return
+    the ids that changed.
+
+    Per-row save() signals are replaced by their set-based equivalents:
+    resolved_at is filled in SQL as issue_pre_save would, the dashboard
+    counters get one combined delta and broadcast, the cached dashboard
+    fragments are invalidated once, each affected reporter, assignee and
+    (on resolution) commenter gets one notification for the whole set, and
+    each reporter one status email. Resolved issues get their feedback
+    tokens in one INSERT, so the email carries the rating links. Cached
+    counts (workload snapshot, counter deltas) change only once the
+    surrounding transaction commits, so readers never cache the
+    uncommitted state.
+    """
+    from dashboard.fragments import FragmentVersions
+    from notifications.services import AdminDashboardService, NotificationService
+    from .workload import WorkloadService
+
+    if now is None:
+        now = timezone.now()
+
+    with transaction.atomic():
+        targets = issues.exclude(status=new_status).order_by()
+        if connection.features.has_select_for_update:
+            targets = targets.select_for_update()
+        changed = list(targets.values("pk", "title", "status", "priority", "reporter_id", "assigned_to_id"))
+        if not changed:
+            return []
+
+        ids = [row["pk"] for row in changed]
+        fields = {"status": new_status, "updated_at": now}
+        if new_status in RESOLVED_STATUSES:
+            fields["resolved_at"] = Coalesce("resolved_at", Value(now))
+        Issue.objects.filter(pk__in=ids).update(**fields)
+
+        logger.info("Moved %d issues to %s", len(ids), new_status)
+        WorkloadService.invalidate()
+        FragmentVersions.bump("issues")
+        AdminDashboardService.notify_bulk_status_change(changed, new_status)
+        NotificationService.notify_bulk_status_change(changed, new_status, changed_by)
+        NotificationService.email_bulk_status_change(changed, new_status, changed_by)
+    return ids
@@ -1,10 +1,13 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from .models import Issue, Comment, Upvote, MaintenanceWindow
 from notifications.services import NotificationService, AdminDashboardService
+from notifications.dashboard_stats import AdminDashboardStats
 from .ai_services import ai_service
+from .search import get_search_backend
+from .workload import WorkloadService
 from utils.email_service import send_maintenance_scheduled_email
 
 User = get_user_model()
@@ -74,6 +77,11 @@ def analyze_comment_sentiment(instance):
 @receiver(post_save, sender=Issue)
 def issue_created_or_updated(sender, instance, created, **kwargs):
     """Handle issue creation and updates."""
+    if _workload_changed(instance, created):
+        WorkloadService.invalidate()
+    if created or getattr(instance, "_old_search_text", None) != _search_text(instance):
+        get_search_backend().index([instance.pk])
+
     if created:
         # New issue created
         AdminDashboardService.notify_new_issue(instance)
@@ -120,6 +128,28 @@ def issue_created_or_updated(sender, instance, created, **kwargs):
                 )
 
 
+def _workload_changed(instance, created):
+    """Whether saving `instance` may change an assignee's active issue count."""
+    if created:
+        return instance.assigned_to_id is not None
+    old_status = getattr(instance, "_old_status", None)
+    old_assignee = getattr(instance, "_old_assigned_to_id", None)
+    return old_status != instance.status or old_assignee != instance.assigned_to_id
+
+
+def _search_text(issue):
+    return (issue.title, issue.description, issue.location)
+
+
+@receiver(post_delete, sender=Issue)
+def issue_deleted(sender, instance, **kwargs):
+    """Deleted issues invalidate the admin dashboard counters and staff workload."""
+    AdminDashboardStats.invalidate()
+    if instance.assigned_to_id is not None:
+        WorkloadService.invalidate()
+    get_search_backend().remove([instance.pk])
+
+
 @receiver(pre_save, sender=Issue)
 def issue_pre_save(sender, instance, **kwargs):
     """
@@ -135,6 +165,8 @@ def issue_pre_save(sender, instance, **kwargs):
         return
 
     instance._old_status = old.status  # type: ignore[attr-defined]
+    instance._old_assigned_to_id = old.assigned_to_id  # type: ignore[attr-defined]
+    instance._old_search_text = _search_text(old)  # type: ignore[attr-defined]
 
     # Keep resolved_at in sync when status becomes resolved/closed
     if old.status != instance.status and instance.status in {"resolved", "closed"} and not instance.resolved_at:
@@ -156,6 +188,20 @@ def comment_created(sender, instance, created, **kwargs):
         )
 
 
+@receiver(post_save, sender=Comment)
+def comment_saved_reindex(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the issue's comments column of the search index current."""
+    if created or update_fields is None or "content" in update_fields:
+        get_search_backend().index([instance.issue_id])
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    """Reindex the issue, unless the comment goes with its issue."""
+    if not isinstance(origin, Issue) and getattr(origin, "model", None) is not Issue:
+        get_search_backend().index([instance.issue_id])
+
+
 @receiver(post_save, sender=Upvote)
 def upvote_created(sender, instance, created, **kwargs):
     """Handle new upvote creation."""
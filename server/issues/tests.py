@@ -1,7 +1,16 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 from unittest import mock
 
+from campusfix.testing import QueryBudget, QueryBudgetExceeded, seed_volume
+from utils.fault_injection import get_injector
 from . import ai_services
+from .models import Issue
 
 
 class GeminiAIServiceTests(TestCase):
@@ -81,3 +90,526 @@ class GeminiAIServiceTests(TestCase):
             self.assertIn('third time lucky', result)
             # should report which fallback was used
             self.assertIn('models/gemini-pro', result)
+
+
+
+@override_settings(GEMINI_MODEL_CLASS='issues.ai_fakes.FakeGenerativeModel')
+class FakeGeminiTests(TestCase):
+    def test_available_without_api_key(self):
+        service = ai_services.GeminiAIService()
+        service.api_key = ''
+        self.assertTrue(service.is_available())
+
+    def test_sentiment_is_deterministic(self):
+        service = ai_services.GeminiAIService()
+        text = "This is unacceptable!!! The heater is still broken again."
+        first = service.analyze_sentiment(text)
+        self.assertEqual(first, service.analyze_sentiment(text))
+        self.assertEqual(first['sentiment'], 'angry')
+        self.assertTrue(first['needs_escalation'])
+        self.assertEqual(service.analyze_sentiment("The tap drips a little.")['sentiment'], 'neutral')
+
+    @override_settings(GEMINI_FAKE={'rate_limited': 'models/gemini-1.5-flash'})
+    def test_rate_limited_primary_uses_fallback(self):
+        service = ai_services.GeminiAIService()
+        service.model = 'models/gemini-1.5-flash'
+        service.fallback_models = ['models/gemini-1.5-flash', 'models/gemini-2.0-flash']
+
+        result = service._generate_with_fallback('monthly report')
+        self.assertIn("'models/gemini-2.0-flash' was used instead", result)
+        self.assertEqual(get_injector('GEMINI_FAKE').stats()['rate_limited'], 1)
+
+    @override_settings(GEMINI_FAKE={'error_rate': '1', 'latency': '0.01'})
+    def test_injected_errors_and_latency(self):
+        service = ai_services.GeminiAIService()
+        started = time.perf_counter()
+        result = service.analyze_sentiment("The lift is broken.")
+        self.assertGreaterEqual(time.perf_counter() - started, 0.01)
+        self.assertEqual(result['sentiment'], 'neutral')
+        self.assertIn('Analysis failed', result['reason'])
+
+
+
+class MarkOverdueIssuesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from accounts.models import User
+
+        cls.admins = [
+            User.objects.create_user(email=f'admin{i}@example.com', password='pass12345', role='admin')
+            for i in range(2)
+        ]
+        cls.student = User.objects.create_user(email='reporter@example.com', password='pass12345')
+        cls.past_due = []
+        for i in range(3):
+            issue = Issue.objects.create(
+                title=f'Leak {i}', description='Water on the floor', category='plumbing',
+                location='Block A', reporter=cls.student,
+            )
+            cls.past_due.append(issue)
+        cls.not_due = Issue.objects.create(
+            title='Flicker', description='Light flickers', category='electrical',
+            location='Block B', reporter=cls.student,
+        )
+        cls.resolved = Issue.objects.create(
+            title='Door', description='Door jammed', category='facilities',
+            location='Block C', reporter=cls.student, status='resolved',
+        )
+
+    def setUp(self):
+        from django.utils import timezone
+        from datetime import timedelta
+
+        past = timezone.now() - timedelta(hours=1)
+        Issue.objects.filter(pk__in=[i.pk for i in self.past_due] + [self.resolved.pk]).update(
+            sla_due_at=past, is_overdue=False,
+        )
+        Issue.objects.filter(pk=self.not_due.pk).update(
+            sla_due_at=timezone.now() + timedelta(hours=1), is_overdue=False,
+        )
+
+    def test_flags_in_bulk_and_sends_one_digest_per_admin(self):
+        from notifications.models import Notification
+        from .services import mark_overdue_issues
+
+        flagged = mark_overdue_issues(batch_size=2)
+        self.assertCountEqual(flagged, [i.pk for i in self.past_due])
+        self.assertEqual(Issue.objects.filter(is_overdue=True).count(), 3)
+
+        digests = Notification.objects.filter(user__in=self.admins)
+        self.assertEqual(digests.count(), 2)
+        self.assertEqual(digests.first().title, '3 issues are overdue')
+        self.assertIn('#%d Leak 0' % self.past_due[0].pk, digests.first().message)
+
+        # Already flagged issues are not picked up again
+        self.assertEqual(mark_overdue_issues(), [])
+        self.assertEqual(digests.count(), 2)
+
+    def test_sweep_invalidates_issue_fragments(self):
+        from dashboard.fragments import FragmentVersions
+        from .services import mark_overdue_issues
+
+        before = FragmentVersions.get('issues')['issues']
+        with self.captureOnCommitCallbacks(execute=True):
+            mark_overdue_issues()
+        self.assertNotEqual(FragmentVersions.get('issues')['issues'], before)
+
+    def test_periodic_maintenance_check_runs_the_sweep(self):
+        import io
+        from django.core.management import call_command
+
+        call_command('check_maintenance_windows', stdout=io.StringIO())
+        self.assertCountEqual(
+            Issue.objects.filter(is_overdue=True).values_list('pk', flat=True),
+            [i.pk for i in self.past_due],
+        )
+
+    def test_dashboard_home_does_not_write(self):
+        admin = self.admins[0]
+        admin.is_staff = True
+        admin.save()
+        self.client.force_login(admin)
+        self.client.cookies['dashboard_sessionid'] = self.client.cookies['sessionid'].value
+
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Issue.objects.filter(is_overdue=True).exists())
+
+
+class WorkloadServiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from accounts.models import User
+
+        cls.staff = User.objects.create_user(email='staff@example.com', password='pass12345', role='staff')
+        cls.other = User.objects.create_user(email='other@example.com', password='pass12345', role='staff')
+        cls.student = User.objects.create_user(email='reporter@example.com', password='pass12345')
+        cls.issues = [
+            Issue.objects.create(
+                title=f'Leak {i}', description='Water on the floor', category='plumbing',
+                location='Block A', reporter=cls.student, assigned_to=cls.staff, status=status,
+            )
+            for i, status in enumerate(['open', 'in-progress', 'resolved'])
+        ]
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_snapshot_is_one_query_then_cached(self):
+        from .workload import WorkloadService
+
+        with self.assertNumQueries(1):
+            self.assertEqual(WorkloadService.snapshot(), {self.staff.pk: 2})
+        with self.assertNumQueries(0):
+            users = WorkloadService.annotate([self.staff, self.other])
+        self.assertEqual([u.open_assigned_count for u in users], [2, 0])
+        self.assertEqual([u.workload_status for u in users], ['Busy', 'Available'])
+
+    def test_invalidated_on_assignment_status_change_and_delete(self):
+        from .workload import WorkloadService
+
+        WorkloadService.snapshot()
+        issue = self.issues[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.assigned_to = self.other
+            issue.save()
+            # Dropped on commit, so no reader caches the uncommitted counts
+            self.assertEqual(WorkloadService.snapshot(), {self.staff.pk: 2})
+        self.assertEqual(WorkloadService.snapshot(), {self.staff.pk: 1, self.other.pk: 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.status = 'resolved'
+            issue.save()
+        self.assertEqual(WorkloadService.snapshot(), {self.staff.pk: 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.issues[1].delete()
+        self.assertEqual(WorkloadService.snapshot(), {})
+
+    def test_unrelated_saves_keep_the_snapshot(self):
+        from .workload import WorkloadService
+
+        WorkloadService.snapshot()
+        issue = self.issues[0]
+        issue.title = 'Leak under the sink'
+        issue.save()
+        with self.assertNumQueries(0):
+            WorkloadService.snapshot()
+
+
+class IssueSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from accounts.models import User
+
+        cls.student = User.objects.create_user(email='reporter@example.com', password='pass12345')
+        cls.tap = Issue.objects.create(
+            title='Broken taps in the kitchen', description='Water everywhere', category='plumbing',
+            location='Hostel B', reporter=cls.student,
+        )
+        cls.mentions_tap = Issue.objects.create(
+            title='Wet floor', description='Probably a broken tap upstairs', category='plumbing',
+            location='Library', reporter=cls.student,
+        )
+        cls.lights = Issue.objects.create(
+            title='Lights out', description='Corridor is dark', category='electrical',
+            location='Hostel B', reporter=cls.student,
+        )
+
+    def titles(self, query, **kwargs):
+        from .search import get_search_backend
+
+        return [issue.title for issue in get_search_backend().search(Issue.objects.all(), query, **kwargs)]
+
+    def test_prefix_terms_ranked_title_first(self):
+        self.assertEqual(self.titles('brok tap'), ['Broken taps in the kitchen', 'Wet floor'])
+        self.assertEqual(sorted(self.titles('hostel')), ['Broken taps in the kitchen', 'Lights out'])
+        self.assertEqual(self.titles('  ?! '), [issue.title for issue in Issue.objects.all()])
+
+    def test_query_without_words_matches_nothing(self):
+        from .search import get_search_backend
+
+        backend = get_search_backend()
+        for query in ('#', '!!!', '-'):
+            self.assertFalse(Issue.objects.filter(backend.matches(query)).exists())
+            self.assertIsNone(backend.rank(query))
+
+    def test_index_follows_issue_and_comment_signals(self):
+        from .models import Comment
+
+        comment = Comment.objects.create(issue=self.lights, user=self.student, content='Fuse box sparking')
+        self.assertEqual(self.titles('fuse'), ['Lights out'])
+        comment.delete()
+        self.assertEqual(self.titles('fuse'), [])
+
+        self.lights.title = 'Flickering lamps'
+        self.lights.save()
+        self.assertEqual(self.titles('flicker'), ['Flickering lamps'])
+        self.assertEqual(self.titles('lights'), [])
+
+        self.lights.delete()
+        self.assertEqual(self.titles('flicker'), [])
+
+    def test_rebuild_after_bulk_create(self):
+        from django.core.management import call_command
+        from io import StringIO
+
+        Issue.objects.bulk_create([Issue(
+            title='Cracked window', description='Glass', category='facilities',
+            location='Block D', reporter=self.student,
+        )])
+        self.assertEqual(self.titles('cracked'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 4 issue(s)', out.getvalue())
+        self.assertEqual(self.titles('cracked'), ['Cracked window'])
+
+    def test_api_search_uses_index_and_visibility(self):
+        Issue.objects.filter(pk=self.mentions_tap.pk).update(visibility='private')
+        from accounts.models import User
+        other = User.objects.create_user(email='other@example.com', password='pass12345')
+        client = APIClient()
+        client.force_authenticate(other)
+        response = client.get('/api/issues/', {'search': 'tap'})
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual([row['title'] for row in results], ['Broken taps in the kitchen'])
+
+    @override_settings(ISSUE_SEARCH_BACKEND='issues.search.DatabaseSearchBackend')
+    def test_database_backend(self):
+        self.assertEqual(sorted(self.titles('brok tap')), ['Broken taps in the kitchen', 'Wet floor'])
+
+
+class BulkTransitionStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from accounts.models import User
+
+        cls.admin = User.objects.create_user(email='admin@example.com', password='pass12345', role='admin')
+        cls.reporters = [
+            User.objects.create_user(email=f'reporter{i}@example.com', password='pass12345') for i in range(3)
+        ]
+
+    def create_issues(self, count):
+        return [
+            Issue.objects.create(
+                title=f'Leak {i}', description='Water on the floor', category='plumbing',
+                location='Block A', reporter=self.reporters[i % 3],
+            ).pk
+            for i in range(count)
+        ]
+
+    def transition(self, ids, status='resolved'):
+        from .services import bulk_transition_status
+
+        with mock.patch('notifications.services.AdminDashboardService.broadcast_dashboard_update') as broadcast:
+            changed = bulk_transition_status(Issue.objects.filter(pk__in=ids), status, self.admin)
+        return changed, broadcast
+
+    def test_resolves_in_sql_and_notifies_once_per_person(self):
+        from notifications.models import Notification
+
+        ids = self.create_issues(9)
+        Issue.objects.filter(pk=ids[0]).update(status='resolved')
+        changed, broadcast = self.transition(ids)
+
+        self.assertEqual(sorted(changed), ids[1:])
+        self.assertFalse(Issue.objects.filter(pk__in=ids).exclude(status='resolved').exists())
+        self.assertFalse(Issue.objects.filter(pk__in=changed, resolved_at__isnull=True).exists())
+        broadcast.assert_called_once()
+        event_type, data = broadcast.call_args.args
+        self.assertEqual(event_type, 'bulk_status_change')
+        self.assertEqual(data['stats_delta'], {'open_issues': -8, 'resolved_issues': 8})
+        notifications = Notification.objects.filter(title__endswith='moved to Resolved')
+        self.assertEqual(sorted(n.user_id for n in notifications), sorted(r.pk for r in self.reporters))
+
+    def test_resolution_creates_feedback_tokens_emails_and_tells_commenters(self):
+        from django.core import mail
+        from notifications.models import Notification
+        from .models import Comment, FeedbackToken
+
+        issues = [
+            Issue.objects.create(
+                title=f'Leak {i}', description='Water on the floor', category='plumbing',
+                location='Block A', reporter=self.reporters[0],
+            )
+            for i in range(2)
+        ]
+        Comment.objects.create(issue=issues[0], user=self.reporters[1], content='Same here')
+        mail.outbox.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.transition([issue.pk for issue in issues])
+
+        tokens = {token.issue_id: token for token in FeedbackToken.objects.all()}
+        self.assertCountEqual(tokens, [issue.pk for issue in issues])
+        emails = [email for email in mail.outbox if email.subject == 'Update on 2 of your issues']
+        self.assertEqual(len(emails), 1)
+        self.assertEqual(emails[0].to, [self.reporters[0].email])
+        html = emails[0].alternatives[0][0]
+        for issue in issues:
+            self.assertIn(f'/issues/{issue.pk}/rate/5?token={tokens[issue.pk].token}', html)
+        self.assertTrue(Notification.objects.filter(
+            user=self.reporters[1], title='Status updated on: Leak 0', notification_type='resolution',
+        ).exists())
+
+    def test_query_count_does_not_grow_with_the_set(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        counts = []
+        # the first run also creates the reporters' notification preferences
+        for size in (3, 6, 30):
+            ids = self.create_issues(size)
+            with CaptureQueriesContext(connection) as queries:
+                self.transition(ids, status='in-progress')
+            counts.append(len(queries))
+        self.assertEqual(counts[1], counts[2])
+
+    def test_workload_snapshot_dropped_after_commit(self):
+        from .workload import WorkloadService
+
+        ids = self.create_issues(2)
+        Issue.objects.filter(pk__in=ids).update(assigned_to=self.admin)
+        WorkloadService.invalidate()
+        self.assertEqual(WorkloadService.snapshot(), {self.admin.pk: 2})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.transition(ids)
+            self.assertEqual(WorkloadService.snapshot(), {self.admin.pk: 2})
+        self.assertEqual(WorkloadService.snapshot(), {})
+
+    def test_nothing_to_change(self):
+        ids = self.create_issues(2)
+        Issue.objects.filter(pk__in=ids).update(status='closed')
+        changed, broadcast = self.transition(ids, status='closed')
+        self.assertEqual(changed, [])
+        broadcast.assert_not_called()
+
+
+class MiddlewareProfilingTests(TestCase):
+    def setUp(self):
+        from campusfix.profiling import ProfileRegistry
+        ProfileRegistry.reset()
+        self.addCleanup(ProfileRegistry.reset)
+
+    def test_server_timing_reports_each_layer(self):
+        from django.conf import settings
+        from django.test import override_settings
+        from campusfix.profiling import ProfileRegistry, profile_middleware
+
+        with override_settings(MIDDLEWARE=profile_middleware(settings.MIDDLEWARE)):
+            response = self.client.get('/api/auth/login/')
+
+        timing = response['Server-Timing']
+        # every layer reports, in MIDDLEWARE order, with the total last
+        names = [metric.split(';')[0].strip() for metric in timing.split(',')]
+        self.assertEqual(names, [path.rsplit('.', 1)[1] for path in settings.MIDDLEWARE] + ['middleware'])
+        # the maintenance-window lookup is attributed to its own layer
+        self.assertIn('MaintenanceModeMiddleware;dur=', timing)
+        self.assertIn('desc="1 queries"', timing.split('MaintenanceModeMiddleware')[1].split(',')[0])
+
+        histograms = ProfileRegistry.collect()
+        self.assertEqual(histograms['SecurityHeadersMiddleware'].count, 1)
+        self.assertEqual(histograms['MaintenanceModeMiddleware'].queries, 1)
+
+    def test_histogram_percentiles(self):
+        from campusfix.profiling import LatencyHistogram
+
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.add(ms / 1000, 0)
+        # buckets are ~10% wide, percentiles report the bucket's upper bound
+        self.assertAlmostEqual(histogram.percentile(50), 0.050, delta=0.006)
+        self.assertAlmostEqual(histogram.percentile(99), 0.099, delta=0.011)
+
+
+class QueryBudgetTests(TestCase):
+    def test_exceeded_budget_reports_grouped_sql(self):
+        from accounts.models import User
+
+        with self.assertRaises(QueryBudgetExceeded) as ctx:
+            with QueryBudget(2, label="n+1"):
+                for pk in range(5):
+                    User.objects.filter(pk=pk).exists()
+
+        message = str(ctx.exception)
+        self.assertIn("n+1: 5 queries, budget is 2", message)
+        # the five lookups differ only by literal, so they group into one line
+        self.assertIn('5 x SELECT', message)
+
+    def test_within_budget_passes(self):
+        from accounts.models import User
+
+        with QueryBudget(1) as budget:
+            User.objects.count()
+        self.assertEqual(budget.query_count, 1)
+
+
+class IssueViewSetQueryBudgetTests(TestCase):
+    """
+    Query budgets for every IssueViewSet action at seeded volume
+    (10k issues / 100k comments by default, see campusfix.testing).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        users = seed_volume()
+        cls.admin = users["admin"]
+        cls.student = users["students"][0]
+        cls.issue = Issue.objects.filter(reporter=cls.student, visibility="public").first()
+        cls.resolved = Issue.objects.filter(
+            reporter=cls.student, status__in=["resolved", "closed"]
+        ).first() or Issue.objects.filter(status="resolved").first()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def request(self, budget, method, url, max_ms=None, **kwargs):
+        with QueryBudget(budget, max_ms=max_ms, label=f"{method.upper()} {url}"):
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400, getattr(response, "data", response))
+        return response
+
+    def test_list(self):
+        # The list is unpaginated; ~2s for 10k issues, with headroom for slower CI
+        response = self.request(3, "get", "/api/issues/", max_ms=4000)
+        self.assertGreater(len(response.data), 1000)
+
+    def test_list_filtered(self):
+        self.request(3, "get", "/api/issues/?filter=my-issues&status=open&search=fixture")
+
+    def test_retrieve(self):
+        self.request(12, "get", f"/api/issues/{self.issue.pk}/")
+
+    def test_create(self):
+        self.request(6, "post", "/api/issues/", data={
+            "title": "Projector flickers",
+            "description": "The projector in the lecture hall keeps flickering.",
+            "category": "equipment",
+            "location": "Block A Room 101",
+        }, format="json")
+
+    def test_partial_update(self):
+        self.request(8, "patch", f"/api/issues/{self.issue.pk}/", data={"title": "Projector still flickers"}, format="json")
+
+    def test_destroy(self):
+        self.client.force_authenticate(self.admin)
+        self.request(16, "delete", f"/api/issues/{self.issue.pk}/")
+
+    def test_upvote(self):
+        self.request(12, "post", f"/api/issues/{self.issue.pk}/upvote/")
+
+    def test_attachments(self):
+        upload = SimpleUploadedFile("notes.txt", b"meter readings", content_type="text/plain")
+        self.request(6, "post", f"/api/issues/{self.issue.pk}/attachments/", data={"files": [upload]}, format="multipart")
+
+    def test_comments(self):
+        self.request(3, "get", f"/api/issues/{self.issue.pk}/comments/")
+
+    def test_add_comment(self):
+        open_issue = Issue.objects.filter(reporter=self.student).exclude(status__in=["resolved", "closed"]).first()
+        self.request(5, "post", f"/api/issues/{open_issue.pk}/comments/", data={"content": "Still broken."}, format="json")
+
+    def test_timeline(self):
+        self.request(6, "get", f"/api/issues/{self.issue.pk}/timeline/")
+
+    def test_submit_feedback(self):
+        self.client.force_authenticate(self.resolved.reporter)
+        self.request(8, "post", f"/api/issues/{self.resolved.pk}/submit_feedback/", data={"rating": 4}, format="json")
+
+    def test_work_logs(self):
+        self.request(3, "get", f"/api/issues/{self.issue.pk}/work_logs/")
+
+    def test_add_work_log(self):
+        self.client.force_authenticate(self.admin)
+        self.request(5, "post", f"/api/issues/{self.issue.pk}/work_logs/", data={
+            "issue": self.issue.pk, "work_type": "repair", "hours_spent": "1.5",
+            "description": "Replaced ballast.", "outcome": "Working",
+        }, format="json")
@@ -6,7 +6,7 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, Exists, OuterRef, Prefetch
 from django.utils import timezone
 from datetime import timedelta
 
@@ -19,6 +19,7 @@ from .models import (
     ProgressUpdate,
     AdminWorkLog,
     IssueFeedback,
+    IssueProgressLog,
 )
 from .serializers import (
     IssueListSerializer,
@@ -30,6 +31,11 @@ from .serializers import (
     UpvoteSerializer,
     AdminWorkLogSerializer,
 )
+from .search import IssueSearchFilter
+from security.ratelimit import RateLimiter, set_rate_limit_headers
+
+ISSUE_CREATE_RATE_LIMIT = RateLimiter('10/h', prefix='issue_rate_limit')
+COMMENT_RATE_LIMIT = RateLimiter('30/h', prefix='comment_rate_limit')
 
 
 class IssueViewSet(viewsets.ModelViewSet):
@@ -38,16 +44,32 @@ class IssueViewSet(viewsets.ModelViewSet):
     Supports listing, creating, retrieving, updating, and deleting issues.
     """
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # IssueSearchFilter comes last so it can rank results when no ordering is requested
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, IssueSearchFilter]
     filterset_fields = ['status', 'priority', 'category', 'reporter']
-    search_fields = ['title', 'description', 'location']
+    search_fields = ['title', 'description', 'location', 'comments']
     ordering_fields = ['created_at', 'updated_at', 'upvote_count', 'priority']
     ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset = Issue.objects.all().select_related('reporter').prefetch_related(
-            'upvotes', 'comments', 'attachments', 'evidence_files', 'progress_updates', 'work_logs'
-        )
+        queryset = Issue.objects.all().select_related('reporter', 'verified_by')
+        if self.request.user.is_authenticated:
+            # Read by upvoted_by_user instead of one upvote lookup per issue
+            queryset = queryset.annotate(
+                user_has_upvoted=Exists(
+                    Upvote.objects.filter(issue=OuterRef('pk'), user=self.request.user)
+                )
+            )
+        if self.action == 'retrieve':
+            # Nested serializers of IssueDetailSerializer, with their users
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=Comment.objects.select_related('user')),
+                Prefetch('attachments', queryset=Attachment.objects.select_related('uploaded_by')),
+                Prefetch('evidence_files', queryset=ResolutionEvidence.objects.select_related('admin')),
+                Prefetch('progress_updates', queryset=ProgressUpdate.objects.select_related('admin')),
+                Prefetch('work_logs', queryset=AdminWorkLog.objects.select_related('admin')),
+                Prefetch('progress_logs', queryset=IssueProgressLog.objects.select_related('staff')),
+            )
 
         # Visibility / access rules:
         # - Staff can only see issues assigned to them
@@ -68,6 +90,11 @@ class IssueViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Rate-limited actions record their limiter state on the request
+        return set_rate_limit_headers(response, getattr(request, 'rate_limit', None))
+    
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return IssueDetailSerializer
@@ -78,18 +105,15 @@ class IssueViewSet(viewsets.ModelViewSet):
         return IssueListSerializer
     
     def perform_create(self, serializer):
-        # Apply rate limiting for issue creation
-        from django.core.cache import cache
-        
-        rate_limit_key = f'issue_rate_limit:{self.request.user.id}'
-        request_count = cache.get(rate_limit_key, 0)
-        
-        if request_count >= 10:  # 10 issues per hour
+        # Apply rate limiting for issue creation (10 issues per hour)
+        result = ISSUE_CREATE_RATE_LIMIT.hit(f'issue_create:{self.request.user.id}')
+        self.request.rate_limit = result
+        if not result.allowed:
             from rest_framework.exceptions import Throttled
-            raise Throttled(detail="You have reached the maximum number of issues you can create per hour. Please wait before creating a new issue.")
-        
-        # Increment counter
-        cache.set(rate_limit_key, request_count + 1, 3600)  # 1 hour expiry
+            raise Throttled(
+                wait=result.retry_after,
+                detail="You have reached the maximum number of issues you can create per hour. Please wait before creating a new issue.",
+            )
         
         serializer.save(reporter=self.request.user)
     
@@ -178,7 +202,7 @@ class IssueViewSet(viewsets.ModelViewSet):
         issue = self.get_object()
         
         if request.method == 'GET':
-            comments = issue.comments.all()
+            comments = issue.comments.select_related('user')
             serializer = CommentSerializer(comments, many=True)
             return Response(serializer.data)
         
@@ -201,15 +225,10 @@ class IssueViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            # Apply rate limiting for POST requests
-            from django.core.cache import cache
-            from django.http import HttpResponse
-            
-            # Simple rate limiting check
-            rate_limit_key = f'comment_rate_limit:{request.user.id}'
-            request_count = cache.get(rate_limit_key, 0)
-            
-            if request_count >= 30:  # 30 comments per hour
+            # Apply rate limiting for POST requests (30 comments per hour)
+            result = COMMENT_RATE_LIMIT.hit(f'comment:{request.user.id}')
+            request.rate_limit = result
+            if not result.allowed:
                 return Response(
                     {
                         'error': 'Rate limit exceeded',
@@ -218,9 +237,6 @@ class IssueViewSet(viewsets.ModelViewSet):
                     status=429
                 )
             
-            # Increment counter
-            cache.set(rate_limit_key, request_count + 1, 3600)  # 1 hour expiry
-            
             serializer = CommentSerializer(data=request.data, context={'request': request})
             if serializer.is_valid():
                 serializer.save(issue=issue)
@@ -271,7 +287,7 @@ class IssueViewSet(viewsets.ModelViewSet):
         })
         
         # Work logs
-        work_logs = issue.work_logs.all().order_by('created_at')
+        work_logs = issue.work_logs.select_related('admin').order_by('created_at')
         for log in work_logs:
             # Handle case where admin might be None
             admin_user = log.admin if log.admin else issue.reporter
@@ -294,7 +310,7 @@ class IssueViewSet(viewsets.ModelViewSet):
             })
         
         # Progress updates
-        progress_updates = issue.progress_updates.all().order_by('created_at')
+        progress_updates = issue.progress_updates.select_related('admin').order_by('created_at')
         for update in progress_updates:
             # Handle case where admin might be None
             admin_user = update.admin if update.admin else issue.reporter
@@ -336,7 +352,7 @@ class IssueViewSet(viewsets.ModelViewSet):
             })
         
         # Resolution evidence uploads
-        evidence_files = issue.evidence_files.all().order_by('uploaded_at')
+        evidence_files = issue.evidence_files.select_related('admin').order_by('uploaded_at')
         for evidence in evidence_files:
             # Handle case where admin might be None
             admin_user = evidence.admin if evidence.admin else issue.reporter
@@ -460,7 +476,7 @@ class IssueViewSet(viewsets.ModelViewSet):
         issue = self.get_object()
         
         if request.method == 'GET':
-            work_logs = issue.work_logs.all()
+            work_logs = issue.work_logs.select_related('admin')
             serializer = AdminWorkLogSerializer(work_logs, many=True)
             return Response(serializer.data)
         
@@ -0,0 +1,76 @@
+"""
+Open-issue workload per staff member.
+
+The number of active issues assigned to each user is read with one grouped
+query and cached as a single {user_id: count} snapshot, shared by the staff
+overview, the calendar staff panel and the assignment dropdown. The snapshot
+is dropped whenever an issue is assigned, reassigned, changes status or is
+deleted (see issues.signals), so it is rebuilt on the next read. The drop
+waits for the writing transaction to commit; dropping it earlier would let
+a concurrent reader cache the pre-commit counts again.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Issue
+
+CACHE_KEY = "staff_workload_snapshot"
+# Safety net only; the snapshot is invalidated on every change that affects it
+SNAPSHOT_TIMEOUT = getattr(settings, "STAFF_WORKLOAD_CACHE_SECONDS", 600)
+
+# Statuses counted as load on the assignee
+ACTIVE_STATUSES = ["open", "in-progress"]
+BUSY_AT = 1
+OVERLOADED_AT = 3
+
+
+class WorkloadService:
+    """Cached count of active assigned issues per user."""
+
+    @staticmethod
+    def compute_snapshot():
+        rows = (
+            Issue.objects.filter(status__in=ACTIVE_STATUSES, assigned_to__isnull=False)
+            .values_list("assigned_to")
+            .annotate(count=Count("id"))
+            .order_by()
+        )
+        return dict(rows)
+
+    @staticmethod
+    def snapshot():
+        counts = cache.get(CACHE_KEY)
+        if counts is None:
+            counts = WorkloadService.compute_snapshot()
+            cache.set(CACHE_KEY, counts, SNAPSHOT_TIMEOUT)
+        return counts
+
+    @staticmethod
+    def invalidate():
+        """Drop the snapshot once the current transaction commits."""
+        transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+    @staticmethod
+    def count_for(user):
+        return WorkloadService.snapshot().get(user.pk, 0)
+
+    @staticmethod
+    def status_for(count):
+        if count >= OVERLOADED_AT:
+            return "Overloaded"
+        if count >= BUSY_AT:
+            return "Busy"
+        return "Available"
+
+    @staticmethod
+    def annotate(users):
+        """Evaluate `users`, setting `open_assigned_count` and `workload_status` on each."""
+        counts = WorkloadService.snapshot()
+        users = list(users)
+        for user in users:
+            user.open_assigned_count = counts.get(user.pk, 0)
+            user.workload_status = WorkloadService.status_for(user.open_assigned_count)
+        return users
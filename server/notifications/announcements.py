@@ -0,0 +1,100 @@
+"""
+Cached announcement visibility.
+
+The active announcements (is_active, not expired) are cached as one list
+shared by every reader; each user's dismissed announcement ids are cached
+as a small set. Hiding dismissed announcements is then a set difference in
+memory instead of an anti-join per page render.
+
+The list is dropped whenever an announcement is saved or deleted, and its
+timeout never runs past the next expiry, so expired announcements drop out
+on time; a user's set is dropped when they dismiss an announcement (see
+notifications.signals). Both are dropped once the writing transaction
+commits, so a concurrent reader cannot cache the pre-commit state again.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Announcement, AnnouncementDismissal
+
+ACTIVE_KEY = "announcements:active"
+DISMISSED_PREFIX = "announcements:dismissed"
+ACTIVE_TIMEOUT = getattr(settings, "ANNOUNCEMENT_CACHE_SECONDS", 300)
+DISMISSED_TIMEOUT = getattr(settings, "ANNOUNCEMENT_DISMISSED_CACHE_SECONDS", 86400)
+
+# Audiences each kind of reader sees (admins see every audience)
+STAFF_AUDIENCES = {"all", "staff"}
+STUDENT_AUDIENCES = {"all", "students"}
+
+
+def _dismissed_key(user_id):
+    return f"{DISMISSED_PREFIX}:{user_id}"
+
+
+class ActiveAnnouncements:
+    """Cached active announcements and per-user dismissals."""
+
+    @staticmethod
+    def active(now=None):
+        """Active, unexpired announcements, newest first."""
+        if now is None:
+            now = timezone.now()
+        announcements = cache.get(ACTIVE_KEY)
+        if announcements is None:
+            announcements = list(
+                Announcement.objects.filter(is_active=True)
+                .filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+                .order_by("-created_at")
+            )
+            timeout = ACTIVE_TIMEOUT
+            expiries = [a.expires_at for a in announcements if a.expires_at]
+            if expiries:
+                # Rebuild no later than the next expiry
+                until_next = (min(expiries) - now) / timedelta(seconds=1)
+                timeout = max(1, min(timeout, int(until_next) + 1))
+            cache.set(ACTIVE_KEY, announcements, timeout)
+        return [a for a in announcements if a.expires_at is None or a.expires_at > now]
+
+    @staticmethod
+    def for_audience(user, now=None):
+        """Active announcements addressed to `user`'s role."""
+        announcements = ActiveAnnouncements.active(now)
+        role = getattr(user, "role", "student")
+        if user.is_superuser or role == "admin":
+            return announcements
+        audiences = STAFF_AUDIENCES if role == "staff" or user.is_staff else STUDENT_AUDIENCES
+        return [a for a in announcements if a.audience in audiences]
+
+    @staticmethod
+    def dismissed_ids(user):
+        key = _dismissed_key(user.pk)
+        dismissed = cache.get(key)
+        if dismissed is None:
+            dismissed = frozenset(
+                AnnouncementDismissal.objects.filter(user=user).values_list("announcement_id", flat=True)
+            )
+            cache.set(key, dismissed, DISMISSED_TIMEOUT)
+        return dismissed
+
+    @staticmethod
+    def undismissed(user, announcements):
+        """`announcements` minus those `user` has dismissed."""
+        if not announcements:
+            return announcements
+        dismissed = ActiveAnnouncements.dismissed_ids(user)
+        return [a for a in announcements if a.pk not in dismissed]
+
+    @staticmethod
+    def invalidate():
+        transaction.on_commit(lambda: cache.delete(ACTIVE_KEY))
+
+    @staticmethod
+    def invalidate_dismissed(user_id):
+        key = _dismissed_key(user_id)
+        transaction.on_commit(lambda: cache.delete(key))
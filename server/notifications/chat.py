@@ -0,0 +1,219 @@
+"""
+Persistence helpers for issue chat (`ChatConsumer`).
+
+- The latest history page is cached per issue and rebuilt from the database
+  (one query, `select_related('user')`) on a miss. Any comment saved or
+  deleted, through chat or the comments API, drops the cached page once its
+  transaction commits (see notifications.signals).
+- Incoming chat messages are buffered for a short interval and written with a
+  single `bulk_create`, then broadcast to the issue group in one frame.
+"""
+
+import asyncio
+import logging
+import weakref
+
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from issues.models import Issue, Comment
+from .outbox import realtime_batch
+
+logger = logging.getLogger(__name__)
+
+CHAT_HISTORY_SIZE = getattr(settings, "CHAT_HISTORY_SIZE", 50)
+CHAT_HISTORY_TIMEOUT = getattr(settings, "CHAT_HISTORY_TIMEOUT", 600)
+CHAT_WRITE_FLUSH_INTERVAL = getattr(settings, "CHAT_WRITE_FLUSH_INTERVAL", 0.2)
+CHAT_WRITE_MAX_BATCH = getattr(settings, "CHAT_WRITE_MAX_BATCH", 50)
+
+# One in-flight history rebuild per issue per process (reconnect storms).
+_history_locks = weakref.WeakValueDictionary()
+
+
+def history_cache_key(issue_id):
+    return f"chat_history:{issue_id}"
+
+
+def serialize_comment(comment):
+    """Chat payload for a comment; expects `comment.user` to be loaded."""
+    return {
+        'id': comment.id,
+        'content': comment.content,
+        'author': {
+            'id': comment.user.id,
+            'email': comment.user.email,
+            'first_name': comment.user.first_name,
+            'last_name': comment.user.last_name,
+        },
+        'created_at': comment.created_at.isoformat(),
+        'is_staff': comment.user.is_staff,
+    }
+
+
+def load_history_page(issue_id, before_id=None, limit=CHAT_HISTORY_SIZE):
+    """
+    Return one page of chat history, oldest first.
+
+    Pages walk backwards from `before_id` (exclusive) using the primary key,
+    so each page is a single indexed query regardless of history length.
+    """
+    qs = Comment.objects.filter(issue_id=issue_id).select_related('user')
+    if before_id is not None:
+        qs = qs.filter(id__lt=before_id)
+
+    # Fetch one extra row to know whether an older page exists.
+    rows = list(qs.order_by('-id')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    rows.reverse()
+    return {
+        'messages': [serialize_comment(comment) for comment in rows],
+        'has_more': has_more,
+    }
+
+
+async def get_recent_history(issue_id):
+    """Latest history page for an issue, served from the cache."""
+    key = history_cache_key(issue_id)
+    history = await cache.aget(key)
+    if history is not None:
+        return history
+
+    lock = _history_locks.get(issue_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _history_locks[issue_id] = lock
+
+    async with lock:
+        history = await cache.aget(key)
+        if history is None:
+            history = await database_sync_to_async(load_history_page)(issue_id)
+            await cache.aset(key, history, CHAT_HISTORY_TIMEOUT)
+    return history
+
+
+def invalidate_history(issue_id):
+    """Drop the cached history page once the current transaction commits."""
+    key = history_cache_key(issue_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class ChatMessageRejected(Exception):
+    """Raised to the sender when a buffered chat message cannot be saved."""
+
+
+class ChatWriteBuffer:
+    """
+    Coalesce chat comment writes from all sockets in this process.
+
+    Messages are flushed every `flush_interval` seconds (or as soon as
+    `max_batch` are pending) with one `bulk_create`. `post_save` is still
+    sent for each comment so notifications and AI analysis keep working,
+    and the resulting real-time notifications are batched by the outbox.
+    """
+
+    def __init__(self, flush_interval=CHAT_WRITE_FLUSH_INTERVAL, max_batch=CHAT_WRITE_MAX_BATCH):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = []
+        self._flush_task = None
+
+    async def submit(self, issue_id, user, content):
+        """Queue a message and wait until it is persisted; returns its payload."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((issue_id, user, content, future))
+
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_later())
+
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            written = await database_sync_to_async(self._write)(batch)
+        except Exception as e:
+            logger.exception("Failed to persist %d chat message(s)", len(batch))
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_issue = {}
+        for (issue_id, _user, _content, future), (message, error) in zip(batch, written):
+            if future.done():
+                continue
+            if error:
+                future.set_exception(ChatMessageRejected(error))
+                continue
+            by_issue.setdefault(issue_id, []).append(message)
+            future.set_result(message)
+
+        channel_layer = get_channel_layer()
+        for issue_id, messages in by_issue.items():
+            if len(messages) == 1:
+                event = {'type': 'chat_message', 'message': messages[0]}
+            else:
+                event = {'type': 'chat_batch', 'messages': messages}
+            try:
+                await channel_layer.group_send(f"issue_{issue_id}", event)
+            except Exception as e:
+                logger.warning("Failed to broadcast chat messages for issue %s: %s", issue_id, e)
+
+    @staticmethod
+    def _write(batch):
+        """Persist a batch; returns a `(message, error)` pair per entry."""
+        issues = Issue.objects.select_related('reporter', 'assigned_to').in_bulk(
+            {issue_id for issue_id, *_ in batch}
+        )
+
+        results = []
+        comments = []
+        for issue_id, user, content, _future in batch:
+            issue = issues.get(issue_id)
+            if issue is None:
+                results.append((None, 'Issue not found'))
+            elif issue.status in ['resolved', 'closed']:
+                results.append((None, 'Cannot comment on a resolved or closed issue.'))
+            else:
+                results.append(None)
+                comments.append(Comment(issue=issue, user=user, content=content))
+
+        if comments:
+            with transaction.atomic():
+                comments = Comment.objects.bulk_create(comments)
+
+            with realtime_batch():
+                for comment in comments:
+                    post_save.send(
+                        sender=Comment,
+                        instance=comment,
+                        created=True,
+                        update_fields=None,
+                        raw=False,
+                        using=comment._state.db,
+                    )
+
+        created = iter(comments)
+        return [
+            result if result is not None else (serialize_comment(next(created)), None)
+            for result in results
+        ]
+
+
+chat_write_buffer = ChatWriteBuffer()
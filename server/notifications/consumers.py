@@ -6,12 +6,22 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
 from .models import Notification
-from issues.models import Issue, Comment
-from accounts.models import User
+from .dashboard_stats import AdminDashboardStats
+from .presence import PresenceTrackingMixin
+from .chat import (
+    ChatMessageRejected,
+    chat_write_buffer,
+    get_recent_history,
+    load_history_page,
+)
+from issues.models import Issue
+from issues.views import COMMENT_RATE_LIMIT
+from security.validators import NoMaliciousContentValidator
 
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+class NotificationConsumer(PresenceTrackingMixin, AsyncWebsocketConsumer):
     """Consumer for real-time notifications."""
     
     async def connect(self):
@@ -23,11 +33,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         self.user = self.scope["user"]
         self.user_group_name = f"user_{self.user.id}"
         
-        # Join user group for personal notifications
-        await self.channel_layer.group_add(
-            self.user_group_name,
-            self.channel_name
-        )
+        # Join user group for personal notifications, plus site-wide announcements
+        await self.join_group(self.user_group_name)
+        await self.join_group("announcements")
         
         await self.accept()
         
@@ -36,11 +44,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
-        if hasattr(self, 'user_group_name'):
-            await self.channel_layer.group_discard(
-                self.user_group_name,
-                self.channel_name
-            )
+        await self.leave_groups()
     
     async def send_unread_notifications(self):
         """Send unread notifications to the user."""
@@ -66,6 +70,20 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             'notification': event['notification']
         }))
     
+    async def notification_batch(self, event):
+        """Handle a coalesced burst of notifications as a single frame."""
+        await self.send(text_data=json.dumps({
+            'type': 'notification_batch',
+            'notifications': event['notifications']
+        }))
+    
+    async def announcement_message(self, event):
+        """Handle announcement broadcast."""
+        await self.send(text_data=json.dumps({
+            'type': 'announcement',
+            'announcement': event['announcement']
+        }))
+    
     @database_sync_to_async
     def get_unread_notifications(self):
         """Get unread notifications for the user."""
@@ -75,7 +93,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         ).order_by('-created_at')[:10])
 
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatConsumer(PresenceTrackingMixin, AsyncWebsocketConsumer):
     """Consumer for real-time chat on issues."""
     
     async def connect(self):
@@ -85,19 +103,17 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
         
         self.user = self.scope["user"]
-        self.issue_id = self.scope['url_route']['kwargs']['issue_id']
-        self.issue_group_name = f"issue_{self.issue_id}"
+        self.issue_id = int(self.scope['url_route']['kwargs']['issue_id'])
         
         # Check if user has access to this issue
         if not await self.can_access_issue():
             await self.close()
             return
         
+        self.issue_group_name = f"issue_{self.issue_id}"
+        
         # Join issue group
-        await self.channel_layer.group_add(
-            self.issue_group_name,
-            self.channel_name
-        )
+        await self.join_group(self.issue_group_name)
         
         await self.accept()
         
@@ -106,44 +122,62 @@ class ChatConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
-        await self.channel_layer.group_discard(
-            self.issue_group_name,
-            self.channel_name
-        )
+        await self.leave_groups()
     
     async def receive(self, text_data):
-        """Handle incoming chat message."""
+        """Handle incoming chat message or history page request."""
         try:
             data = json.loads(text_data)
-            message = data['message']
             
-            # Save message to database
-            comment = await self.save_comment(message)
+            if data.get('type') == 'load_history':
+                await self.send_chat_history(before=data.get('before'))
+                return
             
-            # Broadcast message to all users in the issue
-            await self.channel_layer.group_send(
-                self.issue_group_name,
-                {
-                    'type': 'chat_message',
-                    'message': {
-                        'id': comment.id,
-                        'content': comment.content,
-                        'author': {
-                            'id': comment.author.id,
-                            'email': comment.author.email,
-                            'first_name': comment.author.first_name,
-                            'last_name': comment.author.last_name
-                        },
-                        'created_at': comment.created_at.isoformat(),
-                        'is_staff': comment.author.is_staff
-                    }
-                }
+            message = (data['message'] or '').strip()
+        except (json.JSONDecodeError, KeyError, AttributeError, TypeError, ValueError):
+            await self.send_error('Invalid message format')
+            return
+        
+        error = self.validate_message(message)
+        if error:
+            await self.send_error(error)
+            return
+
+        # Same per-user budget as comments posted through the API
+        result = await database_sync_to_async(COMMENT_RATE_LIMIT.hit)(f'comment:{self.user.id}')
+        if not result.allowed:
+            await self.send_error(
+                'You have reached the maximum number of comments per hour. Please wait before posting again.'
             )
-        except (json.JSONDecodeError, KeyError):
-            await self.send(text_data=json.dumps({
-                'type': 'error',
-                'message': 'Invalid message format'
-            }))
+            return
+        
+        # Persisted in a batched write; the buffer broadcasts to the issue group
+        try:
+            await chat_write_buffer.submit(self.issue_id, self.user, message)
+        except ChatMessageRejected as e:
+            await self.send_error(str(e))
+        except Exception:
+            await self.send_error('Message could not be saved. Please try again.')
+    
+    def validate_message(self, message):
+        """Apply the same content rules as the comments API."""
+        if not self.can_post:
+            return 'You do not have permission to comment on this issue.'
+        if not message:
+            return 'Comment cannot be empty.'
+        if len(message) > 2000:
+            return 'Comment cannot exceed 2000 characters.'
+        try:
+            NoMaliciousContentValidator()(message)
+        except ValidationError:
+            return 'Invalid input detected'
+        return None
+    
+    async def send_error(self, message):
+        await self.send(text_data=json.dumps({
+            'type': 'error',
+            'message': message
+        }))
     
     async def chat_message(self, event):
         """Handle chat message broadcast."""
@@ -152,60 +186,45 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'message': event['message']
         }))
     
+    async def chat_batch(self, event):
+        """Handle several chat messages persisted in the same write batch."""
+        await self.send(text_data=json.dumps({
+            'type': 'chat_batch',
+            'messages': event['messages']
+        }))
+    
     @database_sync_to_async
     def can_access_issue(self):
-        """Check if user can access the issue."""
+        """Check if user can access the issue, and whether they may post."""
         try:
-            issue = Issue.objects.get(id=self.issue_id)
-            return (
-                self.user.is_staff or 
-                issue.author == self.user or 
-                issue.assigned_to == self.user
-            )
+            issue = Issue.objects.only('id', 'status', 'reporter_id', 'assigned_to_id').get(id=self.issue_id)
         except Issue.DoesNotExist:
             return False
-    
-    @database_sync_to_async
-    def save_comment(self, message):
-        """Save comment to database."""
-        issue = Issue.objects.get(id=self.issue_id)
-        return Comment.objects.create(
-            issue=issue,
-            author=self.user,
-            content=message
-        )
-    
-    @database_sync_to_async
-    def get_chat_history(self):
-        """Get recent chat history."""
-        comments = Comment.objects.filter(
-            issue_id=self.issue_id
-        ).order_by('created_at')[:50]
         
-        return [{
-            'id': comment.id,
-            'content': comment.content,
-            'author': {
-                'id': comment.author.id,
-                'email': comment.author.email,
-                'first_name': comment.author.first_name,
-                'last_name': comment.author.last_name
-            },
-            'created_at': comment.created_at.isoformat(),
-            'is_staff': comment.author.is_staff
-        } for comment in comments]
+        role = getattr(self.user, "role", None)
+        is_admin = self.user.is_superuser or role == "admin"
+        is_reporter = issue.reporter_id == self.user.id
+        is_assignee = issue.assigned_to_id == self.user.id
+        
+        # Mirrors IssueViewSet.comments: reporter, admins and assigned staff may post
+        self.can_post = is_admin or is_reporter or (role == "staff" and is_assignee)
+        return self.user.is_staff or is_reporter or is_assignee
     
-    async def send_chat_history(self):
-        """Send chat history to the user."""
-        history = await self.get_chat_history()
+    async def send_chat_history(self, before=None):
+        """Send a page of chat history (latest page from the cache)."""
+        if before is None:
+            history = await get_recent_history(self.issue_id)
+        else:
+            history = await database_sync_to_async(load_history_page)(self.issue_id, int(before))
         
         await self.send(text_data=json.dumps({
             'type': 'chat_history',
-            'messages': history
+            'messages': history['messages'],
+            'has_more': history['has_more'],
         }))
 
 
-class AdminDashboardConsumer(AsyncWebsocketConsumer):
+class AdminDashboardConsumer(PresenceTrackingMixin, AsyncWebsocketConsumer):
     """Consumer for real-time admin dashboard updates."""
     
     async def connect(self):
@@ -219,10 +238,7 @@ class AdminDashboardConsumer(AsyncWebsocketConsumer):
         self.admin_group_name = "admin_dashboard"
         
         # Join admin group
-        await self.channel_layer.group_add(
-            self.admin_group_name,
-            self.channel_name
-        )
+        await self.join_group(self.admin_group_name)
         
         await self.accept()
         
@@ -231,10 +247,7 @@ class AdminDashboardConsumer(AsyncWebsocketConsumer):
     
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
-        await self.channel_layer.group_discard(
-            self.admin_group_name,
-            self.channel_name
-        )
+        await self.leave_groups()
     
     async def dashboard_update(self, event):
         """Handle dashboard update broadcast."""
@@ -243,6 +256,13 @@ class AdminDashboardConsumer(AsyncWebsocketConsumer):
             'data': event['data']
         }))
     
+    async def dashboard_batch(self, event):
+        """Handle a coalesced burst of dashboard updates as a single frame."""
+        await self.send(text_data=json.dumps({
+            'type': 'dashboard_batch',
+            'updates': event['updates']
+        }))
+    
     async def send_dashboard_data(self):
         """Send current dashboard statistics."""
         stats = await self.get_dashboard_stats()
@@ -254,24 +274,5 @@ class AdminDashboardConsumer(AsyncWebsocketConsumer):
     
     @database_sync_to_async
     def get_dashboard_stats(self):
-        """Get dashboard statistics."""
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        now = timezone.now()
-        last_24h = now - timedelta(hours=24)
-        last_7d = now - timedelta(days=7)
-        
-        return {
-            'total_issues': Issue.objects.count(),
-            'open_issues': Issue.objects.filter(status='open').count(),
-            'in_progress_issues': Issue.objects.filter(status='in_progress').count(),
-            'resolved_issues': Issue.objects.filter(status='resolved').count(),
-            'issues_last_24h': Issue.objects.filter(created_at__gte=last_24h).count(),
-            'issues_last_7d': Issue.objects.filter(created_at__gte=last_7d).count(),
-            'total_users': User.objects.count(),
-            'active_users_last_24h': User.objects.filter(
-                last_login__gte=last_24h
-            ).count(),
-            'urgent_issues': Issue.objects.filter(priority='urgent', status__in=['open', 'in_progress']).count(),
-        }
+        """Get the shared dashboard snapshot (kept current by deltas)."""
+        return AdminDashboardStats.get_snapshot()
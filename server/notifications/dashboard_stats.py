@@ -0,0 +1,152 @@
+"""
+Shared live counters for the admin dashboard WebSocket.
+
+A snapshot is computed with one aggregate query per table inside a single
+transaction, stored in the cache as one key per counter and shared by every
+admin socket. Issue creation and status changes then adjust the counters
+with atomic `cache.incr` calls instead of recounting.
+
+Sliding-window counters (last 24h / 7d) only ever grow between snapshots, so
+the snapshot has a short TTL and is rebuilt periodically to let them decay.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from issues.models import Issue
+
+User = get_user_model()
+
+CACHE_PREFIX = "admin_dashboard_stats"
+SNAPSHOT_TIMEOUT = getattr(settings, "ADMIN_DASHBOARD_STATS_TIMEOUT", 300)
+
+# Statuses that still need work (used for the urgent counter).
+ACTIVE_STATUSES = {"open", "in-progress", "reopened"}
+URGENT_PRIORITY = "critical"
+
+
+def _status_field(status):
+    return f"{status.replace('-', '_')}_issues"
+
+
+STATUS_FIELDS = {status: _status_field(status) for status, _label in Issue.STATUS_CHOICES}
+
+FIELDS = [
+    "total_issues",
+    *STATUS_FIELDS.values(),
+    "issues_last_24h",
+    "issues_last_7d",
+    "urgent_issues",
+    "total_users",
+    "active_users_last_24h",
+]
+
+
+def _key(field):
+    return f"{CACHE_PREFIX}:{field}"
+
+
+class AdminDashboardStats:
+    """Cached admin dashboard counters maintained by deltas."""
+
+    @staticmethod
+    def compute_snapshot():
+        """Compute all counters from the database in one consistent read."""
+        now = timezone.now()
+        last_24h = now - timedelta(hours=24)
+        last_7d = now - timedelta(days=7)
+
+        issue_aggregates = {
+            "total_issues": Count("id"),
+            "issues_last_24h": Count("id", filter=Q(created_at__gte=last_24h)),
+            "issues_last_7d": Count("id", filter=Q(created_at__gte=last_7d)),
+            "urgent_issues": Count(
+                "id",
+                filter=Q(priority=URGENT_PRIORITY, status__in=ACTIVE_STATUSES),
+            ),
+        }
+        for status, field in STATUS_FIELDS.items():
+            issue_aggregates[field] = Count("id", filter=Q(status=status))
+
+        with transaction.atomic():
+            stats = Issue.objects.aggregate(**issue_aggregates)
+            stats.update(
+                User.objects.aggregate(
+                    total_users=Count("id"),
+                    active_users_last_24h=Count("id", filter=Q(last_login__gte=last_24h)),
+                )
+            )
+        return stats
+
+    @staticmethod
+    def get_snapshot():
+        """Return the shared snapshot, rebuilding it on a cache miss."""
+        cached = cache.get_many([_key(field) for field in FIELDS])
+        if len(cached) == len(FIELDS):
+            return {field: cached[_key(field)] for field in FIELDS}
+
+        stats = AdminDashboardStats.compute_snapshot()
+        cache.set_many({_key(field): stats[field] for field in FIELDS}, SNAPSHOT_TIMEOUT)
+        return stats
+
+    @staticmethod
+    def invalidate():
+        cache.delete_many([_key(field) for field in FIELDS])
+
+    @staticmethod
+    def apply_delta(delta):
+        """
+        Apply counter changes once the current transaction commits.
+
+        If any counter has expired, the whole snapshot is dropped so the next
+        reader rebuilds a consistent one.
+        """
+        delta = {field: value for field, value in delta.items() if value}
+        if not delta:
+            return
+
+        def _apply():
+            try:
+                for field, value in delta.items():
+                    cache.incr(_key(field), value)
+            except ValueError:
+                AdminDashboardStats.invalidate()
+
+        transaction.on_commit(_apply)
+
+    @staticmethod
+    def new_issue_delta(issue):
+        delta = {
+            "total_issues": 1,
+            "issues_last_24h": 1,
+            "issues_last_7d": 1,
+        }
+        field = STATUS_FIELDS.get(issue.status)
+        if field:
+            delta[field] = 1
+        if issue.priority == URGENT_PRIORITY and issue.status in ACTIVE_STATUSES:
+            delta["urgent_issues"] = 1
+        return delta
+
+    @staticmethod
+    def status_change_delta(issue, old_status, new_status):
+        delta = {}
+        old_field = STATUS_FIELDS.get(old_status)
+        new_field = STATUS_FIELDS.get(new_status)
+        if old_field:
+            delta[old_field] = delta.get(old_field, 0) - 1
+        if new_field:
+            delta[new_field] = delta.get(new_field, 0) + 1
+
+        if issue.priority == URGENT_PRIORITY:
+            was_active = old_status in ACTIVE_STATUSES
+            is_active = new_status in ACTIVE_STATUSES
+            if was_active != is_active:
+                delta["urgent_issues"] = 1 if is_active else -1
+        return delta
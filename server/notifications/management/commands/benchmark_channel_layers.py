@@ -0,0 +1,177 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+GROUP = "benchmark"
+
+
+def layer_configs(capacity):
+    return {
+        "memory": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+            "CONFIG": {"capacity": capacity},
+        },
+        "unix": {
+            "BACKEND": "campusfix.channel_layers.UnixSocketChannelLayer",
+            "CONFIG": {
+                "capacity": capacity,
+                "socket_dir": os.path.join(tempfile.gettempdir(), f"campusfix-bench-{os.getpid()}"),
+            },
+        },
+        "redis": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "capacity": capacity,
+                "hosts": [(
+                    os.environ.get("CAMPUSFIX_REDIS_CHANNEL_HOST", "127.0.0.1"),
+                    int(os.environ.get("CAMPUSFIX_REDIS_CHANNEL_PORT", "6379")),
+                )],
+            },
+        },
+    }
+
+
+def build_layer(config):
+    return import_string(config["BACKEND"])(**config.get("CONFIG", {}))
+
+
+async def _receive_all(layer, ready, count):
+    channel = await layer.new_channel()
+    await layer.group_add(GROUP, channel)
+    ready()
+    received = 0
+    try:
+        while received < count:
+            await asyncio.wait_for(layer.receive(channel), timeout=10)
+            received += 1
+    except asyncio.TimeoutError:
+        pass
+    return received, time.time()
+
+
+def _receiver_process(config, ready_queue, result_queue, count):
+    async def main():
+        layer = build_layer(config)
+        result = await _receive_all(layer, lambda: ready_queue.put(True), count)
+        if hasattr(layer, "close"):
+            await layer.close()
+        return result
+
+    result_queue.put(asyncio.run(main()))
+
+
+async def _send_all(layer, count, batch):
+    for start in range(0, count, batch):
+        await asyncio.gather(*(
+            layer.group_send(GROUP, {"type": "benchmark.message", "seq": seq})
+            for seq in range(start, min(start + batch, count))
+        ))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare group_send fan-out throughput of the in-memory, Unix socket "
+        "and Redis channel layers. Receivers run in separate processes, except "
+        "for the in-memory layer which cannot cross processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--layers", default="memory,unix,redis")
+        parser.add_argument("--messages", type=int, default=2000)
+        parser.add_argument("--receivers", type=int, default=2)
+        parser.add_argument("--batch", type=int, default=50,
+                            help="group_send calls issued concurrently per round")
+
+    def handle(self, *args, **options):
+        count = options["messages"]
+        configs = layer_configs(capacity=count + 10)
+
+        for name in options["layers"].split(","):
+            config = configs.get(name.strip())
+            if config is None:
+                raise CommandError(f"Unknown layer '{name}' (choose from {', '.join(configs)})")
+            try:
+                if name == "memory":
+                    received, elapsed = asyncio.run(
+                        self.run_in_process(config, count, options["receivers"], options["batch"])
+                    )
+                else:
+                    received, elapsed = self.run_multiprocess(
+                        config, count, options["receivers"], options["batch"]
+                    )
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"{name:<8} skipped: {e}"))
+                continue
+
+            expected = count * options["receivers"]
+            rate = received / elapsed if elapsed else 0
+            self.stdout.write(
+                f"{name:<8} delivered={received}/{expected} "
+                f"elapsed={elapsed:.3f}s throughput={rate:,.0f} msg/s"
+            )
+
+    async def run_in_process(self, config, count, receivers, batch):
+        layer = build_layer(config)
+        ready = asyncio.Event()
+        joined = []
+
+        def mark_ready():
+            joined.append(True)
+            if len(joined) == receivers:
+                ready.set()
+
+        tasks = [asyncio.create_task(_receive_all(layer, mark_ready, count)) for _ in range(receivers)]
+        await ready.wait()
+
+        started = time.time()
+        await _send_all(layer, count, batch)
+        results = await asyncio.gather(*tasks)
+        return sum(r for r, _ in results), max(end for _, end in results) - started
+
+    def run_multiprocess(self, config, count, receivers, batch):
+        # Fail fast (missing package, bad config) before spawning receivers
+        build_layer(config)
+
+        ctx = multiprocessing.get_context("spawn")
+        ready_queue, result_queue = ctx.Queue(), ctx.Queue()
+        processes = [
+            ctx.Process(target=_receiver_process, args=(config, ready_queue, result_queue, count))
+            for _ in range(receivers)
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            for _ in processes:
+                try:
+                    ready_queue.get(timeout=30)
+                except queue.Empty:
+                    raise CommandError("receivers did not subscribe in time")
+
+            async def send():
+                layer = build_layer(config)
+                started = time.time()
+                await _send_all(layer, count, batch)
+                if hasattr(layer, "close"):
+                    await layer.close()
+                return started
+
+            started = asyncio.run(send())
+            results = [result_queue.get(timeout=60) for _ in processes]
+        finally:
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            socket_dir = config.get("CONFIG", {}).get("socket_dir")
+            if socket_dir:
+                shutil.rmtree(socket_dir, ignore_errors=True)
+
+        return sum(r for r, _ in results), max(end for _, end in results) - started
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from notifications.presence import PresenceRegistry
+
+
+class Command(BaseCommand):
+    help = (
+        "Show open WebSocket connections per group kind. "
+        "Needs a shared (Redis) presence cache to see other processes."
+    )
+
+    def handle(self, *args, **options):
+        for kind, gauge in PresenceRegistry.gauges().items():
+            self.stdout.write(f"{kind:<16} sockets={gauge['sockets']:<6} groups={gauge['groups']}")
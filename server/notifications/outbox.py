@@ -0,0 +1,160 @@
+"""
+Outbox for channel-layer (WebSocket) events.
+
+Real-time events produced while a request or background job runs are
+collected in a per-context outbox and flushed once, after the surrounding
+database transaction commits. Consecutive events of the same kind sent to
+the same group are coalesced into a single batched frame, so a burst of
+notifications costs one channel-layer round-trip and one client re-render.
+"""
+
+import asyncio
+import contextvars
+import logging
+from contextlib import contextmanager
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Message types that consumers accept in batched form:
+# message type -> (batched frame type, per-message payload key, batch payload key)
+BATCHED_TYPES = {
+    'notification_message': ('notification_batch', 'notification', 'notifications'),
+    'dashboard_update': ('dashboard_batch', 'data', 'updates'),
+}
+
+_current_outbox = contextvars.ContextVar('realtime_outbox', default=None)
+
+
+def coalesce_messages(messages):
+    """
+    Collapse runs of batchable messages of the same type into one frame.
+
+    Ordering between different message types is preserved.
+    """
+    frames = []
+    for message in messages:
+        spec = BATCHED_TYPES.get(message.get('type'))
+        if spec is None or not frames:
+            frames.append(message)
+            continue
+
+        batch_type, item_key, batch_key = spec
+        last = frames[-1]
+        if last.get('type') == batch_type:
+            last[batch_key].append(message[item_key])
+        elif last.get('type') == message['type']:
+            frames[-1] = {
+                'type': batch_type,
+                batch_key: [last[item_key], message[item_key]],
+            }
+        else:
+            frames.append(message)
+    return frames
+
+
+class RealtimeOutbox:
+    """Collects channel-layer messages per group until flushed."""
+
+    def __init__(self):
+        self._groups = {}
+
+    def __len__(self):
+        return sum(len(messages) for messages in self._groups.values())
+
+    def add(self, group, message):
+        self._groups.setdefault(group, []).append(message)
+
+    def frames(self):
+        """Return the coalesced (group, message) pairs to send."""
+        frames = []
+        for group, messages in self._groups.items():
+            frames.extend((group, message) for message in coalesce_messages(messages))
+        return frames
+
+
+def send_frames(frames):
+    """Send (group, message) pairs through a single sync-to-async bridge."""
+    if not frames:
+        return
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    by_group = {}
+    for group, message in frames:
+        by_group.setdefault(group, []).append(message)
+
+    async def _send_group(group, messages):
+        # Sequential per group to keep ordering within it
+        for message in messages:
+            try:
+                await channel_layer.group_send(group, message)
+            except Exception as e:
+                logger.warning("Failed to send real-time event to %s: %s", group, e)
+
+    async def _send_all():
+        # Groups are sent concurrently so batching layers can coalesce them
+        await asyncio.gather(*(
+            _send_group(group, messages) for group, messages in by_group.items()
+        ))
+
+    try:
+        async_to_sync(_send_all)()
+    except Exception as e:
+        # Never fail the caller because the channel layer is unavailable
+        logger.warning("Failed to flush real-time events: %s", e)
+
+
+def queue_group_send(group, message):
+    """
+    Queue a channel-layer message for `group`.
+
+    Inside a `realtime_batch()` the message joins the current outbox;
+    otherwise it is sent on its own once the current transaction commits.
+    """
+    outbox = _current_outbox.get()
+    if outbox is not None:
+        outbox.add(group, message)
+        return
+
+    transaction.on_commit(lambda: send_frames([(group, message)]))
+
+
+@contextmanager
+def realtime_batch():
+    """
+    Collect real-time events for the duration of the block and flush them
+    once on exit (deferred to transaction commit when inside `atomic`).
+
+    Nested blocks share the outermost outbox.
+    """
+    outbox = _current_outbox.get()
+    if outbox is not None:
+        yield outbox
+        return
+
+    outbox = RealtimeOutbox()
+    token = _current_outbox.set(outbox)
+    try:
+        yield outbox
+    finally:
+        _current_outbox.reset(token)
+        if len(outbox):
+            frames = outbox.frames()
+            transaction.on_commit(lambda: send_frames(frames))
+
+
+class RealtimeOutboxMiddleware:
+    """Batch all real-time events emitted while handling a request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with realtime_batch():
+            return self.get_response(request)
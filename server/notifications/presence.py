@@ -0,0 +1,153 @@
+"""
+Presence registry for WebSocket groups.
+
+Consumers register every group they join or leave, keeping per-group socket
+counts in a dedicated cache alias. `NotificationService` uses this to skip
+channel-layer sends to users with no open socket, and `gauges()` exposes
+connection counts per group kind for capacity planning.
+
+The registry is only trusted once its epoch marker exists: after a cache
+flush or restart every user is treated as possibly online until sockets
+reconnect, so real-time delivery is never skipped by mistake.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+PRESENCE_ENABLED = getattr(settings, "WEBSOCKET_PRESENCE_ENABLED", True)
+
+PREFIX = "presence"
+EPOCH_KEY = f"{PREFIX}:epoch"
+
+# Group name prefix -> gauge kind
+GROUP_KINDS = {
+    "user_": "user",
+    "issue_": "issue",
+    "admin_dashboard": "admin_dashboard",
+    "announcements": "announcements",
+}
+
+
+def _cache():
+    alias = "presence" if "presence" in settings.CACHES else "default"
+    return caches[alias]
+
+
+def group_kind(group):
+    for prefix, kind in GROUP_KINDS.items():
+        if group.startswith(prefix):
+            return kind
+    return "other"
+
+
+def _group_key(group):
+    return f"{PREFIX}:group:{group}"
+
+
+def _sockets_key(kind):
+    return f"{PREFIX}:sockets:{kind}"
+
+
+def _groups_key(kind):
+    return f"{PREFIX}:groups:{kind}"
+
+
+def _incr(cache, key, delta=1):
+    """Atomic increment that creates the counter if needed; never below zero."""
+    if delta > 0:
+        cache.add(key, 0, None)
+        return cache.incr(key, delta)
+    try:
+        value = cache.decr(key, -delta)
+    except ValueError:
+        return 0
+    if value < 0:
+        cache.set(key, 0, None)
+        return 0
+    return value
+
+
+class PresenceRegistry:
+    """Connection counts per channel-layer group."""
+
+    @staticmethod
+    def joined(group):
+        cache = _cache()
+        cache.add(EPOCH_KEY, 1, None)
+        kind = group_kind(group)
+        count = _incr(cache, _group_key(group))
+        _incr(cache, _sockets_key(kind))
+        if count == 1:
+            _incr(cache, _groups_key(kind))
+        return count
+
+    @staticmethod
+    def left(group):
+        cache = _cache()
+        kind = group_kind(group)
+        count = _incr(cache, _group_key(group), -1)
+        _incr(cache, _sockets_key(kind), -1)
+        if count == 0:
+            _incr(cache, _groups_key(kind), -1)
+        return count
+
+    @staticmethod
+    def count(group):
+        return _cache().get(_group_key(group), 0)
+
+    @staticmethod
+    def has_listeners(group):
+        """
+        False only when the registry knows the group has no sockets.
+
+        Unknown state (registry not yet initialised, or counters not shared
+        between worker processes) counts as listening.
+        """
+        if not PRESENCE_ENABLED:
+            return True
+        cache = _cache()
+        key = _group_key(group)
+        values = cache.get_many([EPOCH_KEY, key])
+        if EPOCH_KEY not in values:
+            return True
+        return values.get(key, 0) > 0
+
+    @staticmethod
+    def is_online(user_id):
+        return PresenceRegistry.has_listeners(f"user_{user_id}")
+
+    @staticmethod
+    def gauges():
+        """Open sockets and non-empty groups per group kind."""
+        kinds = sorted(set(GROUP_KINDS.values())) + ["other"]
+        keys = [_sockets_key(kind) for kind in kinds] + [_groups_key(kind) for kind in kinds]
+        values = _cache().get_many(keys)
+        return {
+            kind: {
+                "sockets": values.get(_sockets_key(kind), 0),
+                "groups": values.get(_groups_key(kind), 0),
+            }
+            for kind in kinds
+        }
+
+
+class PresenceTrackingMixin:
+    """
+    Mixin for consumers: join/leave channel-layer groups and keep the
+    presence registry in step.
+    """
+
+    async def join_group(self, group):
+        await self.channel_layer.group_add(group, self.channel_name)
+        if not hasattr(self, "_presence_groups"):
+            self._presence_groups = set()
+        if group not in self._presence_groups:
+            self._presence_groups.add(group)
+            await sync_to_async(PresenceRegistry.joined, thread_sensitive=False)(group)
+
+    async def leave_groups(self):
+        for group in getattr(self, "_presence_groups", ()):
+            await self.channel_layer.group_discard(group, self.channel_name)
+            await sync_to_async(PresenceRegistry.left, thread_sensitive=False)(group)
+        self._presence_groups = set()
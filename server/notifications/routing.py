@@ -7,6 +7,6 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/notifications/$', consumers.NotificationConsumer.as_asgi()),
-    re_path(r'ws/chat/(?P<issue_id>\w+)/$', consumers.ChatConsumer.as_asgi()),
+    re_path(r'ws/chat/(?P<issue_id>\d+)/$', consumers.ChatConsumer.as_asgi()),
     re_path(r'ws/admin/dashboard/$', consumers.AdminDashboardConsumer.as_asgi()),
 ]
@@ -1,19 +1,20 @@
-from django.db import models
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.conf import settings
 from django.core.mail import send_mail
 from .models import Notification, NotificationPreference
+from .outbox import queue_group_send
+from .dashboard_stats import AdminDashboardStats
+from .presence import PresenceRegistry
 from utils.email_service import (
     send_issue_status_update_email,
-    send_issue_assigned_email
+    send_issue_assigned_email,
+    send_issues_status_update_email,
 )
 from issues.models import FeedbackToken
 
 User = get_user_model()
-channel_layer = get_channel_layer()
 
 
 class NotificationService:
@@ -60,9 +61,12 @@ class NotificationService:
     
     @staticmethod
     def _send_real_time_notification(user, notification):
-        """Send real-time notification via WebSocket."""
+        """Queue real-time notification via WebSocket (flushed on commit)."""
         try:
-            async_to_sync(channel_layer.group_send)(
+            # No open socket: the user sees it from the unread list on connect
+            if not PresenceRegistry.is_online(user.id):
+                return
+            queue_group_send(
                 f"user_{user.id}",
                 {
                     'type': 'notification_message',
@@ -79,7 +83,7 @@ class NotificationService:
             )
         except Exception as e:
             # Log error but don't fail the notification creation
-            print(f"Failed to send real-time notification: {e}")
+            print(f"Failed to queue real-time notification: {e}")
     
     @staticmethod
     def _should_send_email(preferences, notification_type):
@@ -153,6 +157,98 @@ class NotificationService:
                 related_issue=issue
             )
     
+    @staticmethod
+    def notify_bulk_status_change(issues, new_status, changed_by, max_items=10):
+        """
+        One notification per reporter and assignee (and, for a resolution,
+        per commenter, as in notify_issue_resolution) for a bulk status change.
+
+        `issues` are dicts with pk, title, reporter_id and assigned_to_id.
+        """
+        from issues.models import Comment, Issue
+
+        by_user = {}
+        for issue in issues:
+            for user_id in {issue["reporter_id"], issue["assigned_to_id"]}:
+                if user_id and user_id != changed_by.id:
+                    by_user.setdefault(user_id, []).append(issue)
+        if new_status == 'resolved':
+            by_pk = {issue["pk"]: issue for issue in issues}
+            commenters = (
+                Comment.objects.filter(issue_id__in=list(by_pk)).exclude(user_id=changed_by.id)
+                .values_list("issue_id", "user_id").distinct()
+            )
+            for issue_id, user_id in commenters:
+                issue = by_pk[issue_id]
+                if user_id not in (issue["reporter_id"], issue["assigned_to_id"]):
+                    by_user.setdefault(user_id, []).append(issue)
+        if not by_user:
+            return
+
+        label = dict(Issue.STATUS_CHOICES).get(new_status, new_status)
+        changer = changed_by.get_full_name() or changed_by.email
+        notification_type = 'resolution' if new_status == 'resolved' else 'status_change'
+        users = User.objects.in_bulk(list(by_user))
+        for user_id, user_issues in by_user.items():
+            lines = [f"- #{issue['pk']} {issue['title']}" for issue in user_issues[:max_items]]
+            if len(user_issues) > max_items:
+                lines.append(f"...and {len(user_issues) - max_items} more.")
+            if len(user_issues) == 1:
+                title = f"Status updated on: {user_issues[0]['title']}"
+            else:
+                title = f"{len(user_issues)} issues moved to {label}"
+            NotificationService.create_notification(
+                user=users[user_id],
+                title=title,
+                message=f"Status changed to {label} by {changer}:\n" + "\n".join(lines),
+                notification_type=notification_type,
+                related_issue=Issue(pk=user_issues[0]['pk']) if len(user_issues) == 1 else None,
+            )
+
+    @staticmethod
+    def email_bulk_status_change(issues, new_status, changed_by):
+        """
+        One status email per reporter for a bulk status change, in place of
+        the per-issue emails of notify_issue_status_change and
+        notify_issue_resolution (closing sends none, as there).
+
+        Resolved issues get their feedback tokens in one INSERT, so each
+        email carries the rating links. Emails go out once the surrounding
+        transaction commits. `issues` are dicts with pk and reporter_id.
+        """
+        if new_status == 'closed':
+            return
+        by_reporter = {}
+        for issue in issues:
+            if issue["reporter_id"] and issue["reporter_id"] != changed_by.id:
+                by_reporter.setdefault(issue["reporter_id"], []).append(issue["pk"])
+        if not by_reporter:
+            return
+
+        tokens = {}
+        if new_status == 'resolved':
+            created = FeedbackToken.objects.bulk_create(
+                [FeedbackToken(issue_id=pk) for pks in by_reporter.values() for pk in pks]
+            )
+            tokens = {token_obj.issue_id: token_obj.token for token_obj in created}
+        transaction.on_commit(
+            lambda: NotificationService._send_bulk_status_emails(by_reporter, new_status, tokens)
+        )
+
+    @staticmethod
+    def _send_bulk_status_emails(by_reporter, new_status, tokens):
+        from issues.models import Issue
+
+        issues = Issue.objects.in_bulk([pk for pks in by_reporter.values() for pk in pks])
+        reporters = User.objects.in_bulk(list(by_reporter))
+        for reporter_id, pks in by_reporter.items():
+            send_issues_status_update_email(
+                reporters[reporter_id],
+                [issues[pk] for pk in pks if pk in issues],
+                new_status,
+                feedback_tokens=tokens,
+            )
+
     @staticmethod
     def notify_issue_assignment(issue, assigned_by):
         """Notify about issue assignment."""
@@ -240,19 +336,20 @@ class NotificationService:
         
         # 1. Dashboard Notifications (Real-time + DB)
         try:
-            async_to_sync(channel_layer.group_send)(
-                "announcements",
-                {
-                    'type': 'announcement_message',
-                    'announcement': {
-                        'id': announcement.id,
-                        'title': announcement.title,
-                        'body': announcement.body,
-                        'audience': announcement.audience,
-                        'created_at': announcement.created_at.isoformat(),
+            if PresenceRegistry.has_listeners("announcements"):
+                queue_group_send(
+                    "announcements",
+                    {
+                        'type': 'announcement_message',
+                        'announcement': {
+                            'id': announcement.id,
+                            'title': announcement.title,
+                            'body': announcement.body,
+                            'audience': announcement.audience,
+                            'created_at': announcement.created_at.isoformat(),
+                        }
                     }
-                }
-            )
+                )
         except Exception as e:
             print(f"Failed to broadcast real-time announcement: {e}")
             
@@ -268,7 +365,9 @@ class AdminDashboardService:
     def broadcast_dashboard_update(event_type, data):
         """Broadcast dashboard update to all admin users."""
         try:
-            async_to_sync(channel_layer.group_send)(
+            if not PresenceRegistry.has_listeners("admin_dashboard"):
+                return
+            queue_group_send(
                 "admin_dashboard",
                 {
                     'type': 'dashboard_update',
@@ -284,7 +383,9 @@ class AdminDashboardService:
     
     @staticmethod
     def notify_new_issue(issue):
-        """Notify admins about new issue."""
+        """Notify admins about new issue and bump the live counters."""
+        delta = AdminDashboardStats.new_issue_delta(issue)
+        AdminDashboardStats.apply_delta(delta)
         AdminDashboardService.broadcast_dashboard_update(
             'new_issue',
             {
@@ -292,19 +393,49 @@ class AdminDashboardService:
                 'title': issue.title,
                 'reporter': issue.reporter.email,
                 'priority': issue.priority,
-                'category': issue.category
+                'category': issue.category,
+                'stats_delta': delta,
             }
         )
     
     @staticmethod
     def notify_issue_status_change(issue, old_status, new_status):
-        """Notify admins about issue status change."""
+        """Notify admins about issue status change and adjust the live counters."""
+        delta = AdminDashboardStats.status_change_delta(issue, old_status, new_status)
+        AdminDashboardStats.apply_delta(delta)
         AdminDashboardService.broadcast_dashboard_update(
             'status_change',
             {
                 'issue_id': issue.id,
                 'title': issue.title,
                 'old_status': old_status,
-                'new_status': new_status
+                'new_status': new_status,
+                'stats_delta': delta,
+            }
+        )
+
+    @staticmethod
+    def notify_bulk_status_change(issues, new_status):
+        """
+        Adjust the live counters and notify admins once for a bulk status change.
+
+        `issues` are dicts with pk, status (the old one) and priority.
+        """
+        from issues.models import Issue
+
+        delta = {}
+        for issue in issues:
+            change = AdminDashboardStats.status_change_delta(
+                Issue(priority=issue['priority']), issue['status'], new_status
+            )
+            for field, value in change.items():
+                delta[field] = delta.get(field, 0) + value
+        AdminDashboardStats.apply_delta(delta)
+        AdminDashboardService.broadcast_dashboard_update(
+            'bulk_status_change',
+            {
+                'issue_ids': [issue['pk'] for issue in issues],
+                'new_status': new_status,
+                'stats_delta': delta,
             }
         )
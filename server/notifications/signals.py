@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from issues.models import Comment
+
+from .announcements import ActiveAnnouncements
+from .chat import invalidate_history
+from .models import Announcement, AnnouncementDismissal
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def announcement_changed(sender, instance, **kwargs):
+    """Any change can add, remove or reword an active announcement."""
+    ActiveAnnouncements.invalidate()
+
+
+@receiver(post_save, sender=AnnouncementDismissal)
+@receiver(post_delete, sender=AnnouncementDismissal)
+def dismissal_changed(sender, instance, **kwargs):
+    ActiveAnnouncements.invalidate_dismissed(instance.user_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    """Chat history includes comments posted through the API and the admin too."""
+    invalidate_history(instance.issue_id)
@@ -1,3 +1,379 @@
-from django.test import TestCase
+import asyncio
+from datetime import timedelta
+import json
+import os
+import smtplib
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core import mail
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from campusfix.channel_layers import UnixSocketChannelLayer
+from issues.models import Issue, Comment
+from issues.views import COMMENT_RATE_LIMIT
+from security.ratelimit import RateLimitResult
+from . import outbox
+from .consumers import ChatConsumer
+from .chat import ChatWriteBuffer, get_recent_history, load_history_page
+from .dashboard_stats import AdminDashboardStats
+from .presence import PresenceRegistry
+from .announcements import ActiveAnnouncements
+from .models import Announcement, AnnouncementDismissal, FailedEmail
+from .services import NotificationService
+from utils.email_backends import SinkEmailBackend
+from utils.email_service import send_email
+
+
+class RealtimeOutboxTests(TestCase):
+    def _notification(self, pk):
+        return {'type': 'notification_message', 'notification': {'id': pk}}
+
+    def test_burst_to_same_group_is_coalesced(self):
+        frames = outbox.coalesce_messages([self._notification(i) for i in range(3)])
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0]['type'], 'notification_batch')
+        self.assertEqual([n['id'] for n in frames[0]['notifications']], [0, 1, 2])
+
+    def test_single_message_is_sent_as_is(self):
+        message = self._notification(1)
+        self.assertEqual(outbox.coalesce_messages([message]), [message])
+
+    def test_unbatchable_types_keep_order(self):
+        announcement = {'type': 'announcement_message', 'announcement': {'id': 9}}
+        frames = outbox.coalesce_messages([
+            self._notification(1), announcement, self._notification(2),
+        ])
+        self.assertEqual([f['type'] for f in frames],
+                         ['notification_message', 'announcement_message', 'notification_message'])
+
+    def test_batch_flushes_once_on_commit(self):
+        with mock.patch.object(outbox, 'send_frames') as send_frames:
+            with self.captureOnCommitCallbacks(execute=True):
+                with outbox.realtime_batch():
+                    outbox.queue_group_send('user_1', self._notification(1))
+                    outbox.queue_group_send('user_1', self._notification(2))
+                    outbox.queue_group_send('user_2', self._notification(3))
+                    send_frames.assert_not_called()
+
+        send_frames.assert_called_once()
+        frames = send_frames.call_args[0][0]
+        self.assertEqual([group for group, _ in frames], ['user_1', 'user_2'])
+        self.assertEqual(frames[0][1]['type'], 'notification_batch')
+        self.assertEqual(frames[1][1]['type'], 'notification_message')
+
+    def test_nested_batches_share_outer_outbox(self):
+        with mock.patch.object(outbox, 'send_frames') as send_frames:
+            with self.captureOnCommitCallbacks(execute=True):
+                with outbox.realtime_batch() as outer:
+                    with outbox.realtime_batch() as inner:
+                        self.assertIs(inner, outer)
+                        outbox.queue_group_send('user_1', self._notification(1))
+                    send_frames.assert_not_called()
+
+        send_frames.assert_called_once()
+
+
+class ChatPersistenceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reporter = User.objects.create_user(
+            email='reporter@example.com', password='pass12345', first_name='Rita', last_name='Reporter'
+        )
+        self.issue = Issue.objects.create(
+            title='Broken tap', description='The tap in block B leaks constantly.',
+            category='plumbing', location='Block B', reporter=self.reporter,
+        )
+
+    def _committed(self, func, *args, **kwargs):
+        """Call `func` and run the on_commit hooks it registers (history invalidation)."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return func(*args, **kwargs)
+
+    def _add_comments(self, count):
+        Comment.objects.bulk_create([
+            Comment(issue=self.issue, user=self.reporter, content=f'message {i}')
+            for i in range(count)
+        ])
+
+    def test_history_page_is_single_query_and_paginates(self):
+        self._add_comments(7)
+        with self.assertNumQueries(1):
+            page = load_history_page(self.issue.id, limit=5)
+        self.assertTrue(page['has_more'])
+        self.assertEqual([m['content'] for m in page['messages']],
+                         [f'message {i}' for i in range(2, 7)])
+
+        older = load_history_page(self.issue.id, before_id=page['messages'][0]['id'], limit=5)
+        self.assertFalse(older['has_more'])
+        self.assertEqual([m['content'] for m in older['messages']], ['message 0', 'message 1'])
+
+    async def test_recent_history_is_served_from_cache(self):
+        await sync_to_async(self._add_comments)(3)
+        first = await get_recent_history(self.issue.id)
+
+        with mock.patch('notifications.chat.load_history_page') as load_page:
+            second = await get_recent_history(self.issue.id)
+        load_page.assert_not_called()
+        self.assertEqual(first, second)
+
+    async def test_write_buffer_bulk_inserts_and_invalidates_history(self):
+        await get_recent_history(self.issue.id)
+        buffer = ChatWriteBuffer(flush_interval=0, max_batch=2)
+
+        async def submit_both():
+            return await asyncio.gather(
+                buffer.submit(self.issue.id, self.reporter, 'hello'),
+                buffer.submit(self.issue.id, self.reporter, 'world'),
+            )
+
+        with mock.patch.object(Comment.objects, 'bulk_create', wraps=Comment.objects.bulk_create) as bulk_create:
+            first, second = await sync_to_async(self._committed)(async_to_sync(submit_both))
+        bulk_create.assert_called_once()
+        self.assertEqual((first['content'], second['content']), ('hello', 'world'))
+        self.assertEqual(await sync_to_async(Comment.objects.filter(issue=self.issue).count)(), 2)
+
+        history = await get_recent_history(self.issue.id)
+        self.assertEqual([m['content'] for m in history['messages']], ['hello', 'world'])
+
+    async def test_comments_from_the_api_and_deletes_reach_history(self):
+        await get_recent_history(self.issue.id)
+        client = APIClient()
+        await sync_to_async(client.force_authenticate)(self.reporter)
+        response = await sync_to_async(self._committed)(
+            client.post, f'/api/issues/{self.issue.id}/comments/', {'content': 'posted over http'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        history = await get_recent_history(self.issue.id)
+        self.assertEqual([m['content'] for m in history['messages']], ['posted over http'])
+
+        await sync_to_async(self._committed)(Comment.objects.filter(issue=self.issue).delete)
+        self.assertEqual((await get_recent_history(self.issue.id))['messages'], [])
+
+    async def test_chat_messages_share_the_comment_rate_limit(self):
+        consumer = ChatConsumer()
+        consumer.user, consumer.issue_id, consumer.can_post = self.reporter, self.issue.id, True
+        consumer.send = mock.AsyncMock()
+        refused = RateLimitResult(False, 30, 0, 0, 60)
+        with mock.patch.object(COMMENT_RATE_LIMIT, 'hit', return_value=refused) as hit, \
+                mock.patch('notifications.consumers.chat_write_buffer.submit') as submit:
+            await consumer.receive(json.dumps({'message': 'hello'}))
+        hit.assert_called_once_with(f'comment:{self.reporter.id}')
+        submit.assert_not_called()
+        sent = json.loads(consumer.send.call_args.kwargs['text_data'])
+        self.assertEqual(sent['type'], 'error')
+        self.assertIn('maximum number of comments per hour', sent['message'])
+
+
+class AdminDashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reporter = User.objects.create_user(
+            email='student@example.com', password='pass12345', first_name='Sam', last_name='Student'
+        )
+
+    def _create_issue(self, **kwargs):
+        defaults = {
+            'title': 'Flickering lights', 'description': 'Lights flicker in the main hall.',
+            'category': 'electrical', 'location': 'Main Hall', 'reporter': self.reporter,
+        }
+        defaults.update(kwargs)
+        return Issue.objects.create(**defaults)
+
+    def test_snapshot_uses_real_statuses_and_is_shared(self):
+        self._create_issue(status='in-progress', priority='critical')
+        self._create_issue(status='resolved')
+
+        with CaptureQueriesContext(connection) as ctx:
+            stats = AdminDashboardStats.get_snapshot()
+        selects = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 2)
+        self.assertEqual(stats['total_issues'], 2)
+        self.assertEqual(stats['in_progress_issues'], 1)
+        self.assertEqual(stats['resolved_issues'], 1)
+        self.assertEqual(stats['urgent_issues'], 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(AdminDashboardStats.get_snapshot(), stats)
+
+    def test_deltas_keep_counters_current_without_recounting(self):
+        AdminDashboardStats.get_snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self._create_issue(priority='critical')
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.status = 'resolved'
+            issue.save()
+
+        with self.assertNumQueries(0):
+            stats = AdminDashboardStats.get_snapshot()
+        self.assertEqual(stats['total_issues'], 1)
+        self.assertEqual(stats['open_issues'], 0)
+        self.assertEqual(stats['resolved_issues'], 1)
+        self.assertEqual(stats['urgent_issues'], 0)
+        self.assertEqual(stats, AdminDashboardStats.compute_snapshot())
+
+
+@mock.patch('notifications.presence.PRESENCE_ENABLED', True)
+class PresenceRegistryTests(TestCase):
+    def setUp(self):
+        caches['presence'].clear()
+        self.addCleanup(caches['presence'].clear)
+        self.user = User.objects.create_user(
+            email='online@example.com', password='pass12345', first_name='Olu', last_name='Online'
+        )
+
+    def test_counts_and_gauges_follow_connections(self):
+        PresenceRegistry.joined('user_1')
+        PresenceRegistry.joined('user_1')
+        PresenceRegistry.joined('issue_7')
+        self.assertEqual(PresenceRegistry.count('user_1'), 2)
+
+        PresenceRegistry.left('user_1')
+        gauges = PresenceRegistry.gauges()
+        self.assertEqual(gauges['user'], {'sockets': 1, 'groups': 1})
+        self.assertEqual(gauges['issue'], {'sockets': 1, 'groups': 1})
+
+        PresenceRegistry.left('user_1')
+        PresenceRegistry.left('user_1')
+        self.assertEqual(PresenceRegistry.count('user_1'), 0)
+        self.assertEqual(PresenceRegistry.gauges()['user'], {'sockets': 0, 'groups': 0})
+
+    def test_unknown_registry_state_counts_as_online(self):
+        self.assertTrue(PresenceRegistry.is_online(self.user.id))
+        PresenceRegistry.joined('user_999')
+        self.assertFalse(PresenceRegistry.is_online(self.user.id))
+
+    def test_offline_users_get_no_channel_layer_send(self):
+        PresenceRegistry.joined('user_999')
+        with mock.patch('notifications.services.queue_group_send') as send:
+            NotificationService.create_notification(self.user, 'Hi', 'Body')
+            send.assert_not_called()
+
+            PresenceRegistry.joined(f'user_{self.user.id}')
+            NotificationService.create_notification(self.user, 'Hi', 'Body')
+            send.assert_called_once()
+
+
+class UnixSocketChannelLayerTests(TestCase):
+    async def test_group_send_reaches_other_layer_instance_in_one_frame(self):
+        with tempfile.TemporaryDirectory() as socket_dir:
+            receiver = UnixSocketChannelLayer(socket_dir=socket_dir)
+            sender = UnixSocketChannelLayer(socket_dir=socket_dir)
+            channel = await receiver.new_channel()
+            await receiver.group_add('issue_1', channel)
+
+            with mock.patch.object(sender, '_write', wraps=sender._write) as write:
+                await asyncio.gather(*(
+                    sender.group_send('issue_1', {'type': 'chat.message', 'seq': seq}) for seq in range(3)
+                ))
+            write.assert_called_once()
+
+            received = [await asyncio.wait_for(receiver.receive(channel), 2) for _ in range(3)]
+            self.assertEqual([m['seq'] for m in received], [0, 1, 2])
+
+            await sender.send(channel, {'type': 'direct'})
+            self.assertEqual((await asyncio.wait_for(receiver.receive(channel), 2))['type'], 'direct')
+            await receiver.close()
+
+    async def test_refuses_socket_dir_others_could_use(self):
+        with tempfile.TemporaryDirectory() as parent:
+            shared = os.path.join(parent, 'shared')
+            os.mkdir(shared)
+            os.chmod(shared, 0o777)
+            link = os.path.join(parent, 'link')
+            os.symlink(shared, link)
+            for socket_dir in (shared, link):
+                with self.assertRaises(PermissionError):
+                    await UnixSocketChannelLayer(socket_dir=socket_dir).new_channel()
+                with self.assertRaises(PermissionError):
+                    await UnixSocketChannelLayer(socket_dir=socket_dir).group_send('issue_1', {'type': 'x'})
+
+
+@override_settings(EMAIL_BACKEND='utils.email_backends.SinkEmailBackend')
+class EmailSinkTests(TestCase):
+    def setUp(self):
+        SinkEmailBackend.clear()
+
+    def test_messages_are_captured(self):
+        self.assertTrue(send_email('student@example.com', 'Issue resolved', '<p>Fixed</p>'))
+        [(sender, recipients, data)] = SinkEmailBackend.outbox
+        self.assertEqual(recipients, ['student@example.com'])
+        self.assertIn(b'Subject: Issue resolved', data)
+
+    @override_settings(EMAIL_SINK={'rate_limit_rate': '1'})
+    def test_rate_limited_sends_are_retried_then_recorded(self):
+        with self.assertRaises(smtplib.SMTPDataError):
+            mail.send_mail('Hi', 'Body', 'from@example.com', ['to@example.com'])
+
+        with mock.patch('utils.email_service.time.sleep') as sleep:
+            self.assertFalse(send_email('student@example.com', 'Issue resolved', '<p>Fixed</p>'))
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(FailedEmail.objects.get().to_email, 'student@example.com')
+        self.assertFalse(SinkEmailBackend.outbox)
+
+
+class ActiveAnnouncementsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(email='student@example.com', password='pass12345')
+        cls.staff = User.objects.create_user(email='staff@example.com', password='pass12345', role='staff')
+        cls.everyone = Announcement.objects.create(title='Water off', body='Friday 9-11', audience='all')
+        cls.staff_only = Announcement.objects.create(title='Rota', body='New rota', audience='staff')
+        cls.students_only = Announcement.objects.create(title='Exams', body='Quiet hours', audience='students')
+        Announcement.objects.create(title='Old', body='Gone', is_active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, announcements):
+        return sorted(a.title for a in announcements)
+
+    def test_cached_list_and_dismissed_set(self):
+        with self.assertNumQueries(2):
+            visible = ActiveAnnouncements.undismissed(self.student, ActiveAnnouncements.for_audience(self.student))
+        self.assertEqual(self.titles(visible), ['Exams', 'Water off'])
+        with self.assertNumQueries(0):
+            ActiveAnnouncements.undismissed(self.student, ActiveAnnouncements.for_audience(self.student))
+        self.assertEqual(self.titles(ActiveAnnouncements.for_audience(self.staff)), ['Rota', 'Water off'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AnnouncementDismissal.objects.create(announcement=self.everyone, user=self.student)
+        visible = ActiveAnnouncements.undismissed(self.student, ActiveAnnouncements.for_audience(self.student))
+        self.assertEqual(self.titles(visible), ['Exams'])
+
+    def test_invalidated_on_save_and_expiry(self):
+        ActiveAnnouncements.active()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.students_only.is_active = False
+            self.students_only.save()
+            # Dropped on commit, so no reader caches the uncommitted list
+            self.assertIn('Exams', self.titles(ActiveAnnouncements.active()))
+        self.assertNotIn('Exams', self.titles(ActiveAnnouncements.active()))
+
+        soon = timezone.now() + timedelta(minutes=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            Announcement.objects.create(title='Fire drill', body='At noon', expires_at=soon)
+        self.assertIn('Fire drill', self.titles(ActiveAnnouncements.active()))
+        # Past its expiry it is hidden even while the cached list is still current
+        self.assertNotIn('Fire drill', self.titles(ActiveAnnouncements.active(now=soon + timedelta(seconds=1))))
+
+    def test_api_list_and_dismiss(self):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        response = client.get('/api/announcements/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(row['title'] for row in response.data), ['Exams', 'Water off'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f'/api/announcements/{self.everyone.pk}/dismiss/')
+        self.assertEqual(response.status_code, 200)
+        response = client.get('/api/announcements/')
+        self.assertEqual([row['title'] for row in response.data], ['Exams'])
 
-# Create your tests here.
@@ -6,6 +6,8 @@ from rest_framework.exceptions import PermissionDenied
 from django.db.models import Q
 from django.utils import timezone
 
+from dashboard.fragments import FragmentVersions, notifications_version
+
 from .models import (
     Notification,
     NotificationPreference,
@@ -17,6 +19,8 @@ from .serializers import (
     NotificationPreferenceSerializer,
     AnnouncementSerializer,
 )
+from .announcements import ActiveAnnouncements
+from .presence import PresenceRegistry
 
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
@@ -59,6 +63,9 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     def mark_all_read(self, request):
         """Mark all notifications as read for the current user."""
         count = Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        if count:
+            # update() skips the signals that expire the dashboard dropdown
+            FragmentVersions.bump(notifications_version(request.user.pk))
         return Response({
             'message': f'{count} notifications marked as read',
             'success': True,
@@ -71,6 +78,14 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         count = Notification.objects.filter(user=request.user, is_read=False).count()
         return Response({'unread_count': count})
 
+    @action(detail=False, methods=['get'])
+    def presence(self, request):
+        """WebSocket connection gauges per group kind (admins only)."""
+        user = request.user
+        if not (user.is_superuser or getattr(user, "role", None) == "admin"):
+            raise PermissionDenied("Admin access is required to view connection gauges.")
+        return Response({'gauges': PresenceRegistry.gauges()})
+
 
 class NotificationPreferenceViewSet(viewsets.ModelViewSet):
     """ViewSet for managing notification preferences."""
@@ -113,12 +128,20 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
             # Students see 'all' and 'students' announcements
             qs = qs.filter(Q(audience='all') | Q(audience='students'))
 
-        # When listing, hide announcements the user has dismissed
-        if self.action == "list":
-            qs = qs.exclude(dismissals__user=user)
-
         return qs.order_by("-created_at")
 
+    def list(self, request, *args, **kwargs):
+        # Served from the cached active list, minus the user's dismissed ids
+        announcements = ActiveAnnouncements.undismissed(
+            request.user, ActiveAnnouncements.for_audience(request.user)
+        )
+        page = self.paginate_queryset(announcements)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(announcements, many=True)
+        return Response(serializer.data)
+
     def _ensure_admin(self, request):
         user = request.user
         role = getattr(user, "role", None)
@@ -0,0 +1,320 @@
+"""
+Non-blocking audit log pipeline for the `security` logger.
+
+Request threads only put records on a bounded in-memory queue
+(`AuditQueueHandler`); a background listener thread drains it in batches
+and writes JSON lines through `AuditFileHandler`, which rotates by size and
+by age and flushes/fsyncs once per batch (fsync at most every
+`fsync_interval` seconds) instead of once per record. When the queue is
+full, records are dropped and counted rather than blocking the request;
+the listener writes a warning with the count after the next batch.
+
+Each file must have a single writer: the handler rotates the file itself,
+so two processes appending to (and rotating) the same file clobber each
+other's rotations and can interleave batches. With several worker
+processes, set `per_process=True` so every process writes its own
+`security.<pid>.log` (with its own rotated backups). The optional
+`console=True` echoes records to stderr from the same background thread,
+so the console does not bring back a synchronous write on the request
+thread.
+
+Configured from settings.LOGGING, e.g.:
+
+    'file': {
+        'class': 'security.audit_log.AuditQueueHandler',
+        'filename': BASE_DIR / 'logs' / 'security.log',
+        'max_bytes': 10 * 1024 * 1024,
+        'rotate_interval': 86400,
+        'per_process': True,
+    }
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """One JSON object per line; structured fields come from `extra={'audit': {...}}`."""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'process': record.process,
+            'thread': record.thread,
+            'message': record.getMessage(),
+        }
+        audit = getattr(record, 'audit', None)
+        if audit:
+            entry['event'] = audit
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class AuditFileHandler(RotatingFileHandler):
+    """
+    Size- and time-rotating file handler with batched flush/fsync.
+
+    Writes stay in the stream buffer until `flush_batch()` (called by the
+    listener after each drained batch) or rotation/close.
+    """
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=10,
+                 rotate_interval=86400, fsync_interval=1.0, encoding='utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding, delay=True)
+        self.rotate_interval = rotate_interval
+        self.fsync_interval = fsync_interval
+        try:
+            self._size = os.path.getsize(self.baseFilename)
+        except OSError:
+            self._size = 0
+        self._rollover_at = time.time() + rotate_interval if rotate_interval else None
+        self._last_fsync = time.monotonic()
+
+    def format(self, record):
+        msg = super().format(record)
+        # JSON is ASCII-only, so characters == bytes
+        self._size += len(msg) + len(self.terminator)
+        return msg
+
+    def shouldRollover(self, record):
+        if self.maxBytes and self._size >= self.maxBytes:
+            return True
+        return self._rollover_at is not None and time.time() >= self._rollover_at
+
+    def doRollover(self):
+        self._sync(force=True)
+        super().doRollover()
+        self._size = 0
+        if self.rotate_interval:
+            self._rollover_at = time.time() + self.rotate_interval
+
+    def flush(self):
+        # Deferred to flush_batch(); StreamHandler.emit calls this per record
+        pass
+
+    def flush_batch(self):
+        self.acquire()
+        try:
+            self._sync()
+        finally:
+            self.release()
+
+    def _sync(self, force=False):
+        if self.stream is None:
+            return
+        self.stream.flush()
+        now = time.monotonic()
+        if force or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self.stream.fileno())
+            self._last_fsync = now
+
+    def close(self):
+        self.acquire()
+        try:
+            self._sync(force=True)
+        finally:
+            self.release()
+        super().close()
+
+
+def dropped_record(count, total):
+    """Warning written in place of `count` records lost to a full queue."""
+    record = logging.LogRecord(
+        'security', logging.WARNING, __file__, 0,
+        "Audit log queue full: dropped %d record(s), %d in total", (count, total), None,
+    )
+    record.audit = {'dropped': count, 'dropped_total': total}
+    return record
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    QueueListener that drains up to `batch_size` records before flushing
+    handlers. `dropped` returns the number of records lost so far; new
+    losses are reported after each batch.
+    """
+
+    def __init__(self, queue, *handlers, batch_size=256, dropped=None):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.dropped = dropped
+        self._reported = 0
+
+    def _monitor(self):
+        q = self.queue
+        has_task_done = hasattr(q, 'task_done')
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+                if has_task_done:
+                    q.task_done()
+
+            self._report_dropped()
+            for handler in self.handlers:
+                if hasattr(handler, 'flush_batch'):
+                    handler.flush_batch()
+            if stop:
+                return
+
+    def _report_dropped(self):
+        total = self.dropped() if self.dropped else 0
+        if total > self._reported:
+            self.handle(dropped_record(total - self._reported, total))
+            self._reported = total
+
+
+def per_process_filename(filename, pid=None):
+    """`logs/security.log` -> `logs/security.<pid>.log`."""
+    root, ext = os.path.splitext(os.fspath(filename))
+    return f"{root}.{os.getpid() if pid is None else pid}{ext}"
+
+
+class AuditQueueHandler(QueueHandler):
+    """Enqueue records for the background writer; never blocks the caller."""
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=10,
+                 rotate_interval=86400, fsync_interval=1.0, batch_size=256, queue_size=10000,
+                 per_process=False, console=False):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.filename = filename
+        self.per_process = per_process
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self._file_options = {
+            'max_bytes': max_bytes,
+            'backup_count': backup_count,
+            'rotate_interval': rotate_interval,
+            'fsync_interval': fsync_interval,
+        }
+        self.console_handler = None
+        if console:
+            self.console_handler = logging.StreamHandler()
+            self.console_handler.setFormatter(logging.Formatter(
+                '{levelname} {asctime} {module} {process:d} {thread:d} {message}', style='{',
+            ))
+        self.dropped = 0
+        self._build_writer()
+        self._started = False
+        self._closed = False
+        self._fork_handler = None
+        self._start_lock = threading.Lock()
+        _live_handlers.add(self)
+
+    def _build_writer(self):
+        filename = per_process_filename(self.filename) if self.per_process else self.filename
+        self.file_handler = AuditFileHandler(filename, **self._file_options)
+        self.file_handler.setFormatter(JSONLinesFormatter())
+        handlers = [self.file_handler]
+        if self.console_handler is not None:
+            handlers.append(self.console_handler)
+        self.listener = BatchingQueueListener(
+            self.queue, *handlers, batch_size=self.batch_size, dropped=lambda: self.dropped,
+        )
+
+    def _before_fork(self):
+        # Empty the write buffer so the child cannot write it out a second time
+        self._fork_handler = None if self._closed else self.file_handler
+        if self._fork_handler is not None:
+            self._fork_handler.acquire()
+            if self._fork_handler.stream is not None:
+                self._fork_handler.stream.flush()
+
+    def _after_fork_in_parent(self):
+        if self._fork_handler is not None:
+            self._fork_handler.release()
+            self._fork_handler = None
+
+    def _after_fork(self):
+        self._fork_handler = None
+        if self._closed:
+            return
+        # The listener thread does not survive fork(), and the child must
+        # not share the parent's file: start over with a fresh queue and,
+        # when per_process, a file named after the child's pid.
+        if self.file_handler.stream is not None:
+            self.file_handler.stream.close()
+            self.file_handler.stream = None
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self.dropped = 0
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._build_writer()
+
+    def _ensure_started(self):
+        # Started lazily so processes that never log don't spawn a thread
+        with self._start_lock:
+            if not self._started:
+                os.makedirs(os.path.dirname(self.file_handler.baseFilename), exist_ok=True)
+                self.listener.start()
+                atexit.register(self.close)
+                self._started = True
+
+    def enqueue(self, record):
+        if not self._started:
+            self._ensure_started()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        with self._start_lock:
+            self._closed = True
+            _live_handlers.discard(self)
+            if self._started:
+                self._started = False
+                self.listener.stop()
+        self.file_handler.close()
+        super().close()
+
+
+# Fork hooks are registered once per process, not once per handler, so
+# repeated logging configuration does not pile them up.
+_live_handlers = weakref.WeakSet()
+
+
+def _before_fork():
+    for handler in list(_live_handlers):
+        handler._before_fork()
+
+
+def _after_fork_in_parent():
+    for handler in list(_live_handlers):
+        handler._after_fork_in_parent()
+
+
+def _after_fork_in_child():
+    for handler in list(_live_handlers):
+        handler._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(
+        before=_before_fork,
+        after_in_parent=_after_fork_in_parent,
+        after_in_child=_after_fork_in_child,
+    )
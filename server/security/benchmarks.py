@@ -0,0 +1,182 @@
+"""
+Micro-benchmarks for the security layer.
+
+``patterns`` compares the previous per-pattern `re.search` loop with the
+precompiled `PatternSet` scanners (literal prefilter, early exit) on a large
+issue description and a 10 MB multipart body.
+
+``middleware`` measures per-request overhead of `PathBasedSessionMiddleware`
+on its own and of the full MIDDLEWARE stack (against an in-memory test
+database) for the request shapes the React client and dashboard send.
+
+    python -m security.benchmarks [patterns|middleware|all] [--repeat N]
+"""
+
+import argparse
+import os
+import re
+import time
+import timeit
+
+
+def _legacy_scan(patterns, flags, value):
+    for pattern in patterns:
+        if re.search(pattern, value, flags):
+            return pattern
+    return None
+
+
+def large_description(size=64 * 1024):
+    sentence = (
+        "The ceiling light in room 204 flickers (mostly after 6pm) and the "
+        "switch near the door sparks when pressed: please send an electrician. "
+    )
+    return (sentence * (size // len(sentence) + 1))[:size]
+
+
+def multipart_body(size=10 * 1024 * 1024, boundary="----campusfixbench"):
+    fields = "".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="field{i}"\r\n\r\n'
+        f"{large_description(2048)}\r\n"
+        for i in range(8)
+    )
+    header = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="attachment"; '
+        f'filename="readings.csv"\r\nContent-Type: text/csv\r\n\r\n'
+    )
+    row = "2024-01-01T00:00:00,block-b,meter-7,42.5,ok\r\n"
+    filler = size - len(fields) - len(header) - len(boundary) - 8
+    return f"{fields}{header}{(row * (filler // len(row) + 1))[:filler]}\r\n--{boundary}--\r\n"
+
+
+def run(repeat=5):
+    from security.middleware import DANGEROUS_INPUT_PATTERNS
+    from security.validators import MALICIOUS_CONTENT_PATTERNS, SQL_INJECTION_PATTERNS, XSS_PATTERNS
+
+    description = large_description()
+    body = multipart_body()
+    cases = [
+        ("NoMaliciousContent / description", MALICIOUS_CONTENT_PATTERNS, re.IGNORECASE | re.DOTALL, description),
+        ("SQLInjection / description", SQL_INJECTION_PATTERNS, re.IGNORECASE, description),
+        ("XSS / description", XSS_PATTERNS, re.IGNORECASE, description),
+        ("InputValidation / 10MB multipart", DANGEROUS_INPUT_PATTERNS, re.IGNORECASE | re.DOTALL, body),
+    ]
+
+    results = []
+    for name, pattern_set, flags, value in cases:
+        legacy = min(timeit.repeat(
+            lambda: _legacy_scan(pattern_set.patterns, flags, value), number=1, repeat=repeat
+        ))
+        compiled = min(timeit.repeat(
+            lambda: pattern_set.first_match(value), number=1, repeat=repeat
+        ))
+        results.append((name, len(value), legacy, compiled))
+    return results
+
+
+def middleware_requests(count):
+    """Build `count` requests of each shape the session middleware routes."""
+    from django.conf import settings
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+    shapes = {
+        "api (React, default cookies)": ("/api/issues/", {
+            settings.SESSION_COOKIE_NAME: "s" * 32, settings.CSRF_COOKIE_NAME: "c" * 32,
+        }),
+        "api (dashboard cookies)": ("/api/issues/", {
+            settings.DASHBOARD_SESSION_COOKIE_NAME: "d" * 32, settings.DASHBOARD_CSRF_COOKIE_NAME: "c" * 32,
+        }),
+        "dashboard": ("/dashboard/", {
+            settings.SESSION_COOKIE_NAME: "s" * 32, settings.DASHBOARD_SESSION_COOKIE_NAME: "d" * 32,
+            settings.CSRF_COOKIE_NAME: "c" * 32, settings.DASHBOARD_CSRF_COOKIE_NAME: "c" * 32,
+        }),
+        "admin": ("/admin/", {settings.ADMIN_SESSION_COOKIE_NAME: "a" * 32}),
+    }
+    built = {}
+    for name, (path, cookies) in shapes.items():
+        requests = []
+        for _ in range(count):
+            factory.cookies.clear()
+            for key, value in cookies.items():
+                factory.cookies[key] = value
+            requests.append(factory.get(path))
+        built[name] = requests
+    return built
+
+
+def _cookie_setting_view(request):
+    from django.conf import settings
+    from django.http import JsonResponse
+
+    # Exercise the Set-Cookie renaming path as a login/CSRF rotation would
+    response = JsonResponse({"ok": True})
+    response.set_cookie(settings.SESSION_COOKIE_NAME, "n" * 32, httponly=True, samesite="Strict")
+    response.set_cookie(settings.CSRF_COOKIE_NAME, "t" * 32, samesite="Strict")
+    return response
+
+
+def _time_per_request(handler, requests):
+    started = time.perf_counter()
+    for request in requests:
+        handler(request)
+    return (time.perf_counter() - started) / len(requests)
+
+
+def run_middleware(repeat=5, count=2000):
+    from django.conf import settings
+    from django.db import connection
+    from django.http import JsonResponse
+    from django.test.utils import setup_test_environment
+    from django.utils.module_loading import import_string
+
+    from security.middleware import PathBasedSessionMiddleware
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+    stack = lambda request: JsonResponse({"ok": True})
+    for path in reversed(settings.MIDDLEWARE):
+        stack = import_string(path)(stack)
+    handlers = {
+        "view only (baseline)": _cookie_setting_view,
+        "PathBasedSessionMiddleware": PathBasedSessionMiddleware(_cookie_setting_view),
+        "full MIDDLEWARE stack": stack,
+    }
+
+    best = {}
+    for _ in range(repeat):
+        for handler_name, handler in handlers.items():
+            # Fresh requests each round: COOKIES is parsed lazily and cached per request
+            for shape, requests in middleware_requests(count).items():
+                seconds = _time_per_request(handler, requests)
+                key = (handler_name, shape)
+                best[key] = min(seconds, best.get(key, seconds))
+    return [(handler_name, shape, seconds) for (handler_name, shape), seconds in best.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("suite", nargs="?", default="patterns", choices=["patterns", "middleware", "all"])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "campusfix.settings")
+    import django
+
+    django.setup()
+
+    if args.suite in ("patterns", "all"):
+        print(f"{'case':<36} {'size':>10} {'per-pattern':>12} {'PatternSet':>12} {'speedup':>8}")
+        for name, size, legacy, compiled in run(args.repeat):
+            print(f"{name:<36} {size:>10} {legacy * 1000:>10.2f}ms {compiled * 1000:>10.2f}ms "
+                  f"{legacy / compiled if compiled else float('inf'):>7.1f}x")
+
+    if args.suite in ("middleware", "all"):
+        print(f"{'handler':<28} {'request':<30} {'per request':>12}")
+        for handler_name, shape, seconds in run_middleware(args.repeat):
+            print(f"{handler_name:<28} {shape:<30} {seconds * 1e6:>10.1f}us")
+
+
+if __name__ == "__main__":
+    main()
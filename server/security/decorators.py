@@ -1,10 +1,9 @@
-import time
 import logging
 from functools import wraps
-from django.core.cache import cache
 from django.http import JsonResponse
 from rest_framework import status
-from django.conf import settings
+
+from .ratelimit import RateLimiter, set_rate_limit_headers
 
 logger = logging.getLogger('security')
 
@@ -12,59 +11,40 @@ def rate_limit(key_func, rate='5/m', block_time=300):
     """
     Rate limiting decorator.
     
+    Works on plain view functions and on view methods (`def post(self, request)`).
+    Responses carry `X-RateLimit-*` headers.
+    
     Args:
         key_func: Function to generate unique key for rate limiting
         rate: Rate limit string (e.g., '5/m' = 5 requests per minute)
         block_time: Time in seconds to block user after rate limit exceeded
     """
+    limiter = RateLimiter(rate, block_time=block_time, prefix='rate_limit')
+    
     def decorator(view_func):
         @wraps(view_func)
-        def wrapper(request, *args, **kwargs):
-            # Parse rate limit
-            try:
-                limit, period = rate.split('/')
-                limit = int(limit)
-                period_map = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
-                period_seconds = period_map[period[0].lower()]
-            except (ValueError, KeyError):
-                limit, period_seconds = 5, 60  # Default: 5 requests per minute
-            
-            # Generate cache key
-            cache_key = f"rate_limit:{key_func(request)}:{view_func.__name__}"
-            
-            # Check if user is blocked
-            block_key = f"{cache_key}:blocked"
-            if cache.get(block_key):
-                return JsonResponse(
-                    {
-                        'error': 'Too many requests',
-                        'message': 'You have made too many requests. Please wait a while before trying again.'
-                    },
-                    status=status.HTTP_429_TOO_MANY_REQUESTS
-                )
+        def wrapper(*args, **kwargs):
+            # Methods receive the view instance first; the request follows it
+            request = next((arg for arg in args if hasattr(arg, 'META')), None)
+            key = key_func(request)
+            result = limiter.hit(f"{key}:{view_func.__name__}")
             
-            # Get current request count
-            request_count = cache.get(cache_key, 0)
-            
-            if request_count >= limit:
-                # Block user
-                cache.set(block_key, True, block_time)
+            if not result.allowed:
                 logger.warning(
-                    f"Rate limit exceeded for {key_func(request)} on {view_func.__name__}. "
+                    f"Rate limit exceeded for {key} on {view_func.__name__}. "
                     f"Blocked for {block_time} seconds."
                 )
-                return JsonResponse(
+                response = JsonResponse(
                     {
                         'error': 'Too many requests',
-                        'message': 'You have reached the maximum number of requests allowed. Please wait before trying again.'
+                        'message': 'You have made too many requests. Please wait a while before trying again.'
                     },
                     status=status.HTTP_429_TOO_MANY_REQUESTS
                 )
+                return set_rate_limit_headers(response, result)
             
-            # Increment request count
-            cache.set(cache_key, request_count + 1, period_seconds)
-            
-            return view_func(request, *args, **kwargs)
+            response = view_func(*args, **kwargs)
+            return set_rate_limit_headers(response, result)
         
         return wrapper
     return decorator
@@ -0,0 +1,147 @@
+"""
+Static security header sets for `SecurityHeadersMiddleware`.
+
+Headers are built once at startup from settings, per path variant:
+
+- ``api``: API endpoints get a locked-down CSP that still lets DRF's
+  browsable API load its own scripts and styles from our origin.
+- ``media``: user uploads are served sandboxed so an uploaded HTML/SVG file
+  cannot run script on our origin. PDFs (SECURITY_UNSANDBOXED_MEDIA_TYPES)
+  get the same policy without `sandbox` (``media-document``), which would
+  otherwise stop the browser's built-in viewer.
+- ``default``: dashboard/admin HTML pages.
+
+Each variant is stored already normalized in Django's `ResponseHeaders`
+layout, so applying it to a response is one dict update with no per-request
+string building or header validation.
+
+Settings (all optional):
+
+    SECURITY_HEADERS            common headers, merged over the defaults below
+    SECURITY_CSP_POLICIES       {'default'|'api'|'media': {directive: [sources]}}
+    SECURITY_HEADER_PATHS       {'api'|'media': (path prefixes,)}
+    SECURITY_UNSANDBOXED_MEDIA_TYPES
+                                media content types served without sandbox
+    SECURITY_CSP_NONCE          add a per-request nonce to script-src when a
+                                template uses `request.csp_nonce`
+    X_FRAME_OPTIONS             as used by Django's clickjacking middleware
+"""
+
+import secrets
+
+from django.conf import settings
+from django.http.response import ResponseHeaders
+
+DEFAULT_HEADERS = {
+    'X-Content-Type-Options': 'nosniff',
+    'X-XSS-Protection': '1; mode=block',
+    'Strict-Transport-Security': 'max-age=31536000; includeSubDomains',
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+    'Permissions-Policy': (
+        'geolocation=(), microphone=(), camera=(), '
+        'payment=(), usb=(), magnetometer=(), gyroscope=()'
+    ),
+}
+
+DEFAULT_CSP_POLICIES = {
+    'default': {
+        'default-src': ["'self'"],
+        'script-src': ["'self'", "'unsafe-inline'", "'unsafe-eval'", 'https://cdn.jsdelivr.net'],
+        'style-src': ["'self'", "'unsafe-inline'"],
+        'img-src': ["'self'", 'data:', 'https:'],
+        'font-src': ["'self'"],
+        'connect-src': ["'self'", 'https://cdn.jsdelivr.net'],
+        'frame-ancestors': ["'none'"],
+    },
+    'api': {
+        'default-src': ["'none'"],
+        # Browsable API: static JS/CSS, inline style attributes, XHR forms
+        'script-src': ["'self'"],
+        'style-src': ["'self'", "'unsafe-inline'"],
+        'img-src': ["'self'", 'data:'],
+        'font-src': ["'self'"],
+        'connect-src': ["'self'"],
+        'frame-ancestors': ["'none'"],
+    },
+    'media': {
+        'default-src': ["'none'"],
+        'img-src': ["'self'", 'data:'],
+        'media-src': ["'self'"],
+        'style-src': ["'unsafe-inline'"],
+        'frame-ancestors': ["'none'"],
+        'sandbox': ['allow-downloads'],
+    },
+}
+
+UNSANDBOXED_MEDIA_TYPES = ('application/pdf',)
+
+NONCE_PLACEHOLDER = '{nonce}'
+
+
+def build_csp(directives, nonce=False):
+    """Serialize a CSP directive mapping; with `nonce`, script-src gets a placeholder."""
+    parts = []
+    for name, sources in directives.items():
+        sources = list(sources)
+        if nonce and name == 'script-src':
+            sources.append(f"'nonce-{NONCE_PLACEHOLDER}'")
+        parts.append(' '.join([name, *sources]))
+    return '; '.join(parts) + ';'
+
+
+def _normalized(headers):
+    """{name: value}, validated and encoded once by Django at startup."""
+    return dict(ResponseHeaders(headers).items())
+
+
+class HeaderVariant:
+    """Precomputed header block for one class of paths."""
+
+    def __init__(self, name, headers, csp_directives, frame_options, nonce=False):
+        self.name = name
+        csp = build_csp(csp_directives)
+        self.headers = _normalized({**headers, 'Content-Security-Policy': csp})
+        # Responses that opt out of, or already chose, framing rules
+        self.headers_without_frame_options = dict(self.headers)
+        if frame_options:
+            self.headers['X-Frame-Options'] = frame_options
+
+        self.nonce_template = None
+        if nonce and 'script-src' in csp_directives:
+            self.nonce_template = build_csp(csp_directives, nonce=True)
+
+    def csp_with_nonce(self, nonce):
+        return self.nonce_template.replace(NONCE_PLACEHOLDER, nonce)
+
+
+def build_header_variants():
+    """Return ({variant name: HeaderVariant}, ((prefix, variant name), ...))."""
+    headers = {**DEFAULT_HEADERS, **getattr(settings, 'SECURITY_HEADERS', {})}
+    policies = {**DEFAULT_CSP_POLICIES, **getattr(settings, 'SECURITY_CSP_POLICIES', {})}
+    if 'media' in policies:
+        policies.setdefault('media-document', {
+            name: sources for name, sources in policies['media'].items() if name != 'sandbox'
+        })
+    frame_options = getattr(settings, 'X_FRAME_OPTIONS', 'DENY')
+    nonce = getattr(settings, 'SECURITY_CSP_NONCE', False)
+
+    variants = {
+        name: HeaderVariant(name, headers, directives, frame_options, nonce=nonce)
+        for name, directives in policies.items()
+    }
+
+    paths = getattr(settings, 'SECURITY_HEADER_PATHS', {
+        'api': ('/api/',),
+        'media': (settings.MEDIA_URL,) if settings.MEDIA_URL else (),
+    })
+    # Longest prefix first so nested prefixes win
+    routes = sorted(
+        ((prefix, name) for name, prefixes in paths.items() if name in variants for prefix in prefixes),
+        key=lambda route: len(route[0]),
+        reverse=True,
+    )
+    return variants, tuple(routes)
+
+
+def generate_nonce():
+    return secrets.token_urlsafe(16)
@@ -0,0 +1,201 @@
+"""
+Streaming request body inspection for `InputValidationMiddleware`.
+
+Bodies are scanned in bounded chunks instead of being decoded in one piece:
+
+- multipart/form-data is parsed by Django's own streaming parser (the
+  result is cached on the request, so views and DRF reuse it). Form fields
+  and filenames are scanned; file parts are only scanned when their content
+  type is textual, chunk by chunk, and binary uploads are skipped.
+- other bodies are decoded incrementally from `request.body`, which the
+  view needs in memory anyway, so no second full-size copy is made.
+
+Consecutive chunks overlap by `INPUT_INSPECTION_OVERLAP` characters so a
+match that straddles a chunk boundary is still found, as long as it is no
+longer than the overlap. Element patterns such as `<script[^>]*>.*?</script>`
+can match any length, so their progress (opening tag, then its `>`, then the
+closing tag) is carried from chunk to chunk instead. Padding the body between
+the tags cannot hide them.
+"""
+
+import codecs
+import logging
+import re
+
+from django.conf import settings
+from django.http.multipartparser import MultiPartParserError
+
+logger = logging.getLogger('security')
+
+INSPECTION_CHUNK_SIZE = getattr(settings, 'INPUT_INSPECTION_CHUNK_SIZE', 64 * 1024)
+INSPECTION_OVERLAP = getattr(settings, 'INPUT_INSPECTION_OVERLAP', 4096)
+
+# Uploaded file content types worth scanning; everything else is binary.
+TEXT_CONTENT_TYPES = (
+    'text/',
+    'application/json',
+    'application/xml',
+    'application/xhtml+xml',
+    'application/javascript',
+    'application/x-www-form-urlencoded',
+    'image/svg+xml',
+)
+
+
+# `<tag[^>]*>.*?</tag>`: an element with any content
+_ELEMENT_PATTERN = re.compile(r'<(\w+)\[\^>\]\*>\.\*\?</\1>')
+
+
+class _ElementTracker:
+    """
+    Match one element pattern across chunks with O(1) state.
+
+    `<tag[^>]*>.*?</tag>` matches exactly when `<tag` is followed by a `>`
+    and, after that, by `</tag>`. The first opening tag is the only one that
+    matters, since any later one could only match later.
+    """
+
+    def __init__(self, pattern, tag, flags):
+        self.pattern = pattern
+        self._steps = [
+            (re.compile(re.escape(token), flags), len(token)) for token in (f'<{tag}', '>', f'</{tag}>')
+        ]
+        self._step = 0
+        # Offset in the stream where the current step's search resumes
+        self._resume = 0
+
+    def feed(self, window, start):
+        """Advance over `window`, which begins at stream offset `start`; True on a match."""
+        position = max(self._resume - start, 0)
+        while self._step < len(self._steps):
+            regex, token_length = self._steps[self._step]
+            found = regex.search(window, position)
+            if not found:
+                # A token cut off at the end of the window is found again in the overlap
+                self._resume = start + max(len(window) - token_length + 1, position)
+                return False
+            position = found.end()
+            self._step += 1
+        return True
+
+
+class ChunkScanner:
+    """Scan a stream of text chunks, carrying an overlap between them."""
+
+    def __init__(self, pattern_set, overlap=INSPECTION_OVERLAP):
+        self.pattern_set = pattern_set
+        self.overlap = overlap
+        self._tail = ''
+        # Stream offset of the current window
+        self._start = 0
+        self._elements = []
+        if pattern_set.flags & re.DOTALL:
+            for pattern in pattern_set.patterns:
+                element = _ELEMENT_PATTERN.fullmatch(pattern)
+                if element:
+                    flags = pattern_set.flags & re.IGNORECASE
+                    self._elements.append(_ElementTracker(pattern, element.group(1), flags))
+
+    def feed(self, text):
+        """Scan the next chunk; returns the matching pattern or None."""
+        window = self._tail + text
+        start = self._start
+        self._tail = window[-self.overlap:] if self.overlap else ''
+        self._start = start + len(window) - len(self._tail)
+        pattern = self.pattern_set.first_match(window)
+        if pattern:
+            return pattern
+        for element in self._elements:
+            if element.feed(window, start):
+                return element.pattern
+        return None
+
+    def scan(self, chunks):
+        for text in chunks:
+            pattern = self.feed(text)
+            if pattern:
+                return pattern
+        return None
+
+
+def iter_decoded(chunks, encoding='utf-8'):
+    """Incrementally decode byte chunks; raises UnicodeDecodeError on binary."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def iter_buffer(data, chunk_size=INSPECTION_CHUNK_SIZE):
+    """Yield zero-copy slices of a bytes buffer."""
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
+
+
+def is_text_upload(uploaded_file):
+    content_type = (getattr(uploaded_file, 'content_type', '') or '').lower()
+    return content_type.startswith(TEXT_CONTENT_TYPES)
+
+
+def scan_bytes(chunks, pattern_set, encoding='utf-8'):
+    """Scan byte chunks as text; undecodable (binary) content is not scanned."""
+    try:
+        return ChunkScanner(pattern_set).scan(iter_decoded(chunks, encoding))
+    except (UnicodeDecodeError, LookupError):
+        return None
+
+
+def scan_uploaded_file(uploaded_file, pattern_set):
+    if not is_text_upload(uploaded_file):
+        return None
+    try:
+        return scan_bytes(
+            uploaded_file.chunks(INSPECTION_CHUNK_SIZE),
+            pattern_set,
+            uploaded_file.charset or 'utf-8',
+        )
+    finally:
+        uploaded_file.seek(0)
+
+
+def scan_multipart(request, pattern_set):
+    try:
+        post, files = request.POST, request.FILES
+    except MultiPartParserError as e:
+        # Django has already marked the body as unparseable; nothing to scan
+        logger.info(f"Skipping inspection of malformed multipart body on {request.path}: {e}")
+        return None
+
+    for name, values in post.lists():
+        for value in (name, *values):
+            pattern = pattern_set.first_match(value)
+            if pattern:
+                return pattern
+
+    for name, uploaded_files in files.lists():
+        for uploaded_file in uploaded_files:
+            pattern = (
+                pattern_set.first_match(name)
+                or pattern_set.first_match(uploaded_file.name or '')
+                or scan_uploaded_file(uploaded_file, pattern_set)
+            )
+            if pattern:
+                return pattern
+    return None
+
+
+def find_malicious_input(request, pattern_set):
+    """Return the first pattern found in the request body, or None."""
+    # Django only parses multipart into POST/FILES for POST requests
+    if request.content_type == 'multipart/form-data' and request.method == 'POST':
+        return scan_multipart(request, pattern_set)
+
+    body = request.body
+    if not body:
+        return None
+    return scan_bytes(iter_buffer(body), pattern_set)
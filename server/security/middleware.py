@@ -1,96 +1,112 @@
 import logging
+from collections import namedtuple
 
 from django.utils import timezone
 from django.conf import settings
 from django.http import JsonResponse
+from django.utils.functional import SimpleLazyObject, empty
 from rest_framework import status
 import re
 
+from .headers import UNSANDBOXED_MEDIA_TYPES, build_header_variants, generate_nonce
+from .inspection import find_malicious_input
+from .validators import PatternSet
+
 logger = logging.getLogger('security')
 
 class SecurityHeadersMiddleware:
-    """Add security headers to all responses."""
+    """
+    Add security headers to all responses.
+
+    The header blocks are built once from settings (see `security.headers`)
+    and picked by path prefix: API, media, or dashboard/admin HTML. Media
+    documents such as PDFs are served without the sandbox directive.
+    """
     
     def __init__(self, get_response):
         self.get_response = get_response
+        self.variants, self.routes = build_header_variants()
+        self.default_variant = self.variants['default']
+        self.unsandboxed_media_types = tuple(
+            getattr(settings, 'SECURITY_UNSANDBOXED_MEDIA_TYPES', UNSANDBOXED_MEDIA_TYPES)
+        )
+    
+    def variant_for_path(self, path):
+        for prefix, name in self.routes:
+            if path.startswith(prefix):
+                return self.variants[name]
+        return self.default_variant
     
     def __call__(self, request):
+        variant = self.variant_for_path(request.path)
+        if variant.nonce_template:
+            # Only generated if a template actually renders it
+            request.csp_nonce = SimpleLazyObject(generate_nonce)
+        
         response = self.get_response(request)
         
-        # Security headers
-        response['X-Content-Type-Options'] = 'nosniff'
-        response['X-Frame-Options'] = 'DENY'
-        response['X-XSS-Protection'] = '1; mode=block'
-        response['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-        response['Content-Security-Policy'] = (
-            "default-src 'self'; "
-            "script-src 'self' 'unsafe-inline' 'unsafe-eval' https://cdn.jsdelivr.net; "
-            "style-src 'self' 'unsafe-inline'; "
-            "img-src 'self' data: https:; "
-            "font-src 'self'; "
-            "connect-src 'self' https://cdn.jsdelivr.net; "
-            "frame-ancestors 'none';"
-        )
-        response['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-        response['Permissions-Policy'] = (
-            'geolocation=(), microphone=(), camera=(), '
-            'payment=(), usb=(), magnetometer=(), gyroscope=()'
-        )
+        if variant.name == 'media' and 'media-document' in self.variants:
+            content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+            if content_type in self.unsandboxed_media_types:
+                variant = self.variants['media-document']
+        
+        # Respect views that chose their own framing rules (xframe_options_* decorators)
+        if getattr(response, 'xframe_options_exempt', False) or 'X-Frame-Options' in response.headers:
+            headers = variant.headers_without_frame_options
+        else:
+            headers = variant.headers
+        for name, value in headers.items():
+            response.headers[name] = value
+        
+        if variant.nonce_template and request.csp_nonce._wrapped is not empty:
+            response.headers['Content-Security-Policy'] = variant.csp_with_nonce(str(request.csp_nonce))
         
         return response
 
 
+# Only actual malicious patterns, not common HTML attributes
+DANGEROUS_INPUT_PATTERNS = PatternSet(
+    [
+        (r'<script[^>]*>.*?</script>', '<script'),  # Script tags
+        (r'javascript:', 'javascript:'),  # JavaScript URLs
+        (r'eval\s*\(', 'eval'),   # eval() calls
+        (r'expression\s*\(', 'expression'),  # CSS expressions
+        (r'vbscript:', 'vbscript:'),   # VBScript URLs
+        (r'data:text/html', 'data:text/html'),  # Data URLs with HTML
+    ],
+    re.IGNORECASE | re.DOTALL,
+    required_chars='<:(',
+)
+
+# Skip validation for safe endpoints
+INPUT_VALIDATION_SAFE_PATHS = ('/health/', '/metrics/', '/api/notifications/', '/api/auth/', '/api/issues/')
+
+
 class InputValidationMiddleware:
     """Validate and sanitize input data."""
     
     def __init__(self, get_response):
         self.get_response = get_response
-        
-        # Patterns for potentially malicious content (updated for better accuracy)
-        self.malicious_patterns = [
-            r'<script[^>]*>.*?</script>',  # Script tags
-            r'javascript:',  # JavaScript URLs
-            r'eval\s*\(',   # eval() calls
-            r'expression\s*\(',  # CSS expressions
-            r'vbscript:',   # VBScript URLs
-            r'data:text/html',  # Data URLs with HTML
-        ]
+        self.pattern_set = DANGEROUS_INPUT_PATTERNS
     
     def __call__(self, request):
-        # Skip validation for safe endpoints
-        safe_paths = ['/health/', '/metrics/', '/api/notifications/', '/api/auth/', '/api/issues/']
-        if any(request.path.startswith(path) for path in safe_paths):
+        if request.path.startswith(INPUT_VALIDATION_SAFE_PATHS):
             return self.get_response(request)
         
-        # Validate request data
-        if hasattr(request, 'body') and request.body:
-            try:
-                body_str = request.body.decode('utf-8')
-                # Only check for actual malicious patterns, not common HTML attributes
-                dangerous_patterns = [
-                    r'<script[^>]*>.*?</script>',  # Script tags
-                    r'javascript:',  # JavaScript URLs
-                    r'eval\s*\(',   # eval() calls
-                    r'expression\s*\(',  # CSS expressions
-                    r'vbscript:',   # VBScript URLs
-                    r'data:text/html',  # Data URLs with HTML
-                ]
-                
-                for pattern in dangerous_patterns:
-                    if re.search(pattern, body_str, re.IGNORECASE | re.DOTALL):
-                        logger.warning(
-                            f"Potentially malicious input detected from {request.META.get('REMOTE_ADDR')}: "
-                            f"Path: {request.path}, Pattern: {pattern}"
-                        )
-                        return JsonResponse(
-                            {
-                                'error': 'Invalid input detected',
-                                'message': 'The request contains potentially malicious content and has been blocked for security reasons.'
-                            }, 
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-            except UnicodeDecodeError:
-                pass
+        # Validate request data (streamed; binary uploads are not scanned)
+        pattern = find_malicious_input(request, self.pattern_set)
+        if pattern:
+            logger.warning(
+                f"Potentially malicious input detected from {request.META.get('REMOTE_ADDR')}: "
+                f"Path: {request.path}, Pattern: {pattern}"
+            )
+            return JsonResponse(
+                {
+                    'error': 'Invalid input detected',
+                    'message': 'The request contains potentially malicious content and has been blocked for security reasons.'
+                }, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         return self.get_response(request)
 
@@ -125,9 +141,12 @@ class AuditLoggingMiddleware:
         # Log response status
         log_data['status_code'] = response.status_code
         
-        # Log security-relevant events
+        # Log security-relevant events (queued; written by a background thread)
         if self._is_security_event(request, response):
-            logger.info(f"Security Event: {log_data}")
+            logger.info(
+                "Security Event: %s %s -> %s", log_data['method'], log_data['path'], response.status_code,
+                extra={'audit': log_data},
+            )
         
         return response
     
@@ -149,6 +168,9 @@ class AuditLoggingMiddleware:
         )
 
 
+CookieRoute = namedtuple('CookieRoute', 'session_cookie csrf_cookie isolate cookie_path')
+
+
 class PathBasedSessionMiddleware:
     """
     Isolate sessions between /admin/ and /dashboard/ by rewriting the session cookie.
@@ -159,93 +181,109 @@ class PathBasedSessionMiddleware:
     - ensure /dashboard/* only uses DASHBOARD_SESSION_COOKIE_NAME
     - rename any `Set-Cookie` for SESSION_COOKIE_NAME to the path-specific cookie
       and scope it to the matching path.
+
+    Cookie names per path prefix are resolved once at startup, and
+    `request.COOKIES` is only copied when a cookie actually has to be remapped.
     """
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.session_cookie = settings.SESSION_COOKIE_NAME
+        self.csrf_cookie = settings.CSRF_COOKIE_NAME
+        dashboard = CookieRoute(
+            getattr(settings, "DASHBOARD_SESSION_COOKIE_NAME", "dashboard_sessionid"),
+            getattr(settings, "DASHBOARD_CSRF_COOKIE_NAME", "dashboard_csrftoken"),
+            isolate=True,
+            cookie_path=None,
+        )
+        self.routes = (
+            ("/admin/", CookieRoute(
+                getattr(settings, "ADMIN_SESSION_COOKIE_NAME", "admin_sessionid"),
+                getattr(settings, "ADMIN_CSRF_COOKIE_NAME", "admin_csrftoken"),
+                isolate=True,
+                # Scope cookie to its area (defense in depth).
+                cookie_path="/admin/",
+            )),
+            ("/dashboard/", dashboard),
+            # For /api/ paths: if the default session cookie is absent but a
+            # dashboard session cookie is present, the request likely originates
+            # from the server-rendered dashboard.  Remap so Django recognises it.
+            ("/api/", dashboard._replace(isolate=False)),
+        )
 
-    def _cookie_name_for_request(self, request):
+    def _route_for_request(self, request):
         path = request.path or "/"
-        if path.startswith("/admin/"):
-            return getattr(settings, "ADMIN_SESSION_COOKIE_NAME", "admin_sessionid")
-        if path.startswith("/dashboard/"):
-            return getattr(settings, "DASHBOARD_SESSION_COOKIE_NAME", "dashboard_sessionid")
-        return settings.SESSION_COOKIE_NAME
+        for prefix, route in self.routes:
+            if path.startswith(prefix):
+                return route
+        return None
+
+    def _cookie_name_for_request(self, request):
+        route = self._route_for_request(request)
+        return route.session_cookie if route and route.isolate else self.session_cookie
 
     def _csrf_cookie_name_for_request(self, request):
-        path = request.path or "/"
-        if path.startswith("/admin/"):
-            return getattr(settings, "ADMIN_CSRF_COOKIE_NAME", "admin_csrftoken")
-        if path.startswith("/dashboard/"):
-            return getattr(settings, "DASHBOARD_CSRF_COOKIE_NAME", "dashboard_csrftoken")
-        return settings.CSRF_COOKIE_NAME
+        route = self._route_for_request(request)
+        return route.csrf_cookie if route and route.isolate else self.csrf_cookie
+
+    def _remap_cookies(self, cookies, route):
+        """Return the cookies Django should see, copying only if something changes."""
+        changes = {}
+        for default_name, area_name in (
+            (self.session_cookie, route.session_cookie),
+            (self.csrf_cookie, route.csrf_cookie),
+        ):
+            if route.isolate:
+                # Ensure /admin and /dashboard NEVER fall back to the default cookies;
+                # present the area cookie under Django's default name instead.
+                wanted = cookies.get(area_name)
+                if cookies.get(default_name) != wanted:
+                    changes[default_name] = wanted
+            elif default_name not in cookies and area_name in cookies:
+                changes[default_name] = cookies[area_name]
+
+        if not changes:
+            return cookies
+        cookies = dict(cookies)
+        for name, value in changes.items():
+            if value is None:
+                del cookies[name]
+            else:
+                cookies[name] = value
+        return cookies
+
+    def _rename_cookie(self, response, old_name, new_name, cookie_path):
+        morsel = response.cookies.pop(old_name)
+        # Re-key the existing Morsel instead of copying its attributes
+        morsel.set(new_name, morsel.value, morsel.coded_value)
+        if cookie_path:
+            morsel["path"] = cookie_path
+        dict.__setitem__(response.cookies, new_name, morsel)
 
     def __call__(self, request):
-        desired_cookie = self._cookie_name_for_request(request)
-        request._session_cookie_name = desired_cookie  # used later for response rewriting
-        desired_csrf_cookie = self._csrf_cookie_name_for_request(request)
-        request._csrf_cookie_name = desired_csrf_cookie
-
-        # Ensure /admin and /dashboard NEVER fall back to the default session cookie.
-        if (request.path or "").startswith(("/admin/", "/dashboard/")):
-            request.COOKIES = dict(request.COOKIES)
-            if settings.SESSION_COOKIE_NAME in request.COOKIES:
-                del request.COOKIES[settings.SESSION_COOKIE_NAME]
-
-            if desired_cookie in request.COOKIES:
-                # Present the desired cookie under Django's default name so
-                # SessionMiddleware will load it.
-                request.COOKIES[settings.SESSION_COOKIE_NAME] = request.COOKIES[desired_cookie]
-
-            # Do the same trick for CSRF so /admin and /dashboard each have their own CSRF secret.
-            if settings.CSRF_COOKIE_NAME in request.COOKIES:
-                del request.COOKIES[settings.CSRF_COOKIE_NAME]
-            if desired_csrf_cookie in request.COOKIES:
-                request.COOKIES[settings.CSRF_COOKIE_NAME] = request.COOKIES[desired_csrf_cookie]
-
-        # For /api/ paths: if the default session cookie is absent but a
-        # dashboard session cookie is present, the request likely originates
-        # from the server-rendered dashboard.  Remap so Django recognises it.
-        elif (request.path or "").startswith("/api/"):
-            dashboard_session = getattr(settings, "DASHBOARD_SESSION_COOKIE_NAME", "dashboard_sessionid")
-            dashboard_csrf = getattr(settings, "DASHBOARD_CSRF_COOKIE_NAME", "dashboard_csrftoken")
-            request.COOKIES = dict(request.COOKIES)
-
-            if settings.SESSION_COOKIE_NAME not in request.COOKIES and dashboard_session in request.COOKIES:
-                request.COOKIES[settings.SESSION_COOKIE_NAME] = request.COOKIES[dashboard_session]
-
-            if settings.CSRF_COOKIE_NAME not in request.COOKIES and dashboard_csrf in request.COOKIES:
-                request.COOKIES[settings.CSRF_COOKIE_NAME] = request.COOKIES[dashboard_csrf]
+        route = self._route_for_request(request)
+        if route is None or not route.isolate:
+            request._session_cookie_name = self.session_cookie  # used later for response rewriting
+            request._csrf_cookie_name = self.csrf_cookie
+        else:
+            request._session_cookie_name = route.session_cookie
+            request._csrf_cookie_name = route.csrf_cookie
+
+        if route is not None:
+            cookies = self._remap_cookies(request.COOKIES, route)
+            if cookies is not request.COOKIES:
+                request.COOKIES = cookies
 
         response = self.get_response(request)
 
-        # Rename any Set-Cookie made by SessionMiddleware from the default name
-        # to the path-specific cookie name.
-        desired_cookie = getattr(request, "_session_cookie_name", settings.SESSION_COOKIE_NAME)
-        if desired_cookie != settings.SESSION_COOKIE_NAME and settings.SESSION_COOKIE_NAME in response.cookies:
-            old = response.cookies.pop(settings.SESSION_COOKIE_NAME)
-
-            response.cookies[desired_cookie] = old.value
-            new = response.cookies[desired_cookie]
-            for k, v in old.items():
-                new[k] = v
-
-            # Scope cookie to its area (defense in depth).
-            if (request.path or "").startswith("/admin/"):
-                new["path"] = "/admin/"
-
-        # Rename any Set-Cookie made by CsrfViewMiddleware from the default name
-        # to the path-specific cookie name and scope it to the matching path.
-        desired_csrf_cookie = getattr(request, "_csrf_cookie_name", settings.CSRF_COOKIE_NAME)
-        if desired_csrf_cookie != settings.CSRF_COOKIE_NAME and settings.CSRF_COOKIE_NAME in response.cookies:
-            old = response.cookies.pop(settings.CSRF_COOKIE_NAME)
-
-            response.cookies[desired_csrf_cookie] = old.value
-            new = response.cookies[desired_csrf_cookie]
-            for k, v in old.items():
-                new[k] = v
-
-            if (request.path or "").startswith("/admin/"):
-                new["path"] = "/admin/"
+        if route is None or not route.isolate or not response.cookies:
+            return response
+
+        # Rename any Set-Cookie made by SessionMiddleware / CsrfViewMiddleware from
+        # the default name to the path-specific cookie name.
+        if self.session_cookie in response.cookies:
+            self._rename_cookie(response, self.session_cookie, route.session_cookie, route.cookie_path)
+        if self.csrf_cookie in response.cookies:
+            self._rename_cookie(response, self.csrf_cookie, route.csrf_cookie, route.cookie_path)
 
         return response
@@ -0,0 +1,147 @@
+"""
+Shared rate-limiting engine.
+
+Sliding-window counter: each key has one counter per fixed window
+(`period` seconds, aligned to the epoch), created with `cache.add` and
+bumped with atomic `cache.incr`, so concurrent workers never lose updates
+and the window TTL is set once instead of on every hit. The current count
+is weighted with the previous window's count to approximate a true sliding
+window:
+
+    estimate = previous * (1 - elapsed / period) + current
+
+Keys with large limits that are clearly under them (below
+`RATE_LIMIT_LOCAL_RATIO` of the limit, synced within
+`RATE_LIMIT_LOCAL_SYNC` seconds) are counted in process memory and flushed
+to the cache with the next shared check, saving round-trips on hot
+endpoints. Small limits (e.g. 5/m on login) always hit the cache.
+"""
+
+import math
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+LOCAL_MIN_LIMIT = getattr(settings, 'RATE_LIMIT_LOCAL_MIN_LIMIT', 50)
+LOCAL_RATIO = getattr(settings, 'RATE_LIMIT_LOCAL_RATIO', 0.5)
+LOCAL_SYNC = getattr(settings, 'RATE_LIMIT_LOCAL_SYNC', 1.0)
+LOCAL_MAX_KEYS = 10000
+
+RateLimitResult = namedtuple('RateLimitResult', 'allowed limit remaining reset retry_after')
+
+# key -> [window, shared estimate, pending local hits, last sync time]
+_local_state = {}
+_local_lock = threading.Lock()
+
+
+def parse_rate(rate, default=(5, 60)):
+    """Parse '5/m' style rates into (limit, period_seconds)."""
+    try:
+        limit, period = rate.split('/')
+        return int(limit), PERIODS[period[0].lower()]
+    except (ValueError, KeyError, IndexError, AttributeError):
+        return default
+
+
+def set_rate_limit_headers(response, result):
+    """Expose the limiter state to clients."""
+    if result is None:
+        return response
+    response['X-RateLimit-Limit'] = str(result.limit)
+    response['X-RateLimit-Remaining'] = str(result.remaining)
+    response['X-RateLimit-Reset'] = str(result.reset)
+    if not result.allowed:
+        response['Retry-After'] = str(result.retry_after)
+    return response
+
+
+class RateLimiter:
+    """Sliding-window limiter for one rate (e.g. RateLimiter('30/h'))."""
+
+    def __init__(self, rate, block_time=0, prefix='rl'):
+        self.limit, self.period = parse_rate(rate)
+        self.block_time = block_time
+        self.prefix = prefix
+        self.local_fast_path = self.limit >= LOCAL_MIN_LIMIT
+
+    def _keys(self, key, window):
+        base = f"{self.prefix}:{key}:{self.period}"
+        return f"{base}:{window}", f"{base}:{window - 1}", f"{base}:blocked"
+
+    def hit(self, key):
+        """Count one request for `key`; returns a RateLimitResult."""
+        now = time.time()
+        window = int(now // self.period)
+        elapsed = now - window * self.period
+        reset = max(1, math.ceil(self.period - elapsed))
+
+        local_key = f"{self.prefix}:{key}:{self.period}"
+        pending = 0
+        if self.local_fast_path:
+            result, pending = self._local_hit(local_key, window, now, reset)
+            if result is not None:
+                return result
+
+        current_key, previous_key, block_key = self._keys(key, window)
+        state = cache.get_many([previous_key, block_key])
+        if state.get(block_key):
+            return RateLimitResult(False, self.limit, 0, reset, self.block_time or reset)
+
+        current = self._incr(current_key, pending + 1)
+        weight = 1 - elapsed / self.period
+        estimate = state.get(previous_key, 0) * weight + current
+
+        if estimate > self.limit:
+            # Rejected hits do not consume budget
+            try:
+                cache.decr(current_key)
+            except ValueError:
+                pass
+            retry_after = reset
+            if self.block_time:
+                cache.add(block_key, True, self.block_time)
+                retry_after = self.block_time
+            self._store_local(local_key, window, now, estimate - 1)
+            return RateLimitResult(False, self.limit, 0, reset, retry_after)
+
+        self._store_local(local_key, window, now, estimate)
+        return RateLimitResult(True, self.limit, int(self.limit - estimate), reset, 0)
+
+    def _incr(self, key, delta):
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            # Window keys outlive their window so the next one can weigh them
+            if cache.add(key, delta, self.period * 2):
+                return delta
+            return cache.incr(key, delta)
+
+    def _local_hit(self, key, window, now, reset):
+        """Count in memory when clearly under the limit; returns (result, hits to flush)."""
+        with _local_lock:
+            state = _local_state.get(key)
+            if state is None or state[0] != window:
+                return None, 0
+            _window, estimate, pending, synced = state
+            if now - synced < LOCAL_SYNC and estimate + pending + 1 <= self.limit * LOCAL_RATIO:
+                state[2] = pending + 1
+                remaining = int(self.limit - estimate - pending - 1)
+                return RateLimitResult(True, self.limit, remaining, reset, 0), 0
+            state[2] = 0
+            return None, pending
+
+    def _store_local(self, key, window, now, estimate):
+        if not self.local_fast_path:
+            return
+        with _local_lock:
+            if len(_local_state) >= LOCAL_MAX_KEYS:
+                _local_state.clear()
+            # Keep hits other threads counted locally while we were syncing
+            state = _local_state.get(key)
+            pending = state[2] if state is not None and state[0] == window else 0
+            _local_state[key] = [window, estimate, pending, now]
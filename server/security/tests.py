@@ -33,6 +33,76 @@ class SecurityHeadersMiddlewareTest(TestCase):
         self.assertIn('Content-Security-Policy', response)
         self.assertIn('Referrer-Policy', response)
         self.assertIn('Permissions-Policy', response)
+    
+    def _middleware_response(self, path, response=None, **overrides):
+        from django.http import HttpResponse
+        from django.test import RequestFactory, override_settings
+        from security.middleware import SecurityHeadersMiddleware
+        
+        request = RequestFactory().get(path)
+        with override_settings(**overrides):
+            middleware = SecurityHeadersMiddleware(lambda req: response or HttpResponse('ok'))
+        return request, middleware(request)
+    
+    def test_header_variant_chosen_by_path(self):
+        """API and media responses get their own precomputed CSP."""
+        _, api = self._middleware_response('/api/issues/')
+        _, media = self._middleware_response('/media/avatars/a.svg')
+        _, page = self._middleware_response('/dashboard/')
+        
+        self.assertTrue(api['Content-Security-Policy'].startswith("default-src 'none';"))
+        self.assertIn("script-src 'self';", api['Content-Security-Policy'])
+        self.assertIn('sandbox allow-downloads;', media['Content-Security-Policy'])
+        self.assertIn('https://cdn.jsdelivr.net', page['Content-Security-Policy'])
+        for response in (api, media, page):
+            self.assertEqual(response['X-Frame-Options'], 'DENY')
+            self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+    
+    def test_pdf_media_is_not_sandboxed(self):
+        from django.http import HttpResponse
+        
+        _, pdf = self._middleware_response('/media/attachments/a.pdf', HttpResponse(b'%PDF', content_type='application/pdf'))
+        _, svg = self._middleware_response('/media/attachments/a.svg', HttpResponse(b'<svg/>', content_type='image/svg+xml'))
+        self.assertNotIn('sandbox', pdf['Content-Security-Policy'])
+        self.assertIn("default-src 'none';", pdf['Content-Security-Policy'])
+        self.assertIn('sandbox', svg['Content-Security-Policy'])
+    
+    def test_browsable_api_assets_allowed(self):
+        response = self.client.get('/api/issues/', HTTP_ACCEPT='text/html')
+        self.assertIn(b'<html', response.content)
+        self.assertIn(b'rest_framework/js/jquery', response.content)
+        csp = response['Content-Security-Policy']
+        self.assertIn("script-src 'self';", csp)
+        self.assertIn("style-src 'self' 'unsafe-inline';", csp)
+    
+    def test_frame_options_chosen_by_view_are_kept(self):
+        from django.http import HttpResponse
+        
+        response = HttpResponse('ok')
+        response['X-Frame-Options'] = 'SAMEORIGIN'
+        _, response = self._middleware_response('/dashboard/', response)
+        self.assertEqual(response['X-Frame-Options'], 'SAMEORIGIN')
+        
+        exempt = HttpResponse('ok')
+        exempt.xframe_options_exempt = True
+        _, exempt = self._middleware_response('/dashboard/', exempt)
+        self.assertNotIn('X-Frame-Options', exempt)
+    
+    def test_csp_nonce_only_added_when_used(self):
+        from django.http import HttpResponse
+        
+        _, unused = self._middleware_response('/dashboard/', SECURITY_CSP_NONCE=True)
+        self.assertNotIn("'nonce-", unused['Content-Security-Policy'])
+        
+        from django.test import RequestFactory, override_settings
+        from security.middleware import SecurityHeadersMiddleware
+        
+        with override_settings(SECURITY_CSP_NONCE=True):
+            middleware = SecurityHeadersMiddleware(lambda req: HttpResponse(f'<script nonce="{req.csp_nonce}">'))
+        request = RequestFactory().get('/dashboard/')
+        response = middleware(request)
+        self.assertIn(f"'nonce-{request.csp_nonce}'", response['Content-Security-Policy'])
+        self.assertIn(str(request.csp_nonce).encode(), response.content)
 
 
 class InputValidationMiddlewareTest(APITestCase):
@@ -72,6 +142,69 @@ class InputValidationMiddlewareTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class PathBasedSessionMiddlewareTest(TestCase):
+    """Test per-area session/CSRF cookie remapping."""
+    
+    def _call(self, path, cookies, view=None):
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from security.middleware import PathBasedSessionMiddleware
+        
+        seen = {}
+        
+        def default_view(request):
+            seen.update(request.COOKIES)
+            return HttpResponse('ok')
+        
+        factory = RequestFactory()
+        for name, value in cookies.items():
+            factory.cookies[name] = value
+        request = factory.get(path)
+        original = request.COOKIES
+        response = PathBasedSessionMiddleware(view or default_view)(request)
+        return request, original, seen, response
+    
+    def test_admin_only_sees_admin_cookies(self):
+        request, _, seen, _ = self._call('/admin/', {'sessionid': 'api', 'admin_sessionid': 'adm', 'csrftoken': 'c'})
+        self.assertEqual(seen, {'sessionid': 'adm', 'admin_sessionid': 'adm'})
+        self.assertEqual(request._session_cookie_name, 'admin_sessionid')
+    
+    def test_cookies_not_copied_when_nothing_to_remap(self):
+        request, original, seen, _ = self._call('/api/issues/', {'sessionid': 's', 'csrftoken': 'c', 'dashboard_sessionid': 'd'})
+        self.assertIs(request.COOKIES, original)
+        self.assertEqual(seen['sessionid'], 's')
+        
+        request, original, _, _ = self._call('/dashboard/', {'dashboard_sessionid': 'd'})
+        self.assertIsNot(request.COOKIES, original)
+        self.assertEqual(request.COOKIES['sessionid'], 'd')
+        self.assertEqual(original, {'dashboard_sessionid': 'd'})
+    
+    def test_api_falls_back_to_dashboard_cookies(self):
+        _, _, seen, _ = self._call('/api/issues/', {'dashboard_sessionid': 'd', 'dashboard_csrftoken': 'c'})
+        self.assertEqual(seen['sessionid'], 'd')
+        self.assertEqual(seen['csrftoken'], 'c')
+    
+    def test_set_cookie_renamed_and_scoped(self):
+        from django.http import HttpResponse
+        
+        def login_view(request):
+            response = HttpResponse('ok')
+            response.set_cookie('sessionid', 'new', httponly=True, samesite='Strict')
+            response.set_cookie('csrftoken', 'tok')
+            return response
+        
+        _, _, _, response = self._call('/admin/login/', {}, login_view)
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertEqual(response.cookies['admin_sessionid'].value, 'new')
+        self.assertEqual(response.cookies['admin_sessionid']['path'], '/admin/')
+        self.assertTrue(response.cookies['admin_sessionid']['httponly'])
+        self.assertIn('admin_sessionid=new', response.cookies['admin_sessionid'].OutputString())
+        self.assertEqual(response.cookies['admin_csrftoken'].value, 'tok')
+        
+        _, _, _, response = self._call('/api/auth/login/', {}, login_view)
+        self.assertEqual(response.cookies['sessionid'].value, 'new')
+
+
 class RateLimitingTest(APITestCase):
     """Test rate limiting functionality."""
     
@@ -118,6 +251,62 @@ class RateLimitingTest(APITestCase):
         self.assertIn('Rate limit exceeded', str(response.data))
 
 
+class RateLimiterTest(TestCase):
+    """Test the shared sliding-window rate limiter."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from security import ratelimit
+        cache.clear()
+        ratelimit._local_state.clear()
+    
+    def test_limit_enforced_and_rejections_do_not_consume_budget(self):
+        from security.ratelimit import RateLimiter
+        
+        limiter = RateLimiter('3/m')
+        with patch('security.ratelimit.time.time', return_value=6000.0):
+            results = [limiter.hit('user:1') for _ in range(5)]
+            self.assertEqual([r.allowed for r in results], [True, True, True, False, False])
+            self.assertEqual([r.remaining for r in results[:3]], [2, 1, 0])
+            self.assertTrue(limiter.hit('user:2').allowed)
+        
+        # Half-way through the next window half of the previous count still applies
+        with patch('security.ratelimit.time.time', return_value=6090.0):
+            self.assertEqual([limiter.hit('user:1').allowed for _ in range(3)], [True, False, False])
+    
+    def test_decorated_view_method_is_keyed_by_request(self):
+        from django.test import RequestFactory
+        from django.http import HttpResponse
+        from security.decorators import ip_rate_limit
+        
+        class View:
+            @ip_rate_limit(rate='1/m', block_time=60)
+            def post(self, request):
+                return HttpResponse('ok')
+        
+        factory = RequestFactory()
+        first = View().post(factory.post('/x', REMOTE_ADDR='10.0.0.1'))
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['X-RateLimit-Remaining'], '0')
+        
+        blocked = View().post(factory.post('/x', REMOTE_ADDR='10.0.0.1'))
+        self.assertEqual(blocked.status_code, 429)
+        self.assertEqual(blocked['Retry-After'], '60')
+        
+        self.assertEqual(View().post(factory.post('/x', REMOTE_ADDR='10.0.0.2')).status_code, 200)
+    
+    def test_large_limits_use_local_fast_path(self):
+        from django.core.cache import cache
+        from security.ratelimit import RateLimiter
+        
+        limiter = RateLimiter('100/m')
+        limiter.hit('ip:1')
+        with patch.object(cache, 'incr', wraps=cache.incr) as incr:
+            for _ in range(10):
+                self.assertTrue(limiter.hit('ip:1').allowed)
+        incr.assert_not_called()
+
+
 class AuditLoggingTest(TestCase):
     """Test audit logging functionality."""
     
@@ -146,6 +335,100 @@ class AuditLoggingTest(TestCase):
         mock_logger.info.assert_called()
 
 
+class AuditLogPipelineTest(TestCase):
+    """Test the queued JSON-lines audit log writer."""
+    
+    def test_records_written_as_json_lines_and_rotated_by_size(self):
+        import logging
+        import os
+        import tempfile
+        from security.audit_log import AuditQueueHandler
+        
+        with tempfile.TemporaryDirectory() as log_dir:
+            path = os.path.join(log_dir, 'audit', 'security.log')
+            handler = AuditQueueHandler(path, max_bytes=600, backup_count=3)
+            logger = logging.getLogger('security.tests.audit')
+            logger.addHandler(handler)
+            logger.propagate = False
+            try:
+                for i in range(6):
+                    logger.warning("Security Event: %s", i, extra={'audit': {'path': f'/p/{i}', 'status_code': 403}})
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+            
+            lines = []
+            for name in sorted(os.listdir(os.path.dirname(path)), reverse=True):
+                with open(os.path.join(os.path.dirname(path), name)) as f:
+                    lines.extend(json.loads(line) for line in f)
+            self.assertGreater(len(os.listdir(os.path.dirname(path))), 1)
+        
+        self.assertEqual([entry['event']['path'] for entry in lines], [f'/p/{i}' for i in range(6)])
+        self.assertEqual(lines[0]['message'], 'Security Event: 0')
+    
+    def test_full_queue_drops_instead_of_blocking(self):
+        import logging
+        import os
+        import tempfile
+        from security.audit_log import AuditQueueHandler
+        
+        with tempfile.TemporaryDirectory() as log_dir:
+            path = os.path.join(log_dir, 'security.log')
+            with patch('os.register_at_fork') as register_at_fork:
+                handler = AuditQueueHandler(path, queue_size=1)
+            # Fork hooks are registered once for the module, not per handler
+            register_at_fork.assert_not_called()
+            handler._started = True  # listener not running: queue fills up
+            record = logging.LogRecord('security', logging.INFO, __file__, 1, 'event', None, None)
+            handler.handle(record)
+            handler.handle(record)
+            self.assertEqual(handler.dropped, 1)
+            # The loss is reported once the listener drains the queue
+            handler._started = False
+            handler._ensure_started()
+            handler.close()
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+        
+        self.assertEqual([entry['message'] for entry in lines], [
+            'event', 'Audit log queue full: dropped 1 record(s), 1 in total',
+        ])
+        self.assertEqual(lines[1]['event'], {'dropped': 1, 'dropped_total': 1})
+
+    def test_per_process_files_have_one_writer_each(self):
+        import logging
+        import os
+        import tempfile
+        from security.audit_log import AuditQueueHandler, per_process_filename
+        
+        if not hasattr(os, 'fork'):
+            self.skipTest('needs os.fork')
+        with tempfile.TemporaryDirectory() as log_dir:
+            path = os.path.join(log_dir, 'security.log')
+            handler = AuditQueueHandler(path, per_process=True, console=True)
+            self.assertIn(handler.console_handler, handler.listener.handlers)
+            record = logging.LogRecord('security', logging.INFO, __file__, 1, 'event', None, None)
+            handler.console_handler.stream = open(os.devnull, 'w')
+            handler.handle(record)
+            
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    handler.console_handler.stream = open(os.devnull, 'w')
+                    handler.handle(record)
+                    handler.close()
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            handler.close()
+            handler.console_handler.stream.close()
+            
+            for writer in (os.getpid(), pid):
+                with open(per_process_filename(path, writer)) as f:
+                    self.assertEqual(len(f.readlines()), 1)
+            self.assertFalse(os.path.exists(path))
+
+
 class SecurityValidatorsTest(TestCase):
     """Test security validators."""
     
@@ -228,6 +511,101 @@ class SecurityValidatorsTest(TestCase):
             validate_file_upload(large_file)
 
 
+class PatternSetTest(TestCase):
+    """Test the precompiled pattern scanner used by validators and middleware."""
+    
+    def test_prefilter_matches_plain_regex_search(self):
+        import re
+        from security.validators import MALICIOUS_CONTENT_PATTERNS, XSS_PATTERNS
+        
+        samples = [
+            "Leaking pipe (since Monday) in Block C: urgent",
+            "<SCRIPT src=x></script>",
+            "JavaScript:void(0)",
+            "style=\"width: expression (1)\"",
+            "@IMPORT url(x)",
+            "<iframe src=x>",
+            "a=1",
+        ]
+        for pattern_set in (MALICIOUS_CONTENT_PATTERNS, XSS_PATTERNS):
+            for sample in samples:
+                expected = next(
+                    (p for p in pattern_set.patterns if re.search(p, sample, pattern_set.flags)),
+                    None,
+                )
+                self.assertEqual(pattern_set.first_match(sample), expected, sample)
+    
+    def test_non_ascii_input_skips_literal_prefilter(self):
+        from security.validators import MALICIOUS_CONTENT_PATTERNS
+        
+        # re.IGNORECASE folds the long s onto 's'; str.lower() does not
+        self.assertIsNotNone(MALICIOUS_CONTENT_PATTERNS.first_match("<\u017fcript>x</script>"))
+
+
+class StreamingInspectionTest(TestCase):
+    """Test chunked request body inspection."""
+    
+    def _inspect(self, request):
+        from security.inspection import find_malicious_input
+        from security.middleware import DANGEROUS_INPUT_PATTERNS
+        return find_malicious_input(request, DANGEROUS_INPUT_PATTERNS)
+    
+    def test_multipart_fields_scanned_and_binary_files_skipped(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import RequestFactory
+        
+        factory = RequestFactory()
+        binary = SimpleUploadedFile('photo.png', b'\x89PNG javascript:', content_type='image/png')
+        request = factory.post('/dashboard/upload/', {'note': 'fine', 'photo': binary})
+        self.assertIsNone(self._inspect(request))
+        # Parsed data stays available to the view
+        self.assertEqual(request.POST['note'], 'fine')
+        self.assertEqual(request.FILES['photo'].read(), b'\x89PNG javascript:')
+        
+        request = factory.post('/dashboard/upload/', {'note': '<script>x</script>'})
+        self.assertIsNotNone(self._inspect(request))
+    
+    def test_match_across_chunk_boundary_in_text_upload(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from django.test import RequestFactory
+        
+        content = b'a' * 60 + b'javascript:alert(1)' + b'b' * 60
+        upload = SimpleUploadedFile('notes.txt', content, content_type='text/plain')
+        request = RequestFactory().post('/dashboard/upload/', {'notes': upload})
+        with patch('security.inspection.INSPECTION_CHUNK_SIZE', 64):
+            self.assertEqual(self._inspect(request), 'javascript:')
+    
+    def test_json_body_scanned_in_chunks(self):
+        from security.inspection import ChunkScanner, iter_buffer, iter_decoded
+        from security.middleware import DANGEROUS_INPUT_PATTERNS
+        
+        body = ('{"description": "' + 'x' * 100 + 'vbscript:run' + '"}').encode()
+        scanner = ChunkScanner(DANGEROUS_INPUT_PATTERNS, overlap=16)
+        self.assertEqual(scanner.scan(iter_decoded(iter_buffer(body, 50))), 'vbscript:')
+
+    
+    def test_script_block_longer_than_the_overlap(self):
+        from django.test import RequestFactory
+        from security.inspection import ChunkScanner, iter_buffer, iter_decoded
+        from security.middleware import DANGEROUS_INPUT_PATTERNS
+        
+        padding = 'x' * (80 * 1024)
+        request = RequestFactory().post(
+            '/dashboard/notes/', f'{{"note": "<script>{padding}</script>"}}', content_type='application/json',
+        )
+        self.assertEqual(self._inspect(request), r'<script[^>]*>.*?</script>')
+        
+        def scan(text, chunk_size=50):
+            scanner = ChunkScanner(DANGEROUS_INPUT_PATTERNS, overlap=16)
+            return scanner.scan(iter_decoded(iter_buffer(text.encode(), chunk_size)))
+        
+        # Tags split across chunks, and a long opening tag
+        self.assertIsNotNone(scan('a' * 47 + '<SCRIPT src=' + 'y' * 200 + '>' + 'z' * 200 + '</scr' + 'ipt>'))
+        # A closing tag before the opening one is not a script block
+        self.assertIsNone(scan('</script>' + 'z' * 200 + '<script>' + 'z' * 200))
+        self.assertIsNone(scan('<script' + 'z' * 200 + '</script>'))
+
+
 class InputSanitizationTest(TestCase):
     """Test input sanitization."""
     
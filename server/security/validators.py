@@ -3,31 +3,105 @@ from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 
+class PatternSet:
+    """
+    A list of regex patterns compiled once, scanned with early exit.
+
+    Patterns may name a lowercase `literal` that any match must contain.
+    For ASCII input the value is lowercased once and a pattern's regex only
+    runs when its literal is present (a fast C-level substring scan), so
+    clean text costs a few `in` checks instead of one regex pass per
+    pattern. Non-ASCII input always runs the regexes, since re.IGNORECASE
+    folds some non-ASCII characters onto ASCII letters. If every pattern
+    needs one of `required_chars`, values without any of them skip scanning
+    entirely.
+
+    One combined alternation was measured slower than separate patterns:
+    it defeats the regex engine's literal-prefix search.
+    """
+
+    def __init__(self, patterns, flags=0, required_chars=None):
+        self.patterns = []
+        self.flags = flags
+        self._compiled = []
+        for entry in patterns:
+            pattern, literal = entry if isinstance(entry, tuple) else (entry, None)
+            self.patterns.append(pattern)
+            self._compiled.append((pattern, re.compile(pattern, flags), literal))
+        self.required_chars = required_chars
+        self._has_literals = any(literal for _, _, literal in self._compiled)
+
+    def first_match(self, value):
+        """Return the first pattern found in `value`, or None."""
+        if self.required_chars and not any(char in value for char in self.required_chars):
+            return None
+
+        lowered = value.lower() if self._has_literals and value.isascii() else None
+        for pattern, regex, literal in self._compiled:
+            if literal and lowered is not None and literal not in lowered:
+                continue
+            if regex.search(value):
+                return pattern
+        return None
+
+
+MALICIOUS_CONTENT_PATTERNS = PatternSet(
+    [
+        (r'<script[^>]*>.*?</script>', '<script'),  # Script tags
+        (r'javascript:', 'javascript:'),           # JavaScript URLs
+        r'on\w+\s*=',                             # Event handlers
+        (r'eval\s*\(', 'eval'),                    # eval() calls
+        (r'expression\s*\(', 'expression'),        # CSS expressions
+        (r'@import', '@import'),                   # CSS imports
+        (r'binding\s*:', 'binding'),               # XML binding
+    ],
+    re.IGNORECASE | re.DOTALL,
+    required_chars='<:=(@',
+)
+SQL_INJECTION_PATTERNS = PatternSet(
+    [
+        r"(\b(UNION|SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|EXECUTE)\b)",
+        r"(\b(OR|AND)\s+\d+\s*=\s*\d+)",
+        r"(\b(OR|AND)\s+['\"]?\w+['\"]?\s*=\s*['\"]?\w+['\"]?)",
+        r"(--|#|\/\*|\*\/)",
+        r"(\b(LOAD_FILE|INTO\s+OUTFILE|INTO\s+DUMPFILE)\b)",
+    ],
+    re.IGNORECASE,
+)
+
+XSS_PATTERNS = PatternSet(
+    [
+        (r'<script[^>]*>', '<script'),
+        (r'javascript:', 'javascript:'),
+        r'on\w+\s*=',
+        (r'<iframe[^>]*>', '<iframe'),
+        (r'<object[^>]*>', '<object'),
+        (r'<embed[^>]*>', '<embed'),
+        (r'<link[^>]*>', '<link'),
+        (r'<meta[^>]*>', '<meta'),
+        (r'vbscript:', 'vbscript:'),
+        (r'data:text/html', 'data:text/html'),
+    ],
+    re.IGNORECASE,
+    required_chars='<:=',
+)
+
+
 # Custom validators for security
 class NoMaliciousContentValidator:
     """Validator to check for malicious content in text fields."""
     
-    def __init__(self):
-        self.malicious_patterns = [
-            r'<script[^>]*>.*?</script>',  # Script tags
-            r'javascript:',                # JavaScript URLs
-            r'on\w+\s*=',                 # Event handlers
-            r'eval\s*\(',                 # eval() calls
-            r'expression\s*\(',           # CSS expressions
-            r'@import',                   # CSS imports
-            r'binding\s*:',               # XML binding
-        ]
+    pattern_set = MALICIOUS_CONTENT_PATTERNS
     
     def __call__(self, value):
         if not isinstance(value, str):
             return
         
-        for pattern in self.malicious_patterns:
-            if re.search(pattern, value, re.IGNORECASE | re.DOTALL):
-                raise ValidationError(
-                    _('Potentially malicious content detected.'),
-                    code='malicious_content'
-                )
+        if self.pattern_set.first_match(value):
+            raise ValidationError(
+                _('Potentially malicious content detected.'),
+                code='malicious_content'
+            )
     
     def deconstruct(self):
         return (
@@ -40,25 +114,17 @@ class NoMaliciousContentValidator:
 class SQLInjectionValidator:
     """Validator to detect potential SQL injection patterns."""
     
-    def __init__(self):
-        self.sql_patterns = [
-            r"(\b(UNION|SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|EXECUTE)\b)",
-            r"(\b(OR|AND)\s+\d+\s*=\s*\d+)",
-            r"(\b(OR|AND)\s+['\"]?\w+['\"]?\s*=\s*['\"]?\w+['\"]?)",
-            r"(--|#|\/\*|\*\/)",
-            r"(\b(LOAD_FILE|INTO\s+OUTFILE|INTO\s+DUMPFILE)\b)",
-        ]
+    pattern_set = SQL_INJECTION_PATTERNS
     
     def __call__(self, value):
         if not isinstance(value, str):
             return
         
-        for pattern in self.sql_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                raise ValidationError(
-                    _('Invalid characters detected.'),
-                    code='sql_injection'
-                )
+        if self.pattern_set.first_match(value):
+            raise ValidationError(
+                _('Invalid characters detected.'),
+                code='sql_injection'
+            )
     
     def deconstruct(self):
         return (
@@ -71,30 +137,17 @@ class SQLInjectionValidator:
 class XSSValidator:
     """Validator to detect XSS patterns."""
     
-    def __init__(self):
-        self.xss_patterns = [
-            r'<script[^>]*>',
-            r'javascript:',
-            r'on\w+\s*=',
-            r'<iframe[^>]*>',
-            r'<object[^>]*>',
-            r'<embed[^>]*>',
-            r'<link[^>]*>',
-            r'<meta[^>]*>',
-            r'vbscript:',
-            r'data:text/html',
-        ]
+    pattern_set = XSS_PATTERNS
     
     def __call__(self, value):
         if not isinstance(value, str):
             return
         
-        for pattern in self.xss_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                raise ValidationError(
-                    _('Invalid HTML content detected.'),
-                    code='xss'
-                )
+        if self.pattern_set.first_match(value):
+            raise ValidationError(
+                _('Invalid HTML content detected.'),
+                code='xss'
+            )
     
     def deconstruct(self):
         return (
@@ -0,0 +1,51 @@
+"""
+In-process SMTP sink for offline and performance testing.
+
+Selected with EMAIL_BACKEND = "utils.email_backends.SinkEmailBackend" (or
+CAMPUSFIX_EMAIL_SINK=... in the environment, see settings). Messages are
+rendered exactly as for SMTP and kept in a bounded in-memory outbox instead
+of being delivered; latency, server errors and "too many messages" (421)
+rejections are injected per message from settings.EMAIL_SINK (see
+utils.fault_injection), so the retry path in utils.email_service can be
+exercised and benchmarked without a mail server.
+"""
+
+import smtplib
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+
+from utils.fault_injection import ERROR, RATE_LIMITED, get_injector
+
+
+class SinkEmailBackend(BaseEmailBackend):
+    outbox = deque(maxlen=getattr(settings, "EMAIL_SINK_MAX_MESSAGES", 10000))
+    _lock = threading.Lock()
+
+    def send_messages(self, email_messages):
+        injector = get_injector("EMAIL_SINK")
+        sent = 0
+        for message in email_messages:
+            outcome = injector.inject()
+            try:
+                if outcome == RATE_LIMITED:
+                    raise smtplib.SMTPDataError(421, b"4.7.0 Too many messages, try again later")
+                if outcome == ERROR:
+                    raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            except smtplib.SMTPException:
+                if not self.fail_silently:
+                    raise
+                continue
+            # Serialize like the SMTP backend would, so rendering cost is measured
+            data = message.message().as_bytes(linesep="\r\n")
+            with self._lock:
+                self.outbox.append((message.from_email, message.recipients(), data))
+            sent += 1
+        return sent
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls.outbox.clear()
@@ -138,6 +138,39 @@ def send_issue_status_update_email(user, issue, old_status, new_status, feedback
     html_content = render_to_string('emails/issue_status_update.html', context)
     return send_email(user.email, f"Update on your issue: {issue.title}", html_content)
 
+def send_issues_status_update_email(user, issues, new_status, feedback_tokens=None):
+    """Send one status update email covering several of the reporter's issues."""
+    feedback_tokens = feedback_tokens or {}
+    if not issues:
+        return False
+    if len(issues) == 1:
+        issue = issues[0]
+        return send_issue_status_update_email(
+            user, issue, issue.status, new_status, feedback_token=feedback_tokens.get(issue.id)
+        )
+    if not user.email_issue_updates:
+        return False
+
+    context = {
+        'first_name': user.first_name,
+        'issues': [
+            {
+                'id': issue.id,
+                'title': issue.title,
+                'location': issue.location,
+                'feedback_token': feedback_tokens.get(issue.id),
+            }
+            for issue in issues
+        ],
+        'status_display': dict(issues[0].STATUS_CHOICES).get(new_status, new_status),
+        'updated_at': timezone.now().strftime('%Y-%m-%d %H:%M'),
+        'is_resolved': new_status == 'resolved',
+        'SITE_URL': settings.SITE_URL,
+        'show_preferences': True
+    }
+    html_content = render_to_string('emails/issues_status_update.html', context)
+    return send_email(user.email, f"Update on {len(issues)} of your issues", html_content)
+
 def send_issue_assigned_email(user, issue):
     """Send email to staff when an issue is assigned."""
     priority_colors = {
@@ -0,0 +1,96 @@
+"""
+Latency and failure injection for the local stand-ins of external services
+(`issues.ai_fakes.FakeGenerativeModel`, `utils.email_backends.SinkEmailBackend`).
+
+Options, from a settings dict such as GEMINI_FAKE / EMAIL_SINK (values may be
+strings, as parsed from the environment):
+
+    latency          base delay per call, seconds
+    jitter           extra uniform random delay, 0..jitter seconds
+    error_rate       probability a call fails with a server error
+    rate_limit_rate  probability a call is rejected as rate limited (429)
+    rate_limited     targets (e.g. model names, "|"-separated) that are always rate limited
+    seed             random seed, for repeatable failure sequences
+"""
+
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+OK = "ok"
+ERROR = "error"
+RATE_LIMITED = "rate_limited"
+
+
+class FaultInjector:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 rate_limited=(), seed=None):
+        self.latency = float(latency)
+        self.jitter = float(jitter)
+        self.error_rate = float(error_rate)
+        self.rate_limit_rate = float(rate_limit_rate)
+        if isinstance(rate_limited, str):
+            rate_limited = [target for target in rate_limited.split("|") if target]
+        self.rate_limited = frozenset(rate_limited)
+        self._random = random.Random(None if seed in (None, "") else int(seed))
+        self._lock = threading.Lock()
+        self.calls = self.errors = self.throttled = 0
+
+    @classmethod
+    def from_settings(cls, name):
+        return cls(**getattr(settings, name, {}))
+
+    def inject(self, target=""):
+        """Sleep for the configured latency, then return OK, ERROR or RATE_LIMITED."""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+            if target in self.rate_limited or roll < self.rate_limit_rate:
+                outcome = RATE_LIMITED
+                self.throttled += 1
+            elif roll < self.rate_limit_rate + self.error_rate:
+                outcome = ERROR
+                self.errors += 1
+            else:
+                outcome = OK
+        if delay > 0:
+            time.sleep(delay)
+        return outcome
+
+    def stats(self):
+        return {"calls": self.calls, "errors": self.errors, "rate_limited": self.throttled}
+
+
+def parse_options(value):
+    """Parse "latency=0.5,error_rate=0.1" into an options dict."""
+    return dict(item.split("=", 1) for item in (value or "").split(",") if "=" in item)
+
+
+_injectors = {}
+_injectors_lock = threading.Lock()
+
+
+def get_injector(name):
+    """Shared injector for a settings name, so counters and the random stream span instances."""
+    with _injectors_lock:
+        injector = _injectors.get(name)
+        if injector is None:
+            injector = _injectors[name] = FaultInjector.from_settings(name)
+        return injector
+
+
+def reset_injector(name):
+    """Drop the shared injector so the next call re-reads its settings."""
+    with _injectors_lock:
+        _injectors.pop(name, None)
+
+
+@receiver(setting_changed)
+def _settings_changed(setting, **kwargs):
+    # override_settings(GEMINI_FAKE=...) etc. take effect on the next call
+    reset_injector(setting)